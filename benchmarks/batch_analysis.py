@@ -0,0 +1,69 @@
+"""
+Multi-session analysis: sequential vs process pool vs cached.
+
+    python -m benchmarks.batch_analysis [--sessions 1000] [--frames 3000] [--workers N]
+
+Writes synthetic CSV sessions to a temporary directory, then times
+batch_metrics: sequential without cache (what mean.py did), the process
+pool on a cold cache, a warm cache, and a warm cache after 1% of the
+sessions were rewritten.
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+from utils.batch_analysis import batch_metrics
+from utils.evaluator import HEADER
+
+GESTURES = ["UP", "DOWN", "LEFT", "RIGHT", "NONE"]
+
+
+def write_session(path, frames, rng):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        real = "NONE"
+        for i in range(frames):
+            if rng.random() < 0.05:
+                real = rng.choice(GESTURES)
+            detected = real if rng.random() < 0.9 else rng.choice(GESTURES)
+            writer.writerow([1700000000 + i / 30, int(rng.random() < 0.97), detected, real,
+                             int(rng.random() < 0.02), int(rng.random() < 0.05)])
+
+
+def timed(label, paths, **kwargs):
+    stats = {}
+    start = time.perf_counter()
+    batch_metrics(paths, stats=stats, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:7.2f} s  {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f"session_{i:05d}.csv") for i in range(args.sessions)]
+        for path in paths:
+            write_session(path, args.frames, rng)
+        cache = os.path.join(tmp, "cache.json")
+        print(f"{args.sessions} sessions x {args.frames} frames, {os.cpu_count()} CPU(s)")
+
+        timed("sequential, no cache", paths, cache_path=None, workers=1)
+        timed("pool, cold cache", paths, cache_path=cache, workers=args.workers)
+        timed("warm cache", paths, cache_path=cache, workers=args.workers)
+        for path in paths[::100]:
+            write_session(path, args.frames, rng)
+        timed("warm cache, 1% rewritten", paths, cache_path=cache, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Headless Snake simulation throughput.
+
+    python -m benchmarks.batch_snake [--games 1 256 4096] [--steps 2000]
+
+SnakeGame.step is one Python game at a time (16 games in turn);
+BatchSnake advances n games per call. Both play a greedy
+food-seeking policy with 20% random gestures and restart finished games.
+Reports game steps per second.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from games.batch_snake import BatchSnake
+from games.snake import SnakeGame
+from utils.movements import DIRECTIONS
+
+
+def greedy_codes(head, food, rng, noise=0.2):
+    """Direction codes towards the food, replaced by a random code (or none) with probability `noise`."""
+    dx, dy = food[:, 0] - head[:, 0], food[:, 1] - head[:, 1]
+    codes = np.where(dx < 0, 0, np.where(dx > 0, 3, np.where(dy < 0, 1, 2)))
+    random_codes = rng.integers(-1, 4, len(codes))
+    return np.where(rng.random(len(codes)) < noise, random_codes, codes).astype(np.int8)
+
+
+def run_step(games, steps, seed=0):
+    rng = np.random.default_rng(seed)
+    sims = [SnakeGame(None, seed=i) for i in range(games)]
+    names = [None] + list(DIRECTIONS)
+    start = time.perf_counter()
+    for _ in range(steps):
+        head = np.array([g.snake[0] for g in sims])
+        food = np.array([g.food for g in sims])
+        for game, code in zip(sims, greedy_codes(head, food, rng)):
+            if game.step(names[code + 1])["game_over"]:
+                game.reset()
+    return games * steps / (time.perf_counter() - start)
+
+
+def run_batch(games, steps, seed=0):
+    rng = np.random.default_rng(seed)
+    sim = BatchSnake(games, seed=seed)
+    start = time.perf_counter()
+    for _ in range(steps):
+        state = sim.step(greedy_codes(sim.head, sim.food, rng))
+        sim.reset(state["game_over"])
+    return games * steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, nargs="+", default=[1, 256, 4096])
+    parser.add_argument("--steps", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"SnakeGame.step: {run_step(16, args.steps // 4) / 1e3:8.1f} k steps/s")
+    for games in args.games:
+        print(f"BatchSnake x{games:<5}: {run_batch(games, args.steps) / 1e6:8.2f} M steps/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Per-frame cost of Evaluator.log_frame, before and after buffering.
+
+    python -m benchmarks.evaluator_logging [--frames 5000]
+
+"before" reproduces the previous implementation (open the CSV in append
+mode, write one row, close, on every frame); "after" is the buffered
+Evaluator. Both write the same rows to a temporary directory.
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from utils.evaluator import Evaluator
+
+
+def log_frame_reopen(path, hand_detected, gesture_detected, gesture_real, paused, game_over):
+    with open(path, mode="a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([time.time(), int(hand_detected), gesture_detected, gesture_real,
+                         int(paused), int(game_over)])
+
+
+def frames(n):
+    gestures = ("UP", "DOWN", "LEFT", "RIGHT", "NONE")
+    return [(i % 7 != 0, gestures[i % 5], gestures[(i // 3) % 5], i % 11 == 0, False) for i in range(n)]
+
+
+def bench(n):
+    rows = frames(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        evaluator = Evaluator(log_dir=tmp, session_name="before")
+        path = evaluator.get_path()
+        evaluator.close()
+        start = time.perf_counter()
+        for row in rows:
+            log_frame_reopen(path, *row)
+        before = time.perf_counter() - start
+
+        evaluator = Evaluator(log_dir=tmp, session_name="after")
+        start = time.perf_counter()
+        for row in rows:
+            evaluator.log_frame(*row)
+        evaluator.close()
+        after = time.perf_counter() - start
+
+        sizes = [os.path.getsize(os.path.join(tmp, f"session_{name}.csv")) for name in ("before", "after")]
+    return before / n, after / n, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=5000)
+    args = parser.parse_args()
+
+    before, after, sizes = bench(args.frames)
+    print(f"before (open/write/close per frame): {before * 1e6:7.1f} us/frame")
+    print(f"after  (buffered, flush every 64 rows / 1 s): {after * 1e6:7.1f} us/frame")
+    print(f"speed-up: x{before / after:.1f}   (file sizes {sizes[0]} / {sizes[1]} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Cost of the StageProfiler instrumentation and the per-stage table of a
+headless game loop (SDL dummy driver).
+
+    python -m benchmarks.frame_stages [--frames 3000] [--hud]
+
+First times profiler.time()/record() against an empty loop (overhead per
+timed stage), then plays the seeded game loop of main.py (update, draw,
+display.update, frame) with the profiler on, with --hud the F3 overlay
+drawn every frame, and prints profiler.report().
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from games.snake import SnakeGame
+from utils.leaderboard import Leaderboard
+from utils.profiler import StageProfiler, ProfilerHUD
+
+
+def overhead(n):
+    profiler = StageProfiler()
+    start = time.perf_counter()
+    for _ in range(n):
+        pass
+    empty = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(n):
+        with profiler.time("stage"):
+            pass
+    timed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(n):
+        profiler.record("stage", 0.001)
+    recorded = time.perf_counter() - start
+    print(f"profiler.time(): {(timed - empty) / n * 1e6:.2f} us/stage, "
+          f"record(): {(recorded - empty) / n * 1e6:.2f} us")
+
+
+def play(frames, hud):
+    pygame.init()
+    screen = pygame.display.set_mode((1200, 600))
+    profiler = StageProfiler()
+    overlay = ProfilerHUD(profiler)
+    if hud:
+        overlay.toggle()
+    game = SnakeGame(screen, seed=0, leaderboard=Leaderboard(":memory:"))
+    rng = random.Random(1)
+    for _ in range(frames):
+        frame_start = time.perf_counter()
+        with profiler.time("update"):
+            game.update(rng.choice(("LEFT", "RIGHT", "UP", "DOWN", None, None)))
+            if game.game_over:
+                game.reset()
+        with profiler.time("draw"):
+            dirty = game.draw()
+            rect = overlay.draw(screen)
+            if rect is not None:
+                dirty.append(rect)
+        with profiler.time("display"):
+            pygame.display.update(dirty)
+        profiler.record("frame", time.perf_counter() - frame_start)
+    pygame.quit()
+    print(profiler.report())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--hud", action="store_true")
+    args = parser.parse_args()
+
+    overhead(200000)
+    play(args.frames, args.hud)
+
+
+if __name__ == "__main__":
+    main()
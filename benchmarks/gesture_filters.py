@@ -0,0 +1,102 @@
+"""
+Lag / stability comparison of gesture smoothing strategies on logs/spirale_*.csv.
+
+    python -m benchmarks.gesture_filters [--noise 4.0] [--seed 0] [--configs ...] [--json OUT] [FILES ...]
+
+The session logs only contain labels, so for each session an index finger
+trajectory is synthesized from the keyboard labels (`gesture_real`) and the
+real frame timestamps: the finger rotates towards the pressed direction in
+~`--turn-ms` and every landmark gets Gaussian jitter of `--noise` pixels.
+Each configuration (utils.gesture_latency.make_classifier, default:
+vote5, one_euro, raw) classifies that trajectory frame by frame:
+
+  - vote5    : raw classification + 5-frame majority vote (previous behaviour)
+  - one_euro : OneEuroFilter on the landmarks + raw classification
+  - raw      : no smoothing (lower bound on lag, upper bound on flicker)
+
+Scored with utils.gesture_latency (onset lag, misses, false switches per
+minute, stability); --json writes the per-gesture report. The recorded
+`gesture_detected` column (5-frame vote on real landmarks) is scored for
+reference.
+"""
+import argparse
+import csv
+import glob
+import json
+
+import numpy as np
+
+from utils.gesture_latency import LatencyStats, classify_stream, format_report
+from utils.movements import INDEX_MCP, INDEX_TIP
+
+# Angle of the index finger in the (mirrored) image for each keyboard direction
+TARGET_ANGLE = {"LEFT": 0.0, "UP": 90.0, "DOWN": -90.0, "RIGHT": 180.0}
+FINGER_LENGTH = 80.0
+
+
+def read_session(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    t = np.array([float(r["timestamp"]) for r in rows])
+    real = [r["gesture_real"] for r in rows]
+    detected = [r["gesture_detected"] for r in rows]
+    return t, real, detected
+
+
+def synthesize(t, real, noise, turn_ms, rng):
+    """(frames, 1, 21, 3) landmarks whose index finger follows the keyboard labels."""
+    n = len(t)
+    angles = np.empty(n)
+    angle = TARGET_ANGLE.get(next((g for g in real if g in TARGET_ANGLE), "RIGHT"))
+    for i in range(n):
+        target = TARGET_ANGLE.get(real[i])
+        if target is not None:
+            diff = (target - angle + 180) % 360 - 180
+            dt = t[i] - t[i - 1] if i else 0.0
+            step = min(abs(diff), 90.0 * dt / (turn_ms / 1e3))
+            angle += np.sign(diff) * step
+        angles[i] = angle
+
+    base = np.array([320.0, 240.0])
+    landmarks = np.tile(np.array([320.0, 240.0, 0.0], dtype=np.float32), (n, 1, 21, 1))
+    rad = np.radians(angles)
+    landmarks[:, 0, INDEX_TIP, 0] = base[0] + FINGER_LENGTH * np.cos(rad)
+    landmarks[:, 0, INDEX_TIP, 1] = base[1] - FINGER_LENGTH * np.sin(rad)
+    landmarks[:, :, :, :2] += rng.normal(0.0, noise, size=(n, 1, 21, 2))
+    landmarks[:, 0, INDEX_MCP, :2] = base + rng.normal(0.0, noise, size=(n, 2))
+    return landmarks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--noise", type=float, default=4.0, help="landmark jitter (pixels, std)")
+    parser.add_argument("--turn-ms", type=float, default=150.0, help="time for a 90° finger rotation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--configs", nargs="+", default=["vote5", "one_euro", "raw"],
+                        help="classifiers, see utils.gesture_latency.make_classifier")
+    parser.add_argument("--json", default=None, help="also write the full report to this file")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob("logs/spirale_*.csv"))
+    rng = np.random.default_rng(args.seed)
+    stats = {name: LatencyStats() for name in args.configs + ["recorded"]}
+
+    for path in files:
+        t, real, recorded = read_session(path)
+        landmarks = synthesize(t, real, args.noise, args.turn_ms, rng)
+        stats["recorded"].update(t, real, recorded)
+        for config in args.configs:
+            stats[config].update(t, real, classify_stream(t, landmarks, config))
+
+    print(f"{len(files)} sessions, jitter {args.noise}px, 90° turn in {args.turn_ms:.0f} ms")
+    report = {"inputs": files, "configs": {name: s.report() for name, s in stats.items()}}
+    for name, entry in report["configs"].items():
+        print(format_report(name, entry))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Learned gesture classifier (utils.gesture_model) vs the index-angle rule:
+accuracy on the spirale sessions and inference cost per frame.
+
+    python -m benchmarks.gesture_model [--hidden 32] [--epochs 400] [--noise 6.0] [FILES ...]
+
+The session logs only contain labels, so, as in benchmarks.gesture_filters,
+a whole hand (21 points) is synthesized from the keyboard labels and the
+real timestamps of each session: a pointing hand of a per-session size
+and position, whose palm turns towards the pressed direction more slowly
+than the index finger, with Gaussian jitter of --noise pixels on every
+point. Each session is scored by a model trained on the other ones
+(leave-one-session-out), on the frames where a direction key is pressed;
+the recorded `gesture_detected` column (rule on real landmarks) is
+reported for reference.
+
+Then times, on one hand per call, the rule (get_direction_from_index)
+and the model (__call__), and the batched model.predict over all the
+frames of the sessions, in microseconds per frame.
+"""
+import argparse
+import glob
+import time
+
+import numpy as np
+
+from utils.gesture_model import GestureClassifier, accuracy_report, landmark_features
+from utils.movements import DIRECTIONS, directions_from_index, get_direction_from_index
+from utils.sessions import read_columns
+
+TARGET_ANGLE = {"LEFT": 0.0, "UP": 90.0, "DOWN": -90.0, "RIGHT": 180.0}
+# pointing hand, index up, pixels (y down), wrist at the origin
+HAND = np.array([
+    [0, 0], [-20, -15], [-35, -30], [-45, -45], [-50, -58],      # wrist, thumb
+    [-15, -60], [-15, -85], [-15, -105], [-15, -125],            # index, extended
+    [0, -62], [0, -75], [2, -65], [3, -55],                      # middle, folded
+    [12, -58], [12, -70], [13, -60], [13, -50],                  # ring, folded
+    [22, -52], [22, -62], [22, -55], [22, -47],                  # pinky, folded
+], dtype=np.float64)
+INDEX = slice(5, 9)
+
+
+def _follow(t, real, turn_ms):
+    """Angle per frame turning towards the pressed direction at 90° per turn_ms."""
+    angles = np.empty(len(t))
+    angle = TARGET_ANGLE.get(next((g for g in real if g in TARGET_ANGLE), "RIGHT"))
+    for i in range(len(t)):
+        target = TARGET_ANGLE.get(real[i])
+        if target is not None:
+            diff = (target - angle + 180) % 360 - 180
+            dt = t[i] - t[i - 1] if i else 0.0
+            angle += np.sign(diff) * min(abs(diff), 90.0 * dt / (turn_ms / 1e3))
+        angles[i] = angle
+    return angles
+
+
+def _rotate(points, degrees):
+    """Rotate (frames, k, 2) image points (y down) by `degrees` counter-clockwise, per frame."""
+    rad = np.radians(degrees)[:, None]
+    cos, sin = np.cos(rad), np.sin(rad)
+    x, y = points[..., 0], points[..., 1]
+    return np.stack([x * cos + y * sin, -x * sin + y * cos], axis=-1)
+
+
+def synthesize(t, real, noise, turn_ms, rng):
+    """(frames, 21, 3) landmarks of a hand pointing where the keyboard says."""
+    n = len(t)
+    finger = _follow(t, real, turn_ms)
+    palm = _follow(t, real, 2 * turn_ms)
+    scale = rng.uniform(0.8, 1.3)
+    hand = np.broadcast_to(HAND * scale, (n, 21, 2))
+    points = _rotate(hand, palm - 90.0)
+    # the index finger turns further than the palm, around its MCP
+    mcp = points[:, INDEX.start:INDEX.start + 1]
+    points[:, INDEX] = mcp + _rotate(hand[:, INDEX] - hand[:, INDEX.start:INDEX.start + 1], finger - 90.0)
+    wrist = rng.uniform([200, 200], [440, 320]) + np.clip(np.cumsum(rng.normal(0, 1.0, (n, 2)), axis=0), -60, 60)
+    landmarks = np.zeros((n, 21, 3), dtype=np.float32)
+    landmarks[..., :2] = points + wrist[:, None] + rng.normal(0.0, noise, size=(n, 21, 2))
+    return landmarks
+
+
+def per_frame_us(fn, hands, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(hands[i % len(hands)][None])
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--hidden", type=int, default=32, help="hidden units (0: softmax regression)")
+    parser.add_argument("--epochs", type=int, default=400)
+    parser.add_argument("--noise", type=float, default=6.0, help="landmark jitter (pixels, std)")
+    parser.add_argument("--turn-ms", type=float, default=150.0, help="time for a 90° finger rotation")
+    parser.add_argument("--calls", type=int, default=20000, help="single-frame calls timed")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob("logs/spirale_*.csv"))
+    rng = np.random.default_rng(args.seed)
+    sessions = []
+    for path in files:
+        columns = read_columns(path, decode=True)
+        real = columns["gesture_real"].tolist()
+        hands = synthesize(columns["timestamp"], real, args.noise, args.turn_ms, rng)
+        keep = np.isin(columns["gesture_real"], DIRECTIONS)
+        sessions.append((path, hands[keep], columns["gesture_real"][keep], columns["gesture_detected"][keep]))
+
+    print(f"{len(files)} sessions, jitter {args.noise}px, hidden {args.hidden}, {args.epochs} epochs "
+          f"(leave-one-session-out)")
+    totals = {"model": ([], []), "rules": ([], []), "recorded": ([], [])}
+    train_s = 0.0
+    for i, (path, hands, real, recorded) in enumerate(sessions):
+        others = [s for j, s in enumerate(sessions) if j != i]
+        features = np.concatenate([landmark_features(s[1]) for s in others])
+        labels = np.concatenate([s[2] for s in others])
+        start = time.perf_counter()
+        model = GestureClassifier.train(features, labels, hidden=args.hidden, epochs=args.epochs, seed=args.seed)
+        train_s += time.perf_counter() - start
+        predictions = {"model": model.predict(hands), "rules": directions_from_index(hands), "recorded": recorded}
+        line = []
+        for name, predicted in predictions.items():
+            totals[name][0].append(real)
+            totals[name][1].append(predicted)
+            line.append(f"{name} {accuracy_report(real, predicted)['ALL']:.3f}")
+        print(f"  {path}: {len(real)} frames  " + "  ".join(line))
+    for name, (real, predicted) in totals.items():
+        report = accuracy_report(np.concatenate(real), np.concatenate(predicted))
+        per_gesture = "  ".join(f"{g} {report[g]:.3f}" for g in DIRECTIONS if g in report)
+        print(f"{name:>9}: accuracy {report['ALL']:.3f}  ({per_gesture})")
+    print(f"training: {train_s / len(sessions):.2f} s per model")
+
+    hands = np.concatenate([s[1] for s in sessions])
+    rule_us = per_frame_us(get_direction_from_index, hands, args.calls)
+    model_us = per_frame_us(model, hands, args.calls)
+    start = time.perf_counter()
+    model.predict(hands)
+    batch_us = (time.perf_counter() - start) / len(hands) * 1e6
+    print(f"per frame: rule {rule_us:.1f} us, model {model_us:.1f} us, "
+          f"model batched {batch_us:.2f} us ({len(hands)} frames in one call)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Threshold sweep (utils.sweep) on the spirale sessions: agreement of the
+vectorized evaluation with the frame-by-frame stack, and sweep throughput
+in one process vs --jobs processes.
+
+    python -m benchmarks.gesture_sweep [--noise 6.0] [--dropout 0.005] [--jobs 4] [--random N]
+
+Hands are synthesized from the keyboard labels of logs/spirale_*.csv as
+in benchmarks.gesture_model, with bursts of frames where the tracker
+loses the hand (--dropout: probability that a burst of 1-15 frames
+starts at a frame), and written as .lmk recordings. For a few
+configurations the game gestures of utils.sweep are compared with the
+sequential reference: get_direction_from_index + MajorityVote fed only
+with frames that have a hand, and PauseHysteresis. Then the default
+grid (or --random N points of it) is swept and the fronts printed.
+"""
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.gesture_model import synthesize
+from games.session import PauseHysteresis
+from utils.filters import MajorityVote
+from utils.landmark_recording import LandmarkRecorder
+from utils.movements import DIRECTIONS, direction_bins, index_angles, hand_present
+from utils.sessions import read_columns
+from utils.sweep import (DEFAULTS, FRONTS, GRID, LABELS, format_result, game_gestures, load_features,
+                         make_configs, pareto_front, run_sweep)
+
+
+def record_session(path, columns, args, rng):
+    t, real = columns["timestamp"], columns["gesture_real"]
+    hands = synthesize(t, real.tolist(), args.noise, args.turn_ms, rng)
+    lost = np.zeros(len(t), dtype=bool)
+    for start in np.flatnonzero(rng.random(len(t)) < args.dropout).tolist():
+        lost[start:start + rng.integers(1, 16)] = True
+    with LandmarkRecorder(path) as recorder:
+        for i in range(len(t)):
+            recorder.append(t[i], hands[i:i + 1] if not lost[i] else None, real[i])
+
+
+def reference(session_path, config):
+    """Game gestures of the frame-by-frame stack (MajorityVote ties: see utils.sweep.majority_vote)."""
+    from utils.landmark_recording import LandmarkRecording
+
+    vote = MajorityVote(config["vote"]) if config["vote"] > 1 else None
+    pause = PauseHysteresis(config["frames_to_pause"], config["frames_to_resume"])
+    out = []
+    for _, landmarks, _ in LandmarkRecording(session_path).stream():
+        gesture = None
+        if len(landmarks):
+            angle = index_angles(landmarks)[:1]
+            gesture = str(DIRECTIONS[direction_bins(angle, config["horizontal_deg"])[0]])
+            if vote is not None:
+                gesture = vote(gesture)
+        paused = pause.update(hand_present(landmarks))
+        out.append("NONE" if paused or gesture is None else gesture)
+    return np.array(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--noise", type=float, default=6.0, help="landmark jitter (pixels, std)")
+    parser.add_argument("--turn-ms", type=float, default=150.0, help="time for a 90° finger rotation")
+    parser.add_argument("--dropout", type=float, default=0.005, help="per-frame chance a tracking loss starts")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--random", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for log in sorted(glob.glob("logs/spirale_*.csv")):
+            path = os.path.join(tmp, os.path.splitext(os.path.basename(log))[0] + ".lmk")
+            record_session(path, read_columns(log, decode=True), args, rng)
+            paths.append(path)
+        sessions = [load_features(path) for path in paths]
+
+        print("vectorized vs frame-by-frame (fraction of equal game gestures):")
+        checks = [DEFAULTS, dict(DEFAULTS, horizontal_deg=35.0, frames_to_pause=3, frames_to_resume=1),
+                  dict(DEFAULTS, vote=5), dict(DEFAULTS, vote=4, frames_to_pause=8)]
+        for config in checks:
+            equal = total = 0
+            for path, session in zip(paths, sessions):
+                codes, _ = game_gestures(session, config)
+                expected = reference(path, config)
+                equal += int((LABELS[codes] == expected).sum())
+                total += len(expected)
+            print(f"  vote={config['vote']} horizontal_deg={config['horizontal_deg']:g} "
+                  f"pause={config['frames_to_pause']}/{config['frames_to_resume']}: {equal / total:.4f}")
+
+        configs = make_configs(GRID, args.random, args.seed)
+        timings = {}
+        for jobs in sorted({1, args.jobs}):
+            start = time.perf_counter()
+            results = run_sweep(sessions, configs, jobs)
+            timings[jobs] = time.perf_counter() - start
+            print(f"{len(configs)} configurations, jobs={jobs}: {timings[jobs]:.2f} s "
+                  f"({timings[jobs] / len(configs) * 1e3:.2f} ms/configuration)")
+        if len(timings) > 1:
+            print(f"speedup with {args.jobs} processes: {timings[1] / timings[args.jobs]:.2f}x "
+                  f"on {os.cpu_count()} cores")
+        for a, b in FRONTS:
+            front = pareto_front(results, (a, b))
+            print(f"Pareto front {a[0]}/{b[0]} ({len(front)}):")
+            for result in front:
+                print(f"  {format_result(result)}")
+
+
+if __name__ == "__main__":
+    main()
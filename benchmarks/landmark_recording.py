@@ -0,0 +1,92 @@
+"""
+Landmark recordings (.lmk, utils.landmark_recording): cost of recording
+during play and of reading a large dataset back through np.memmap,
+against the compressed .npz landmark stream (replay.save_landmark_stream).
+
+    python -m benchmarks.landmark_recording [--frames 1000000] [--npz-frames 100000]
+
+Writes --frames synthetic one-hand frames with LandmarkRecorder.append
+(us per frame, i.e. per camera frame in main.py --record-landmarks),
+then opens the file and times:
+  - random windows of 300 frames (10 s of play), copied out of the map;
+  - a scan of the gesture_real column (label histogram);
+  - labelled_hands(), the training-set extraction of utils.gesture_model.
+The .npz stream is written and loaded for --npz-frames frames and its
+load time extrapolated per frame: it has to be decompressed whole.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from utils.gesture_model import labelled_hands
+from utils.landmark_recording import LandmarkRecorder, LandmarkRecording
+from utils.replay import save_landmark_stream
+
+LABELS = np.array(["NONE", "UP", "DOWN", "LEFT", "RIGHT"])
+
+
+def synthetic(frames, rng):
+    landmarks = rng.normal(300.0, 40.0, size=(frames, 1, 21, 3)).astype(np.float32)
+    labels = LABELS[rng.integers(0, len(LABELS), size=frames // 30 + 1).repeat(30)[:frames]]
+    return np.arange(frames) / 30.0, landmarks, labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=1000000)
+    parser.add_argument("--npz-frames", type=int, default=100000)
+    parser.add_argument("--windows", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    chunk = 100000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dataset.lmk")
+        elapsed = 0.0
+        with LandmarkRecorder(path) as recorder:
+            for start in range(0, args.frames, chunk):
+                t, landmarks, labels = synthetic(min(chunk, args.frames - start), rng)
+                t += start / 30.0
+                begin = time.perf_counter()
+                for i in range(len(t)):
+                    recorder.append(t[i], landmarks[i], labels[i], "NONE")
+                elapsed += time.perf_counter() - begin
+        size = os.path.getsize(path)
+        print(f".lmk: {args.frames} frames, {size / 2**20:.0f} MiB ({size / args.frames:.0f} B/frame), "
+              f"append {elapsed / args.frames * 1e6:.1f} us/frame")
+
+        start = time.perf_counter()
+        recording = LandmarkRecording(path)
+        print(f"  open (memmap)         {(time.perf_counter() - start) * 1e3:8.2f} ms")
+        starts = rng.integers(0, len(recording) - 300, size=args.windows)
+        start = time.perf_counter()
+        for s in starts.tolist():
+            np.array(recording.landmarks[s:s + 300])
+        print(f"  300-frame window      {(time.perf_counter() - start) / args.windows * 1e3:8.3f} ms")
+        start = time.perf_counter()
+        codes, counts = np.unique(recording.records["gesture_real"], return_counts=True)
+        print(f"  label histogram       {(time.perf_counter() - start) * 1e3:8.1f} ms  "
+              f"{dict(zip(recording.labels[codes].tolist(), counts.tolist()))}")
+        start = time.perf_counter()
+        hands, labels = labelled_hands(path)
+        print(f"  labelled_hands()      {(time.perf_counter() - start) * 1e3:8.1f} ms  ({len(labels)} examples)")
+        del recording, hands, labels
+
+        npz = os.path.join(tmp, "dataset.npz")
+        t, landmarks, labels = synthetic(args.npz_frames, rng)
+        save_landmark_stream(npz, t, landmarks, labels)
+        start = time.perf_counter()
+        with np.load(npz) as data:
+            data["landmarks"], data["gesture_real"]
+        load = time.perf_counter() - start
+        print(f".npz: {os.path.getsize(npz) / args.npz_frames:.0f} B/frame, full load "
+              f"{load * 1e3:.0f} ms for {args.npz_frames} frames "
+              f"(~{load * args.frames / args.npz_frames:.1f} s for {args.frames})")
+
+
+if __name__ == "__main__":
+    main()
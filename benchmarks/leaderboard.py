@@ -0,0 +1,124 @@
+"""
+Leaderboard store: cost of a game-over insert and of the top-N query on
+a large board, and concurrent writers sharing one database.
+
+    python -m benchmarks.leaderboard [--entries 300000] [--adds 200] [--writers 4]
+
+"json" is the previous store (whole list in memory, linear name scan,
+full sort and a full `indent=2` rewrite of the file per insert), kept
+here for comparison; "sqlite" is utils.leaderboard.Leaderboard, with the
+rank/percentile queries the sidebar makes (in-memory index). Then
+--writers processes add scores to the same database at once, like game
+kiosks sharing a store, and the row count is checked.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.leaderboard import Leaderboard
+
+
+class JsonLeaderboard:
+    """The previous JSON implementation of Leaderboard.add / get_top."""
+
+    def __init__(self, path, entries):
+        self.path = path
+        self._entries = sorted(entries, key=lambda e: e["score"], reverse=True)
+
+    def add(self, name, score):
+        entry = {"name": name, "score": score, "date": "2025-01-01T00:00:00Z"}
+        for e in self._entries:
+            if e["name"] == name and e["score"] < score:
+                e["score"], e["date"] = score, entry["date"]
+                break
+            if e["name"] == name and e["score"] >= score:
+                return
+        else:
+            self._entries.append(entry)
+        self._entries.sort(key=lambda e: e["score"], reverse=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False, indent=2)
+
+    def get_top(self, n=10):
+        return self._entries[:n]
+
+
+def entries(n, rng):
+    return [{"name": f"player{i}", "score": rng.randrange(200), "date": "2025-01-01T00:00:00Z"}
+            for i in range(n)]
+
+
+def timed(label, fn, calls):
+    times = []
+    for i in range(calls):
+        start = time.perf_counter()
+        fn(i)
+        times.append(time.perf_counter() - start)
+    ms = np.array(times) * 1e3
+    print(f"  {label:<14} {ms.mean():9.3f} ms mean  {np.percentile(ms, 95):9.3f} ms p95")
+
+
+def _writer(args):
+    path, writer, count = args
+    lb = Leaderboard(path)
+    for i in range(count):
+        lb.add(f"kiosk{writer}-{i}", i % 50)
+    lb.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=300000)
+    parser.add_argument("--adds", type=int, default=200)
+    parser.add_argument("--json-adds", type=int, default=3, help="the JSON store takes seconds per add")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--writes", type=int, default=500, help="adds per writer")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    data = entries(args.entries, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{args.entries} entries")
+        old = JsonLeaderboard(os.path.join(tmp, "leaderboard.json"), data)
+        print(" json")
+        timed("add", lambda i: old.add(f"new{i}", rng.randrange(200)), args.json_adds)
+        timed("get_top(5)", lambda i: old.get_top(5), args.adds)
+
+        path = os.path.join(tmp, "shared.db")
+        Leaderboard(path).close()
+        with sqlite3.connect(path) as db:
+            db.executemany("INSERT INTO scores (name, score, date) VALUES (?, ?, ?)",
+                           [(e["name"], e["score"], e["date"]) for e in data])
+        lb = Leaderboard(path)
+        print(" sqlite")
+        timed("add (new)", lambda i: lb.add(f"new{i}", rng.randrange(200)), args.adds)
+        timed("add (update)", lambda i: lb.add(f"player{rng.randrange(args.entries)}", 250 + i), args.adds)
+        timed("get_top(5)", lambda i: lb.get_top(5), args.adds)
+        timed("refresh()", lambda i: lb.refresh(), args.adds)
+        lb.rank(0)      # builds the in-memory index once
+        timed("rank()", lambda i: lb.rank(rng.randrange(300)), args.adds)
+        timed("percentile()", lambda i: lb.percentile(rng.randrange(300)), args.adds)
+        print(f"  rank() after add ok: {lb.rank(10**6) == 1 and lb.size == len(lb)}")
+        before = len(lb)
+
+        start = time.perf_counter()
+        jobs = [(path, w, args.writes) for w in range(args.writers)]
+        with ProcessPoolExecutor(args.writers) as pool:
+            written = sum(pool.map(_writer, jobs))
+        elapsed = time.perf_counter() - start
+        added = len(lb) - before
+        print(f" {args.writers} concurrent writers: {written} adds in {elapsed:.2f} s, "
+              f"{added} rows added ({'ok' if added == written else 'MISSING ROWS'})")
+        lb.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Micro-benchmark of the camera -> pygame preview path.
+
+    python -m benchmarks.preview_surface [--frames 500] [--width 640 --height 480]
+
+"before" reproduces the old main.py path (tracker BGR->RGB conversion, then
+resize + second BGR->RGB conversion + tobytes + frombuffer); "after" uses the
+tracker's reusable RGB buffer and CameraPreview. Peak allocation per frame
+are measured with tracemalloc (NumPy/OpenCV arrays are traced).
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import cv2
+import numpy as np
+import pygame
+
+from utils.preview import CameraPreview
+
+
+def old_frame_to_surface(frame, size=None):
+    if size is not None:
+        frame = cv2.resize(frame, size)
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    h, w = frame_rgb.shape[:2]
+    return pygame.image.frombuffer(frame_rgb.tobytes(), (w, h), "RGB")
+
+
+def run_before(frames, size):
+    for frame in frames:
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)      # HandTracker.get_landmarks
+        old_frame_to_surface(frame, size)
+
+
+def run_after(frames, size, preview, rgb):
+    for frame in frames:
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)  # HandTracker.get_landmarks_rgb
+        preview.update(rgb)
+
+
+def time_per_frame(fn, n_frames):
+    fn()  # warm-up: buffers allocated on first use are not per-frame costs
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) / n_frames
+
+
+def allocated_per_frame(fn_one_frame):
+    """Peak bytes allocated while processing one frame (NumPy/OpenCV arrays are traced)."""
+    fn_one_frame()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    fn_one_frame()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - base
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    size = (360, 240)
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8) for _ in range(8)]
+    frames = [frames[i % len(frames)] for i in range(args.frames)]
+
+    preview = CameraPreview(size)
+    rgb = np.empty_like(frames[0])
+
+    for name, fn, one in (
+        ("before", lambda: run_before(frames, size), lambda: run_before(frames[:1], size)),
+        ("after", lambda: run_after(frames, size, preview, rgb), lambda: run_after(frames[:1], size, preview, rgb)),
+    ):
+        t = time_per_frame(fn, args.frames)
+        allocated = allocated_per_frame(one)
+        print(f"{name:>7}: {t * 1e6:8.1f} us/frame, {allocated / 1024:8.1f} KiB peak allocation/frame")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
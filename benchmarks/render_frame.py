@@ -0,0 +1,72 @@
+"""
+Frame-time benchmark of SnakeGame rendering in headless mode (SDL dummy driver).
+
+    python -m benchmarks.render_frame [--frames 3000] [--length 40]
+
+"full" repaints the whole window every frame and flips it (previous
+behaviour); "dirty" uses the layered renderer and
+pygame.display.update(rects). The same seeded game with a snake of
+`--length` cells and a camera preview surface is played in both modes.
+Reports ms/frame and the average fraction of the window sent to the display.
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from games.snake import SnakeGame
+from utils.leaderboard import Leaderboard
+
+
+def play(screen, frames, length, full):
+    lb = Leaderboard(":memory:")
+    game = SnakeGame(screen, seed=0, leaderboard=lb)
+    cam = pygame.Surface((360, 240)).convert(screen)
+    cam.fill((60, 90, 110))
+    game.set_camera_surface(cam)
+    # long snake zig-zagging over the top of the board
+    cells = [(x, y) for y in range(0, 200, 20) for x in (range(0, 780, 20) if y % 40 == 0 else range(760, -20, -20))]
+    game.snake = list(reversed(cells[:length]))
+    game.direction = (0, game.cell_size)
+
+    rng = random.Random(1)
+    window_area = screen.get_width() * screen.get_height()
+    updated = 0
+    start = time.perf_counter()
+    for i in range(frames):
+        game.update(rng.choice(("LEFT", "RIGHT", "DOWN", None, None, None)))
+        if game.game_over:
+            game.reset()
+        if full:
+            game.invalidate()
+            game.draw()
+            pygame.display.flip()
+            updated += window_area
+        else:
+            dirty = game.draw()
+            pygame.display.update(dirty)
+            updated += sum(r.width * r.height for r in dirty)
+    elapsed = time.perf_counter() - start
+    return elapsed / frames, updated / frames / window_area
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--length", type=int, default=40)
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((1200, 600))
+    for name, full in (("full", True), ("dirty", False)):
+        t, fraction = play(screen, args.frames, args.length, full)
+        print(f"{name:>5}: {t * 1e3:6.3f} ms/frame, {fraction * 100:5.1f}% of the window updated per frame")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
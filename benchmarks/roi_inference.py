@@ -0,0 +1,84 @@
+"""
+Full-frame vs ROI-cropped MediaPipe inference on recorded videos.
+
+    python -m benchmarks.roi_inference VIDEO [VIDEO ...] [--max-side 256] [--max-frames 2000]
+
+For each video, every frame goes through a full-frame HandTracker and an
+ROI HandTracker. Reports inference ms/frame, hand detection rate, ROI
+fallbacks, the mean landmark distance (pixels) between the two and the
+agreement of the raw index-finger direction. The full-frame result is the
+reference.
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from hand_detection.hand_tracker import HandTracker
+from utils.movements import directions_from_index
+
+
+def read_frames(path, max_frames):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def run(tracker, frames):
+    results, times = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        landmarks, _ = tracker.get_landmarks_rgb(frame)
+        times.append(time.perf_counter() - start)
+        results.append(landmarks.copy())
+    return results, np.array(times)
+
+
+def compare(path, frames, max_side):
+    full, t_full = run(HandTracker(), frames)
+    roi_tracker = HandTracker(roi=True, roi_max_side=max_side)
+    roi, t_roi = run(roi_tracker, frames)
+
+    both = [(a, b) for a, b in zip(full, roi) if len(a) and len(b)]
+    error = np.mean([np.linalg.norm(a[0, :, :2] - b[0, :, :2], axis=1).mean() for a, b in both]) if both else float("nan")
+    agree = np.mean([directions_from_index(a)[0] == directions_from_index(b)[0] for a, b in both]) if both else float("nan")
+
+    print(f"\n=== {path} ({len(frames)} frames) ===")
+    print(f"full : {t_full.mean() * 1e3:6.2f} ms/frame (p95 {np.percentile(t_full, 95) * 1e3:6.2f}), "
+          f"hand detected {np.mean([len(a) > 0 for a in full]) * 100:5.1f}%")
+    print(f"roi  : {t_roi.mean() * 1e3:6.2f} ms/frame (p95 {np.percentile(t_roi, 95) * 1e3:6.2f}), "
+          f"hand detected {np.mean([len(b) > 0 for b in roi]) * 100:5.1f}%, fallbacks {roi_tracker.roi_fallbacks}")
+    print(f"saving: {(1 - t_roi.mean() / t_full.mean()) * 100:5.1f}%  "
+          f"mean landmark offset {error:.2f}px  direction agreement {agree * 100:.1f}%")
+    return t_full.sum(), t_roi.sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("videos", nargs="+")
+    parser.add_argument("--max-side", type=int, default=None, help="downscale crops larger than this")
+    parser.add_argument("--max-frames", type=int, default=2000)
+    args = parser.parse_args()
+
+    total_full = total_roi = 0.0
+    for path in args.videos:
+        frames = read_frames(path, args.max_frames)
+        if not frames:
+            print(f"{path}: no frames")
+            continue
+        t_full, t_roi = compare(path, frames, args.max_side)
+        total_full += t_full
+        total_roi += t_roi
+    if total_full:
+        print(f"\nTotal inference time saving: {(1 - total_roi / total_full) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
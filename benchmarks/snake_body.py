@@ -0,0 +1,110 @@
+"""
+SnakeGame.update cost with very long snakes on large boards (headless).
+
+    python -m benchmarks.snake_body [--lengths 1000 10000 100000] [--steps 2000]
+
+"list" is the previous body representation (list.insert(0, ...), list.pop()
+and `head in list`); "deque" is SnakeGame (deque + occupancy set). The snake
+is laid on a serpentine path over a square board and follows it, so every
+update moves the snake without collision. Also reports how often the old
+food placement lands on the snake when it covers 90% of the board.
+"""
+import argparse
+import random
+import time
+
+from games.snake import SnakeGame
+
+CELL = 20
+
+
+class ListSnake(SnakeGame):
+    """SnakeGame with the previous list body, for comparison."""
+
+    snake = None  # plain attribute instead of the deque property
+
+    def update(self, gesture):
+        self.direction = gesture
+        head = (self.snake[0][0] + self.direction[0], self.snake[0][1] + self.direction[1])
+        if head[0] < 0 or head[0] >= self.width or head[1] < 0 or head[1] >= self.height:
+            self.game_over = True
+            return
+        if head in self.snake:
+            self.game_over = True
+            return
+        self.snake.insert(0, head)
+        if head == self.food:
+            self.food = (self.rng.randrange(0, self.width, CELL), self.rng.randrange(0, self.height, CELL))
+        else:
+            self.snake.pop()
+
+
+class DequeSnake(SnakeGame):
+    def update(self, gesture):
+        self.direction = gesture
+        self.frame_count = self.move_delay
+        super().update(None)
+
+
+def serpentine(side):
+    """Cells of a side x side board, row by row, alternating direction."""
+    for row in range(side):
+        cols = range(side) if row % 2 == 0 else range(side - 1, -1, -1)
+        for col in cols:
+            yield (col * CELL, row * CELL)
+
+
+def make_game(cls, side, path, length):
+    game = cls(None, seed=0)
+    game.width = game.height = side * CELL
+    game.snake = list(reversed(path[:length]))
+    game.food = path[-1]
+    return game
+
+
+def time_updates(cls, side, path, length, steps):
+    game = make_game(cls, side, path, length)
+    moves = [(path[i + 1][0] - path[i][0], path[i + 1][1] - path[i][1])
+             for i in range(length - 1, length - 1 + steps)]
+    start = time.perf_counter()
+    for move in moves:
+        game.update(move)
+    elapsed = time.perf_counter() - start
+    assert not game.game_over and len(game.snake) == length
+    return elapsed / steps
+
+
+def food_on_snake_rate(side, coverage, draws, seed=0):
+    path = list(serpentine(side))
+    game = SnakeGame(None, seed=seed)
+    game.width = game.height = side * CELL
+    game.snake = path[:int(len(path) * coverage)]
+    rng = random.Random(seed)
+    old = sum((rng.randrange(0, game.width, CELL), rng.randrange(0, game.height, CELL)) in game._occupied
+              for _ in range(draws))
+    start = time.perf_counter()
+    new = sum(game.spawn_food() in game._occupied for _ in range(draws))
+    return old / draws, new / draws, (time.perf_counter() - start) / draws
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--steps", type=int, default=2000)
+    args = parser.parse_args()
+
+    for length in args.lengths:
+        side = int((length + args.steps + 2) ** 0.5) + 1
+        path = list(serpentine(side))
+        row = [f"length {length:>6} on {side}x{side}:"]
+        for name, cls in (("list", ListSnake), ("deque", DequeSnake)):
+            row.append(f"{name} {time_updates(cls, side, path, length, args.steps) * 1e6:9.2f} us/update")
+        print("  ".join(row))
+
+    old, new, t = food_on_snake_rate(side=100, coverage=0.9, draws=2000)
+    print(f"food on the snake at 90% coverage: old {old * 100:.1f}%, new {new * 100:.1f}% "
+          f"({t * 1e6:.0f} us/spawn)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Startup import cost of the entry points, measured with `python -X importtime`.
+
+    python -m benchmarks.startup [FILE ...] [--top 5] [--budget-ms MS]
+
+For each script (default: main.py and the utils command-line tools), the
+module-level import statements are extracted with `ast` and executed in
+a fresh interpreter under -X importtime, without running the script
+itself (no window, camera or log file). Reports the total import time
+and the heaviest top-level packages. Imports inside functions (lazy
+imports) are not counted, which is the point. With --budget-ms, exits
+with status 1 when an entry point exceeds the budget, so a heavy import
+creeping back into a startup path is caught.
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FILES = [
+    "main.py",
+    "utils/replay.py",
+    "utils/metrics.py",
+    "utils/sessions.py",
+    "utils/batch_analysis.py",
+    "utils/gesture_latency.py",
+    "utils/gesture_model.py",
+    "utils/sweep.py",
+    "utils/analysis.py",
+    "utils/analysis_2.py",
+    "utils/mean.py",
+    "utils/plots.py",
+]
+
+
+def module_level_imports(path):
+    """Source of the import statements at module level (also under if/try blocks)."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    statements = []
+
+    def visit(body):
+        for node in body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                statements.append(ast.unparse(node))
+            elif isinstance(node, (ast.If, ast.Try)):
+                visit(node.body)
+                for handler in getattr(node, "handlers", []):
+                    visit(handler.body)
+                visit(node.orelse)
+    visit(tree.body)
+    return "\n".join(statements)
+
+
+def import_times(code):
+    """Run `code` under -X importtime; returns {top-level module: cumulative us}."""
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(errors[-1] if errors else "exit status %d" % proc.returncode)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # nested imports are indented
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", default=DEFAULT_FILES)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    over_budget = []
+    for path in args.files:
+        code = module_level_imports(os.path.join(ROOT, path))
+        try:
+            times = import_times(code)
+        except RuntimeError as exc:
+            print(f"{path:<26} import failed: {exc}")
+            continue
+        total_ms = sum(times.values()) / 1000
+        heaviest = sorted(times.items(), key=lambda item: -item[1])[:args.top]
+        details = ", ".join(f"{name} {us / 1000:.0f}" for name, us in heaviest)
+        print(f"{path:<26} {total_ms:7.1f} ms   ({details})")
+        if args.budget_ms is not None and total_ms > args.budget_ms:
+            over_budget.append(path)
+
+    if over_budget:
+        print(f"over the {args.budget_ms:g} ms budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
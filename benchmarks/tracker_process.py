@@ -0,0 +1,131 @@
+"""
+In-process vs process-isolated tracker: inference throughput and UI jitter.
+
+    python -m benchmarks.tracker_process [--seconds 5] [--busy-ms 20] [--ui-ms 4] [--repeat 5]
+
+A CameraPipeline is fed 640x480 frames at 30 FPS by a synthetic camera,
+while the main thread plays a 30 FPS "game loop" doing --ui-ms of Python
+work per frame. The tracker is BusyTracker: --busy-ms of pure-Python work
+per frame, holding the GIL like MediaPipe's Python-side pre/post
+processing (MediaPipe itself cannot be assumed installed). It runs either
+in the inference thread (HandTracker's path) or in a tracker_process
+server through shared memory. Reports inference frames/s and the UI
+frame work time and pacing error (p50/p95/p99, ms) of every run, then,
+over --repeat runs of each path (alternated, so drifts of the machine hit
+both), the median and the min-max of the throughput and the p95s.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from hand_detection.pipeline import CameraPipeline
+from hand_detection.tracker_process import ProcessHandTracker
+from utils.movements import HAND_INFO_DTYPE, LANDMARK_COUNT
+
+
+class BusyTracker:
+    """Stand-in for HandTracker: `busy_ms` of GIL-holding work, one hand at the frame center."""
+
+    def __init__(self, busy_ms=20.0, max_hands=1):
+        self.busy_ms = busy_ms
+        self.hand_info = np.zeros(1, dtype=HAND_INFO_DTYPE)
+
+    def process_rgb(self, rgb, timestamp=None):
+        end = time.perf_counter() + self.busy_ms / 1e3
+        while time.perf_counter() < end:
+            sum(range(200))
+        h, w = rgb.shape[:2]
+        landmarks = np.full((1, LANDMARK_COUNT, 3), (w / 2, h / 2, 0), dtype=np.float32)
+        rgb[h // 2 - 2:h // 2 + 2, w // 2 - 2:w // 2 + 2] = 255
+        return landmarks
+
+    def get_landmarks_rgb(self, frame, timestamp=None):
+        rgb = frame[:, :, ::-1].copy()
+        return self.process_rgb(rgb, timestamp), rgb
+
+
+class SyntheticCamera:
+    def __init__(self, fps=30.0, shape=(480, 640, 3)):
+        self.period = 1.0 / fps
+        self.frame = np.random.default_rng(0).integers(0, 256, size=shape, dtype=np.uint8)
+        self._next = time.perf_counter()
+
+    def read(self):
+        self._next += self.period
+        delay = self._next - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        return True, self.frame.copy()
+
+    def release(self):
+        pass
+
+
+def ui_loop(pipeline, seconds, ui_ms, fps=30.0):
+    """30 FPS loop doing `ui_ms` of Python work; returns (work ms, pacing error ms) per frame."""
+    period = 1.0 / fps
+    work, error = [], []
+    deadline = time.perf_counter() + seconds
+    next_frame = time.perf_counter()
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        error.append((start - next_frame) * 1e3)
+        pipeline.latest()
+        end = start + ui_ms / 1e3
+        while time.perf_counter() < end:
+            sum(range(200))
+        work.append((time.perf_counter() - start) * 1e3)
+        next_frame += period
+        delay = next_frame - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            next_frame = time.perf_counter()
+    return np.array(work), np.array(error)
+
+
+def run(label, tracker, seconds, ui_ms):
+    pipeline = CameraPipeline(SyntheticCamera(), tracker).start()
+    time.sleep(0.5)     # warm-up
+    frames_before = pipeline.results.put_count
+    start = time.perf_counter()
+    work, error = ui_loop(pipeline, seconds, ui_ms)
+    throughput = (pipeline.results.put_count - frames_before) / (time.perf_counter() - start)
+    pipeline.release()
+    p = lambda a: "/".join(f"{v:.1f}" for v in np.percentile(a, (50, 95, 99)))
+    print(f"{label:<12} inference {throughput:5.1f} frames/s   UI work {p(work)} ms   "
+          f"UI lateness {p(error)} ms  (p50/p95/p99)")
+    return throughput, np.percentile(work, 95), np.percentile(error, 95)
+
+
+def summary(label, runs):
+    """Median [min-max] over the runs of one path."""
+    columns = np.array(runs).T
+    s = lambda a, f: f"{np.median(a):{f}} [{a.min():{f}}-{a.max():{f}}]"
+    print(f"{label:<12} inference {s(columns[0], '.1f')} frames/s   UI work p95 {s(columns[1], '.1f')} ms   "
+          f"UI lateness p95 {s(columns[2], '.1f')} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--busy-ms", type=float, default=20.0)
+    parser.add_argument("--ui-ms", type=float, default=4.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPU(s), tracker {args.busy_ms:g} ms/frame, UI work {args.ui_ms:g} ms/frame")
+    runs = {"in-process": [], "process": []}
+    for _ in range(args.repeat):
+        runs["in-process"].append(run("in-process", BusyTracker(args.busy_ms), args.seconds, args.ui_ms))
+        tracker = ProcessHandTracker(factory="benchmarks.tracker_process:BusyTracker", busy_ms=args.busy_ms)
+        runs["process"].append(run("process", tracker, args.seconds, args.ui_ms))
+    print(f"median [min-max] over {args.repeat} runs:")
+    for label, results in runs.items():
+        summary(label, results)
+
+
+if __name__ == "__main__":
+    main()
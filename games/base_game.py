@@ -9,8 +9,23 @@ class BaseGame:
         """Update game state based on gesture input."""
         raise NotImplementedError
 
+    def state(self):
+        """Snapshot of the game state (dict), for headless use."""
+        raise NotImplementedError
+
+    def step(self, gesture):
+        """
+        Headless stepping: advance the game by one tick with `gesture` and
+        return state(). No drawing, no event handling, no clock.
+        """
+        self.update(gesture)
+        return self.state()
+
     def draw(self):
-        """Render the game frame."""
+        """
+        Render the game frame. May return the list of rects that changed
+        (for pygame.display.update); None means the whole frame changed.
+        """
         raise NotImplementedError
 
     def run(self, gesture_func):
@@ -24,6 +39,9 @@ class BaseGame:
                     self.running = False
             gesture = gesture_func()
             self.update(gesture)
-            self.draw()
-            pygame.display.flip()
+            dirty = self.draw()
+            if dirty is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty)
             clock.tick(15)
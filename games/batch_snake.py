@@ -0,0 +1,145 @@
+"""
+Vectorized Snake: thousands of independent games advanced together in
+NumPy arrays, for gesture-policy experiments and fuzzing the game rules.
+
+The rules are those of SnakeGame.step (one move per step, reversing is
+ignored, walls and the body end the game, food is placed on a free cell),
+on a board measured in cells instead of pixels. Gestures are int8 codes
+into utils.movements.DIRECTIONS (0 LEFT, 1 UP, 2 DOWN, 3 RIGHT), -1 for
+no gesture; encode_gestures converts strings.
+
+    sim = BatchSnake(4096, seed=0)
+    state = sim.step(policy(sim.state()))
+    sim.reset(state["game_over"])
+"""
+import numpy as np
+
+from utils.movements import DIRECTIONS
+
+# cell offsets per direction code; the opposite of code d is 3 - d
+DX = np.array([-1, 0, 0, 1], dtype=np.int16)
+DY = np.array([0, -1, 1, 0], dtype=np.int16)
+NO_GESTURE = -1
+
+
+def encode_gestures(gestures):
+    """Gesture strings (or None) -> int8 codes for BatchSnake.step."""
+    index = {name: code for code, name in enumerate(DIRECTIONS)}
+    return np.array([index.get(g, NO_GESTURE) for g in gestures], dtype=np.int8)
+
+
+class BatchSnake:
+    def __init__(self, n, cols=40, rows=30, seed=None, max_food_draws=16):
+        """
+        n games on a cols x rows board (SnakeGame: 800x600 px, 20 px cells).
+        Bodies are ring buffers of cell indices with an occupancy grid,
+        so a step costs O(n) whatever the snake lengths.
+        """
+        self.n, self.cols, self.rows = n, cols, rows
+        self.capacity = cols * rows
+        self.max_food_draws = max_food_draws
+        self.rng = np.random.default_rng(seed)
+
+        # ring buffer of flat cell indices (y * cols + x), head at head_index
+        self.body = np.zeros((n, self.capacity), dtype=np.int16 if self.capacity <= 2**15 else np.int32)
+        self.head_index = np.zeros(n, dtype=np.int32)
+        self.length = np.zeros(n, dtype=np.int32)
+        self.head = np.zeros((n, 2), dtype=np.int16)
+        self.direction = np.zeros(n, dtype=np.int8)
+        self.food = np.zeros((n, 2), dtype=np.int16)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.grid = np.zeros((n, rows, cols), dtype=bool)
+        self._offset = np.arange(n, dtype=np.intp) * self.capacity
+        self.reset()
+
+    def reset(self, games=None):
+        """Reset all games, or those selected by an index array / boolean mask."""
+        games = np.arange(self.n) if games is None else np.asarray(games)
+        if games.dtype == bool:
+            games = np.flatnonzero(games)
+        if games.size == 0:
+            return
+        # same start as SnakeGame.reset: 4 cells heading right, head at (5, 5), food at (10, 10)
+        # (clipped to small boards)
+        start = np.array([[5 - i, 5] for i in range(4)], dtype=np.int16)
+        self.grid[games] = False
+        self.body[games, :4] = (start[:, 1] * self.cols + start[:, 0])[::-1]
+        self.head_index[games] = 3
+        self.length[games] = 4
+        self.head[games] = start[0]
+        self.direction[games] = 3
+        self.food[games] = (min(10, self.cols - 1), min(10, self.rows - 1))
+        self.game_over[games] = False
+        self.grid[games[:, None], start[:, 1], start[:, 0]] = True
+
+    def state(self):
+        """Current state as arrays (live views, copy them to keep a snapshot)."""
+        return {
+            "head": self.head,
+            "direction": self.direction,
+            "length": self.length,
+            "food": self.food,
+            "score": self.length - 4,
+            "game_over": self.game_over,
+        }
+
+    def step(self, gestures=None):
+        """Apply `gestures` (n codes, or one code for all) and move every running game once."""
+        alive = ~self.game_over
+        if gestures is not None:
+            g = np.broadcast_to(np.asarray(gestures, dtype=np.int8), (self.n,))
+            turn = alive & (g >= 0) & (g != 3 - self.direction)
+            self.direction[turn] = g[turn]
+
+        # Every game is computed with full-length arrays; games that are over
+        # (or die now) write back the values they read, so nothing changes for them.
+        d = self.direction
+        x = self.head[:, 0] + DX[d]
+        y = self.head[:, 1] + DY[d]
+        wall = (x < 0) | (x >= self.cols) | (y < 0) | (y >= self.rows)
+        cell = np.where(wall, 0, y.astype(np.intp) * self.cols + x)
+        # flat indices: the grid and the body ring both have rows * cols entries per game
+        grid = self.grid.reshape(-1)
+        body = self.body.reshape(-1)
+        head_cell = self._offset + cell
+        move = alive & ~(wall | grid[head_cell])
+        self.game_over |= alive & ~move
+
+        head_index = np.where(move, self.head_index + 1, self.head_index)
+        head_index[head_index == self.capacity] = 0
+        self.head_index[:] = head_index
+        ring = self._offset + head_index
+        body[ring] = np.where(move, cell, body[ring])
+        grid[head_cell] |= move
+        self.head[:, 0] = np.where(move, x, self.head[:, 0])
+        self.head[:, 1] = np.where(move, y, self.head[:, 1])
+
+        ate = move & (x == self.food[:, 0]) & (y == self.food[:, 1])
+        tail_cell = self._offset + body[self._offset + (head_index - self.length) % self.capacity]
+        grid[tail_cell] &= ~(move & ~ate)
+        self.length += ate
+        self._spawn_food(np.flatnonzero(ate))
+        return self.state()
+
+    def _spawn_food(self, games):
+        """Rejection sampling on the occupancy grid, then an exact draw for the few games left."""
+        for _ in range(self.max_food_draws):
+            if games.size == 0:
+                return
+            x = self.rng.integers(0, self.cols, games.size)
+            y = self.rng.integers(0, self.rows, games.size)
+            free = ~self.grid[games, y, x]
+            self.food[games[free], 0] = x[free]
+            self.food[games[free], 1] = y[free]
+            games = games[~free]
+        for i in games:
+            cells = np.flatnonzero(~self.grid[i])
+            if cells.size:  # a full board keeps its food, as in SnakeGame
+                cell = self.rng.choice(cells)
+                self.food[i] = (cell % self.cols, cell // self.cols)
+
+    def body_cells(self, i):
+        """Cells of game i, head first, as (length, 2) [x, y]."""
+        order = (self.head_index[i] - np.arange(self.length[i])) % self.capacity
+        cells = self.body[i, order]
+        return np.stack([cells % self.cols, cells // self.cols], axis=1)
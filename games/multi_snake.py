@@ -0,0 +1,226 @@
+from collections import Counter, deque
+
+from .snake import SnakeGame
+from utils.movements import open_hand_mask
+
+PLAYER_COLORS = [(0, 255, 0), (0, 160, 255), (255, 200, 0), (255, 0, 255)]
+FOOD_COLOR = (255, 0, 0)
+START_LENGTH = 4
+TURNS = {"LEFT": (-1, 0), "RIGHT": (1, 0), "UP": (0, -1), "DOWN": (0, 1)}
+
+
+class Snake:
+    """One player's snake: body cells (head first), direction, alive flag."""
+
+    def __init__(self, player, cells, direction, color):
+        self.player = player
+        self.body = deque(cells)
+        self.direction = direction
+        self.color = color
+        self.alive = True
+
+    @property
+    def score(self):
+        return max(0, len(self.body) - START_LENGTH)
+
+    def turn(self, gesture, cell_size):
+        """Apply a gesture like SnakeGame.update: any direction but a U-turn."""
+        step = TURNS.get(gesture)
+        if step is None:
+            return
+        direction = (step[0] * cell_size, step[1] * cell_size)
+        if direction != (-self.direction[0], -self.direction[1]):
+            self.direction = direction
+
+
+class MultiSnakeGame(SnakeGame):
+    """
+    N snakes on the shared board, one per player, moving at the same pace
+    as SnakeGame. update() takes one gesture per player (a sequence, None
+    entries for players without a hand). A snake dies on the walls, on
+    any body (its own or another's) and in a head-on collision; its cells
+    are then freed. There is one food per player. The game is over when
+    every snake is dead; an open hand (any hand) restarts it.
+
+    Rendering reuses SnakeGame's layers (background, sidebar, camera);
+    between full repaints only the cells whose color changed are redrawn.
+    """
+
+    def __init__(self, screen, players=2, seed=None, leaderboard=None, player=None):
+        if not 1 <= players <= len(PLAYER_COLORS):
+            raise ValueError(f"players must be between 1 and {len(PLAYER_COLORS)}")
+        self.players = players
+        self._drawn_cells = {}
+        super().__init__(screen, seed=seed, leaderboard=leaderboard, player=player)
+
+    def _own_entries(self):
+        """Scores are stored as "<player> J<n>", one entry per snake."""
+        if self.player is None:
+            return []
+        return [f"{self.player} J{i + 1}" for i in range(self.players)]
+
+    def reset(self):
+        cs = self.cell_size
+        self.game_over = False
+        self.move_delay = 6
+        self.frame_count = 0
+        # heads at x=100 on evenly spaced rows, all heading right
+        rows = self.height // cs
+        self.snakes = []
+        for p in range(self.players):
+            head_y = ((p + 1) * rows // (self.players + 1)) * cs
+            cells = [(100 - i * cs, head_y) for i in range(START_LENGTH)]
+            self.snakes.append(Snake(p, cells, (cs, 0), PLAYER_COLORS[p]))
+        self._occupied = {cell for snake in self.snakes for cell in snake.body}
+        self.foods = []
+        for _ in range(self.players):
+            self.foods.append(self._spawn_food())
+
+    @property
+    def snake(self):
+        """Body of the first snake still alive (SnakeGame compatibility)."""
+        alive = [s for s in self.snakes if s.alive]
+        return (alive or self.snakes)[0].body
+
+    @property
+    def scores(self):
+        return [s.score for s in self.snakes]
+
+    @property
+    def score(self):
+        return max(self.scores)
+
+    def update(self, gestures):
+        if self.game_over:
+            return
+        alive = [s for s in self.snakes if s.alive]
+        if gestures is not None:
+            for snake in alive:
+                if snake.player < len(gestures):
+                    snake.turn(gestures[snake.player], self.cell_size)
+
+        self.frame_count += 1
+        if self.frame_count < self.move_delay:
+            return
+        self.frame_count = 0
+
+        # every snake moves at once: collisions are checked against the
+        # bodies before this move, like SnakeGame (a tail cell is not free yet)
+        heads = {}
+        for snake in alive:
+            head = (snake.body[0][0] + snake.direction[0], snake.body[0][1] + snake.direction[1])
+            if (0 <= head[0] < self.width and 0 <= head[1] < self.height
+                    and head not in self._occupied):
+                heads[snake] = head
+            else:
+                snake.alive = False
+        collisions = Counter(heads.values())
+        for snake, head in list(heads.items()):
+            if collisions[head] > 1:
+                snake.alive = False
+                del heads[snake]
+
+        eaten = 0
+        for snake, head in heads.items():
+            snake.body.appendleft(head)
+            self._occupied.add(head)
+            if head in self.foods:
+                self.foods.remove(head)
+                eaten += 1
+            else:
+                self._occupied.discard(snake.body.pop())
+        for snake in alive:
+            if not snake.alive:
+                self._occupied.difference_update(snake.body)
+        for _ in range(eaten):
+            self.foods.append(self._spawn_food())
+
+        if not heads:
+            self.game_over = True
+
+    def state(self):
+        return {
+            "snakes": [{"player": s.player, "head": s.body[0], "direction": s.direction,
+                        "length": len(s.body), "score": s.score, "alive": s.alive} for s in self.snakes],
+            "foods": list(self.foods),
+            "game_over": self.game_over,
+        }
+
+    def _spawn_food(self):
+        """Random cell free of snakes and other food (None if the board is full)."""
+        cs = self.cell_size
+        blocked = self._occupied.union(self.foods)
+        cells = (self.width // cs) * (self.height // cs)
+        free = cells - len(blocked)
+        if free <= 0:
+            return None
+        if free * 4 >= cells:
+            while True:
+                cell = (self.rng.randrange(0, self.width, cs), self.rng.randrange(0, self.height, cs))
+                if cell not in blocked:
+                    return cell
+        free_cells = [(x, y) for y in range(0, self.height, cs) for x in range(0, self.width, cs)
+                      if (x, y) not in blocked]
+        return self.rng.choice(free_cells)
+
+    def check_restart(self, landmarks):
+        if self.game_over and open_hand_mask(landmarks).any():
+            self.reset()
+
+    # ---- rendering ---------------------------------------------------------
+
+    def _score_surface(self):
+        scores = tuple(self.scores)
+        if scores != self._score_value:
+            self._score_value = scores
+            text = "  ".join(f"J{i + 1}: {score}" for i, score in enumerate(scores))
+            self._score_surf = self._font(40).render(text, True, (255, 255, 255))
+        return self._score_surf
+
+    def _cells(self):
+        """Color of every non-empty cell, food drawn over the snakes."""
+        cells = {}
+        for snake in self.snakes:
+            if snake.alive:
+                cells.update(dict.fromkeys(snake.body, snake.color))
+        for food in self.foods:
+            if food is not None:
+                cells[food] = FOOD_COLOR
+        return cells
+
+    def _draw_full(self):
+        self.screen.fill((0, 0, 0))
+        self.screen.blit(self._background_surface(), (0, 0))
+        self._draw_sidebar()
+        if self.game_over:
+            self._draw_game_over()
+            self._drawn_cells = {}
+        else:
+            self._drawn_cells = self._cells()
+            for cell, color in self._drawn_cells.items():
+                self._paint_cell(cell, color)
+
+    def draw(self):
+        sidebar_changed = self._update_sidebar()
+
+        if self._full_redraw or self.game_over != self._drawn_game_over or (self.game_over and sidebar_changed):
+            self._full_redraw = False
+            self._drawn_game_over = self.game_over
+            self._draw_full()
+            dirty = [self.screen.get_rect()]
+        else:
+            dirty = []
+            if sidebar_changed:
+                dirty.append(self._draw_sidebar())
+            if not self.game_over:
+                cells = self._cells()
+                for cell in self._drawn_cells.keys() - cells.keys():
+                    dirty.append(self._erase_cell(cell))
+                for cell, color in cells.items():
+                    if self._drawn_cells.get(cell) != color:
+                        dirty.append(self._paint_cell(cell, color))
+                self._drawn_cells = cells
+
+        if self.cam_surf is not None:
+            dirty.append(self.screen.blit(self.cam_surf, self.cam_pos))
+        return dirty
@@ -0,0 +1,86 @@
+from utils.movements import hand_present
+
+NO_HAND_FRAMES_TO_PAUSE = 5    # require 5 consecutive frames with no hand to pause
+HAND_FRAMES_TO_RESUME = 3      # require 3 consecutive frames with a hand to resume
+
+
+class PauseHysteresis:
+    """Pause after N frames without a hand, resume after M frames with one."""
+
+    def __init__(self, frames_to_pause=NO_HAND_FRAMES_TO_PAUSE, frames_to_resume=HAND_FRAMES_TO_RESUME):
+        self.frames_to_pause = frames_to_pause
+        self.frames_to_resume = frames_to_resume
+        self.reset()
+
+    def reset(self):
+        self.no_hand_counter = 0
+        self.hand_counter = 0
+        self.paused = False
+        self.just_paused = False
+
+    def update(self, is_hand):
+        """Feed one frame; returns the pause state."""
+        if not is_hand:
+            self.no_hand_counter += 1
+            self.hand_counter = 0
+        else:
+            self.hand_counter += 1
+            self.no_hand_counter = 0
+
+        self.just_paused = False
+        if self.no_hand_counter >= self.frames_to_pause and not self.paused:
+            self.paused = True
+            self.just_paused = True
+
+        if self.hand_counter >= self.frames_to_resume and self.paused:
+            self.paused = False
+        return self.paused
+
+
+class GameSession:
+    """
+    Per-frame game logic shared by main.py and the offline replay:
+    pause hysteresis, game update, restart with an open hand and score
+    reporting on game over. No drawing and no timing.
+
+    After step(), the attributes describe the frame for logging:
+    hand_detected, gesture (None when the pause just started), paused and
+    frame_game_over (game state at the start of the frame).
+    """
+
+    def __init__(self, game, pause=None, on_game_over=None):
+        self.game = game
+        self.pause = pause if pause is not None else PauseHysteresis()
+        self.on_game_over = on_game_over
+        self.hand_detected = False
+        self.gesture = None
+        self.paused = False
+        self.frame_game_over = game.game_over
+
+    def step(self, landmarks, gesture):
+        game = self.game
+        self.frame_game_over = game.game_over
+        self.hand_detected = hand_present(landmarks)
+
+        if not game.game_over:
+            self.pause.update(self.hand_detected)
+            if self.pause.just_paused:
+                gesture = None  # prevent last gesture from persisting
+        else:
+            # Reset counters when game is over
+            self.pause.reset()
+        self.gesture = gesture
+        self.paused = self.pause.paused
+        if self.paused:
+            return
+
+        game.update(gesture)
+
+        # report the score once when the game becomes over
+        if game.game_over and not self.frame_game_over and self.on_game_over is not None:
+            self.on_game_over(game.score)
+
+        if landmarks is not None and game.game_over:
+            game.check_restart(landmarks)
+            if not game.game_over:
+                self.pause.reset()
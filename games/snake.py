@@ -1,5 +1,6 @@
 import pygame
 import random
+from collections import deque
 from .base_game import BaseGame
 from utils.movements import detect_open_hand
 from utils.leaderboard import Leaderboard
@@ -55,16 +56,50 @@ def render_wrapped_text(text, font, color, max_width, line_spacing=4):
 
 
 class SnakeGame(BaseGame):
-    def __init__(self, screen):
+    def __init__(self, screen, seed=None, leaderboard=None, player=None):
         super().__init__(screen)
+        self.rng = random.Random(seed)
         self.cell_size = 20
         self.width, self.height = 800, 600
         self.cam_pos = (820, 20)
         self.cam_surf = None
+        # Render caches: fonts and text surfaces are only rebuilt when their
+        # content changes (score value, leaderboard change notification).
+        self.leaderboard = leaderboard
+        # nom sous lequel le score sera enregistré : son entrée est exclue du rang
+        self.player = player
+        self._fonts = {}
+        self._score_surf = None
+        self._score_value = None
+        self._leaderboard_surf = None
+        self._rank_key = None
+        self._rank_surfs = None
+        self._game_over_surfs = None
+        # Dirty-rectangle state: what is currently on screen
+        self.sidebar_rect = pygame.Rect(self.width, 260, 400, 340)
+        self._background = None
+        self._full_redraw = True
+        self._drawn_snake = set()
+        self._drawn_food = None
+        self._drawn_score = None
+        self._drawn_leaderboard = None
+        self._drawn_rank = None
+        self._drawn_game_over = None
+        if leaderboard is not None:
+            leaderboard.subscribe(self._invalidate_leaderboard)
         self.reset()
 
+    @property
+    def snake(self):
+        """Body cells, head first (deque); self._occupied holds the same cells as a set."""
+        return self._snake
+
+    @snake.setter
+    def snake(self, cells):
+        self._snake = deque(cells)
+        self._occupied = set(self._snake)
+
     def reset(self):
-        self.snake = [(100, 100)]
         self.direction = (self.cell_size, 0)
         self.food = (200, 200)
         self.game_over = False
@@ -74,6 +109,9 @@ class SnakeGame(BaseGame):
         length = 4
         self.snake = [(head_x - i * self.cell_size, head_y) for i in range(length)]
 
+    @property
+    def score(self):
+        return max(0, len(self.snake) - 4)
 
     def update(self, gesture):
         if self.game_over:
@@ -101,53 +139,232 @@ class SnakeGame(BaseGame):
             self.game_over = True
             return
 
-        if head in self.snake:
+        if head in self._occupied:
             self.game_over = True
             return
 
-        self.snake.insert(0, head)
+        self._snake.appendleft(head)
+        self._occupied.add(head)
 
         if head == self.food:
-            self.food = (random.randrange(0, self.width, self.cell_size),
-                         random.randrange(0, self.height, self.cell_size))
+            self.food = self.spawn_food()
         else:
-            self.snake.pop()
+            self._occupied.discard(self._snake.pop())
+
+    def step(self, gesture):
+        """One snake move per call (move_delay is a frame pacing, skipped here)."""
+        if not self.game_over:
+            self.frame_count = self.move_delay - 1
+        return super().step(gesture)
+
+    def state(self):
+        return {
+            "head": self.snake[0],
+            "direction": self.direction,
+            "length": len(self.snake),
+            "food": self.food,
+            "score": self.score,
+            "game_over": self.game_over,
+        }
 
-    def draw_grid(self):
+    def spawn_food(self):
+        """
+        Random free cell for the food. Rejection sampling while the board is
+        mostly free (a few draws on average), otherwise a draw among the
+        listed free cells. Keeps the current food if the board is full.
+        """
+        cs = self.cell_size
+        cells = (self.width // cs) * (self.height // cs)
+        free = cells - len(self._occupied)
+        if free <= 0:
+            return self.food
+        if free * 4 >= cells:
+            while True:
+                cell = (self.rng.randrange(0, self.width, cs), self.rng.randrange(0, self.height, cs))
+                if cell not in self._occupied:
+                    return cell
+        free_cells = [(x, y) for y in range(0, self.height, cs) for x in range(0, self.width, cs)
+                      if (x, y) not in self._occupied]
+        return self.rng.choice(free_cells)
+
+    def draw_grid(self, surface=None):
+        surface = self.screen if surface is None else surface
         for x in range(0, self.width, self.cell_size):
-            pygame.draw.line(self.screen, (40, 40, 40), (x, 0), (x, self.height))
+            pygame.draw.line(surface, (40, 40, 40), (x, 0), (x, self.height))
         for y in range(0, self.height, self.cell_size):
-            pygame.draw.line(self.screen, (40, 40, 40), (0, y), (self.width, y))
+            pygame.draw.line(surface, (40, 40, 40), (0, y), (self.width, y))
 
-    def draw(self):
-        font = pygame.font.Font(None, 72)
-        lb = Leaderboard()
+    def _font(self, size):
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def _invalidate_leaderboard(self):
+        self._leaderboard_surf = None
+
+    def _board(self):
+        if self.leaderboard is None:
+            self.leaderboard = Leaderboard()
+            self.leaderboard.subscribe(self._invalidate_leaderboard)
+        return self.leaderboard
+
+    def _leaderboard_surface(self):
+        if self._leaderboard_surf is None:
+            raw_leaderboard = self._board().get_top(5)
+            leaderboard_lines = [f"{i+1}. {entry['name']} - {entry['score']}" for i, entry in enumerate(raw_leaderboard)]
+            leaderboard_text = "Classement:\n" + "\n".join(leaderboard_lines)
+            self._leaderboard_surf = render_wrapped_text(leaderboard_text, self._font(36), (255, 255, 0), 300)
+        return self._leaderboard_surf
+
+    def _score_surface(self):
+        score = len(self.snake) - 4
+        if score != self._score_value:
+            self._score_value = score
+            self._score_surf = self._font(72).render(f"Score: {score}", True, (255, 255, 255))
+        return self._score_surf
+
+    def _own_entries(self):
+        """Leaderboard names this game's score is stored under."""
+        return [] if self.player is None else [self.player]
+
+    def _rank_surfaces(self):
+        """
+        (sidebar line, game-over line) with the place the current score takes
+        among the other players of the leaderboard: the stored entries of
+        this game's player(s) are left out, so a returning player is not
+        ranked against their own best, and counted once in the total.
+        Rank queries hit the leaderboard's in-memory index, and the surfaces
+        are only re-rendered when the score or the leaderboard version
+        changes, so this is cheap at every frame.
+        """
+        board = self._board()
+        key = (self.score, board.version)
+        if key != self._rank_key:
+            self._rank_key = key
+            rank, total = board.rank(self.score), board.size + 1
+            for name in self._own_entries():
+                best = board.best_score(name)
+                if best is not None:
+                    total -= 1
+                    rank -= best > self.score
+            top = max(1, round(100 * rank / total))
+            self._rank_surfs = (
+                self._font(32).render(f"Rang : {rank} / {total}", True, (180, 180, 180)),
+                self._font(40).render(f"Votre rang : {rank} / {total} (top {top} %)", True, (255, 255, 0)),
+            )
+        return self._rank_surfs
+
+    def _update_sidebar(self):
+        """Render the sidebar layers; True when they differ from what is on screen."""
+        score_surf, leaderboard_surf = self._score_surface(), self._leaderboard_surface()
+        rank_surf = self._rank_surfaces()[0]
+        changed = (score_surf is not self._drawn_score or leaderboard_surf is not self._drawn_leaderboard
+                   or rank_surf is not self._drawn_rank)
+        self._drawn_score, self._drawn_leaderboard, self._drawn_rank = score_surf, leaderboard_surf, rank_surf
+        return changed
+
+    def invalidate(self):
+        """Force the next draw() to repaint the whole window (e.g. after an overlay)."""
+        self._full_redraw = True
+
+    def _background_surface(self):
+        """Board background with the grid, rendered once."""
+        if self._background is None:
+            self._background = pygame.Surface((self.width, self.height)).convert(self.screen)
+            self._background.fill((0, 0, 0))
+            self.draw_grid(self._background)
+        return self._background
+
+    def _cell_rect(self, cell):
+        return pygame.Rect(cell[0], cell[1], self.cell_size, self.cell_size)
+
+    def _erase_cell(self, cell):
+        rect = self._cell_rect(cell)
+        self.screen.blit(self._background_surface(), rect, rect)
+        return rect
+
+    def _paint_cell(self, cell, color):
+        rect = self._cell_rect(cell)
+        pygame.draw.rect(self.screen, color, rect)
+        return rect
+
+    def _draw_sidebar(self):
+        self.screen.fill((0, 0, 0), self.sidebar_rect)
+        self.screen.blit(self._drawn_rank, (820, 268))
+        self.screen.blit(self._drawn_score, (820, 300))
+        self.screen.blit(self._drawn_leaderboard, (820, 360))
+        return self.sidebar_rect
+
+    def _draw_game_over(self):
+        if self._game_over_surfs is None:
+            self._game_over_surfs = (
+                self._font(72).render("FIN DU JEU", True, (255, 0, 0)),
+                self._font(48).render("Ouvrez votre main pour recommencer", True, (255, 255, 255)),
+            )
+        msg, sub_msg = self._game_over_surfs
+        self.screen.blit(msg, (self.width // 4, self.height // 2 - 40))
+        self.screen.blit(sub_msg, (self.width // 5, self.height // 2 + 20))
+        self.screen.blit(self._rank_surfaces()[1], (self.width // 5, self.height // 2 + 80))
+
+    def _draw_full(self):
         self.screen.fill((0, 0, 0))
-        self.draw_grid()
-        msg_score = font.render(f"Score: {len(self.snake) - 4}", True, (255, 255, 255))
-        raw_leaderboard = lb.get_top(5)
-        leaderboard_lines = [f"{i+1}. {entry['name']} - {entry['score']}" for i, entry in enumerate(raw_leaderboard)]
-        leaderboard_text = "Classement:\n" + "\n".join(leaderboard_lines)
-        msg_leaderboard = render_wrapped_text(leaderboard_text, pygame.font.Font(None, 36), (255, 255, 0), 300)
-        self.screen.blit(msg_score, (820, 300))
-        self.screen.blit(msg_leaderboard, (820, 360))
+        self.screen.blit(self._background_surface(), (0, 0))
+        self._draw_sidebar()
 
         if self.game_over:
-            msg = font.render("FIN DU JEU", True, (255, 0, 0))
-            sub_font = pygame.font.Font(None, 48)
-            sub_msg = sub_font.render("Ouvrez votre main pour recommencer", True, (255, 255, 255))
-
-            self.screen.blit(self.cam_surf, self.cam_pos)
-            self.screen.blit(msg, (self.width // 4, self.height // 2 - 40))
-            self.screen.blit(sub_msg, (self.width // 5, self.height // 2 + 20))
-            pygame.display.flip()
-            return
+            self._draw_game_over()
+            self._drawn_snake = set()
+            self._drawn_food = None
+        else:
+            for segment in self.snake:
+                self._paint_cell(segment, (0, 255, 0))
+            self._paint_cell(self.food, (255, 0, 0))
+            self._drawn_snake = set(self._occupied)
+            self._drawn_food = self.food
 
-        for segment in self.snake:
-            pygame.draw.rect(self.screen, (0, 255, 0), (*segment, self.cell_size, self.cell_size))
+    def draw(self):
+        """
+        Draw the frame and return the list of screen rects that changed, for
+        pygame.display.update(rects). The grid is a pre-rendered background;
+        between full repaints only the snake cells that appeared/disappeared,
+        the food, the sidebar (when score, rank or leaderboard change) and
+        the camera preview are redrawn.
+        """
+        sidebar_changed = self._update_sidebar()
+
+        # the game-over screen shows the rank too: repaint it when that moves
+        if self._full_redraw or self.game_over != self._drawn_game_over or (self.game_over and sidebar_changed):
+            self._full_redraw = False
+            self._drawn_game_over = self.game_over
+            self._draw_full()
+            dirty = [self.screen.get_rect()]
+        else:
+            dirty = []
+            if sidebar_changed:
+                dirty.append(self._draw_sidebar())
+            if not self.game_over:
+                snake = set(self._occupied)
+                removed, added = self._drawn_snake - snake, snake - self._drawn_snake
+                for cell in removed:
+                    if cell != self.food:
+                        dirty.append(self._erase_cell(cell))
+                if self.food != self._drawn_food and self._drawn_food is not None:
+                    if self._drawn_food in snake:
+                        dirty.append(self._paint_cell(self._drawn_food, (0, 255, 0)))
+                    else:
+                        dirty.append(self._erase_cell(self._drawn_food))
+                for cell in added:
+                    dirty.append(self._paint_cell(cell, (0, 255, 0)))
+                # food is drawn on top of the snake, as in a full repaint
+                if self.food != self._drawn_food or self.food in removed or self.food in added:
+                    dirty.append(self._paint_cell(self.food, (255, 0, 0)))
+                self._drawn_snake = snake
+                self._drawn_food = self.food
 
-        pygame.draw.rect(self.screen, (255, 0, 0), (*self.food, self.cell_size, self.cell_size))
-        self.screen.blit(self.cam_surf, self.cam_pos)
+        if self.cam_surf is not None:
+            dirty.append(self.screen.blit(self.cam_surf, self.cam_pos))
+        return dirty
 
     def check_restart(self, landmarks):
         if self.game_over and detect_open_hand(landmarks):
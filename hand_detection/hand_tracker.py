@@ -1,27 +1,210 @@
+import time
+
 import cv2
+import numpy as np
 import mediapipe as mp
 
+from utils.filters import OneEuroFilter
+from utils.movements import HAND_INFO_DTYPE, LANDMARK_COUNT
+
+HANDEDNESS = {"Left": 0, "Right": 1}
+HAND_CONNECTIONS = sorted(mp.solutions.hands.HAND_CONNECTIONS)
+
 class HandTracker:
-    def __init__(self, max_hands=1):
+    def __init__(self, max_hands=1, rgb_buffers=3, roi=False, roi_padding=0.35,
+                 roi_min_size=96, roi_max_side=None, scheduler=None, smoothing="one_euro"):
+        """
+        - roi: run the model on a padded crop around the hand(s) found in the
+          previous frame instead of the full frame; falls back to full-frame
+          detection when no hand is found in the crop.
+        - roi_padding: margin added around the landmarks' bounding box, as a
+          fraction of its largest side.
+        - roi_min_size: minimum crop side in pixels.
+        - roi_max_side: if set, crops larger than this are downscaled before
+          inference (landmarks are normalized, so no remapping is needed).
+        - scheduler: optional InferenceScheduler choosing the inference
+          resolution and stride; on skipped frames the landmarks are
+          extrapolated from the last two inferences.
+        - smoothing: landmark filter called as filter(landmarks, timestamp);
+          "one_euro" (default) builds a OneEuroFilter, None disables it.
+        """
         self.hands = mp.solutions.hands.Hands(
             max_num_hands=max_hands,
             min_detection_confidence=0.7,
             min_tracking_confidence=0.5
         )
-        self.mp_draw = mp.solutions.drawing_utils
+        self.roi = roi
+        self.roi_padding = roi_padding
+        self.roi_min_size = roi_min_size
+        self.roi_max_side = roi_max_side
+        self._roi_box = None        # (x0, y0, x1, y1) used for the next frame
+        self.roi_fallbacks = 0      # frames where the crop lost the hand
+        self.scheduler = scheduler
+        self._inferred = []         # last two (frame_number, landmarks) actually inferred
+        self._frame_number = 0
+        if smoothing == "one_euro":
+            smoothing = OneEuroFilter()
+        self.smoothing = smoothing
+        # Small ring of reusable RGB frames: a consumer can still read the previous
+        # frame(s) while the next one is being converted.
+        self._rgb_ring = [None] * rgb_buffers
+        self._rgb_index = 0
+        # metadata of the hands returned by the last get_landmarks* call
+        self.hand_info = np.zeros(0, dtype=HAND_INFO_DTYPE)
+
+    def _next_rgb_buffer(self, frame):
+        self._rgb_index = (self._rgb_index + 1) % len(self._rgb_ring)
+        buf = self._rgb_ring[self._rgb_index]
+        if buf is None or buf.shape != frame.shape:
+            buf = np.empty_like(frame)
+            self._rgb_ring[self._rgb_index] = buf
+        return buf
+
+    def _landmarks_from_results(self, results, frame_shape):
+        """
+        Convert MediaPipe results to a (hands, 21, 3) float32 array of
+        (x, y, z) in pixels (z uses the same scale as x), plus the per-hand
+        metadata as a HAND_INFO_DTYPE array.
+        """
+        hands = results.multi_hand_landmarks or []
+        landmarks = np.empty((len(hands), LANDMARK_COUNT, 3), dtype=np.float32)
+        info = np.zeros(len(hands), dtype=HAND_INFO_DTYPE)
+        if not hands:
+            return landmarks, info
+
+        h, w = frame_shape[:2]
+        for i, handLms in enumerate(hands):
+            landmarks[i] = [(lm.x, lm.y, lm.z) for lm in handLms.landmark]
+        landmarks *= np.array([w, h, w], dtype=np.float32)
+
+        for i, handedness in enumerate(results.multi_handedness or []):
+            label = handedness.classification[0]
+            info[i] = (HANDEDNESS.get(label.label, -1), label.score)
+        return landmarks, info
+
+    def _process_region(self, rgb, box, max_side=None, scale=1.0):
+        """Run the model on rgb[box] and return landmarks in full-frame pixels."""
+        x0, y0, x1, y1 = box
+        image = rgb[y0:y1, x0:x1]
+        side = max(x1 - x0, y1 - y0)
+        if scale < 1.0:
+            max_side = min(max_side or side, int(side * scale))
+        if max_side and side > max_side:
+            scale = max_side / side
+            image = cv2.resize(image, (max(1, int((x1 - x0) * scale)), max(1, int((y1 - y0) * scale))),
+                               interpolation=cv2.INTER_AREA)
+        results = self.hands.process(np.ascontiguousarray(image))
+        landmarks, info = self._landmarks_from_results(results, (y1 - y0, x1 - x0))
+        landmarks[:, :, 0] += x0
+        landmarks[:, :, 1] += y0
+        return landmarks, info
+
+    def _next_roi(self, landmarks, frame_shape):
+        """
+        Padded square box around all hands, clipped to the frame. The previous
+        box is kept while the hands stay well inside it, so MediaPipe's own
+        frame-to-frame tracking sees a stable image.
+        """
+        if len(landmarks) == 0:
+            return None
+        h, w = frame_shape[:2]
+        points = landmarks[:, :, :2].reshape(-1, 2)
+        (bx0, by0), (bx1, by1) = points.min(axis=0), points.max(axis=0)
+        side = max(bx1 - bx0, by1 - by0)
+        margin = self.roi_padding * side
+
+        if self._roi_box is not None:
+            x0, y0, x1, y1 = self._roi_box
+            inner = margin / 2
+            if bx0 - inner >= x0 and by0 - inner >= y0 and bx1 + inner <= x1 and by1 + inner <= y1:
+                return self._roi_box
 
-    def get_landmarks(self, frame):
+        half = max(side / 2 + margin, self.roi_min_size / 2)
+        cx, cy = (bx0 + bx1) / 2, (by0 + by1) / 2
+        x0, y0 = int(max(0, cx - half)), int(max(0, cy - half))
+        x1, y1 = int(min(w, cx + half)), int(min(h, cy + half))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        return x0, y0, x1, y1
+
+    def _infer(self, rgb, scale=1.0):
+        h, w = rgb.shape[:2]
+        if self.roi and self._roi_box is not None:
+            landmarks, info = self._process_region(rgb, self._roi_box, self.roi_max_side, scale)
+            if len(landmarks) == 0:
+                # tracking lost in the crop: full-frame detection on the same frame
+                self.roi_fallbacks += 1
+                self._roi_box = None
+                landmarks, info = self._process_region(rgb, (0, 0, w, h), scale=scale)
+        else:
+            landmarks, info = self._process_region(rgb, (0, 0, w, h), scale=scale)
+
+        if self.roi:
+            self._roi_box = self._next_roi(landmarks, rgb.shape)
+        return landmarks, info
+
+    def _extrapolate(self):
+        """Constant-velocity prediction from the last two inferences (skipped frames)."""
+        n1, last = self._inferred[-1]
+        if len(self._inferred) < 2 or self._inferred[0][1].shape != last.shape:
+            return last.copy()
+        n0, prev = self._inferred[0]
+        return last + (last - prev) * ((self._frame_number - n1) / (n1 - n0))
+
+    def _detect(self, rgb, timestamp=None):
+        self._frame_number += 1
+        if self.scheduler is None:
+            landmarks, info = self._infer(rgb)
+        elif not self.scheduler.should_infer() and self._inferred:
+            landmarks, info = self._extrapolate(), self.hand_info
+        else:
+            with self.scheduler.timed():
+                landmarks, info = self._infer(rgb, self.scheduler.scale)
+            self._inferred = self._inferred[-1:] + [(self._frame_number, landmarks)]
+
+        if self.smoothing is not None and len(landmarks):
+            landmarks = self.smoothing(landmarks, time.monotonic() if timestamp is None else timestamp)
+        return landmarks, info
+
+    @staticmethod
+    def draw_hands(image, landmarks, landmark_color=(0, 0, 255), connection_color=(255, 255, 255)):
+        """Draw the hand skeleton(s) on image (colors in the image's channel order)."""
+        for hand in landmarks:
+            pts = hand[:, :2].astype(np.int32)
+            for a, b in HAND_CONNECTIONS:
+                cv2.line(image, tuple(pts[a]), tuple(pts[b]), connection_color, 2)
+            for p in pts:
+                cv2.circle(image, tuple(p), 2, landmark_color, 2)
+
+    def get_landmarks(self, frame, timestamp=None):
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb)
-        landmarks = []
-
-        if results.multi_hand_landmarks:
-            for handLms in results.multi_hand_landmarks:
-                h, w, _ = frame.shape
-                hand_points = []
-                for lm in handLms.landmark:
-                    hand_points.append((int(lm.x * w), int(lm.y * h)))
-                landmarks.append(hand_points)
-                self.mp_draw.draw_landmarks(frame, handLms, mp.solutions.hands.HAND_CONNECTIONS)
+        landmarks, self.hand_info = self._detect(rgb, timestamp)
+        self.draw_hands(frame, landmarks)
         return landmarks, frame
 
+    def get_landmarks_rgb(self, frame, timestamp=None):
+        """
+        Like get_landmarks, but converts the BGR frame into a preallocated RGB
+        buffer (reused across calls) and draws the hand skeleton on it.
+        Returns (landmarks, rgb) so the preview can reuse the same conversion.
+        `timestamp` (seconds, monotonic) is the capture time used by the filter.
+        """
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._next_rgb_buffer(frame))
+        return self.process_rgb(rgb, timestamp), rgb
+
+    def process_rgb(self, rgb, timestamp=None):
+        """
+        Detect the hands of an RGB frame and draw their skeleton on it, in
+        place (e.g. a shared-memory buffer, see tracker_process.py).
+        Returns the landmarks; the metadata is in self.hand_info.
+        """
+        landmarks, self.hand_info = self._detect(rgb, timestamp)
+        self.draw_hands(rgb, landmarks, landmark_color=(255, 0, 0))
+        return landmarks
+
+    def reset(self):
+        """Forget the tracked region (e.g. when switching to another video)."""
+        self._roi_box = None
+        self._inferred = []
+        if self.smoothing is not None and hasattr(self.smoothing, "reset"):
+            self.smoothing.reset()
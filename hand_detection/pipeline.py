@@ -0,0 +1,254 @@
+import threading
+import time
+from collections import deque
+
+from utils.movements import get_direction_from_index
+
+
+class LatestQueue:
+    """
+    Bounded "latest-only" queue shared between two threads.
+    `put` never blocks: when the queue is full the oldest item is dropped
+    (and counted) so consumers always see the freshest data.
+    """
+
+    def __init__(self, maxsize=1):
+        self.maxsize = maxsize
+        self._items = deque()
+        self._cond = threading.Condition()
+        self.put_count = 0
+        self.drop_count = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.drop_count += 1
+            self._items.append(item)
+            self.put_count += 1
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Wait for an item (used by worker threads). Returns None on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout):
+                return None
+            return self._items.popleft()
+
+    def get_nowait(self):
+        """Return the next item or None if the queue is empty."""
+        with self._cond:
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def qsize(self):
+        with self._cond:
+            return len(self._items)
+
+
+class FrameResult:
+    """Output of the inference stage for one captured frame."""
+
+    __slots__ = ("frame_id", "timestamp", "landmarks", "hand_info", "gesture", "frame", "timings")
+
+    def __init__(self, frame_id, timestamp, landmarks, hand_info, gesture, frame, timings=None):
+        self.frame_id = frame_id
+        self.timestamp = timestamp      # time.monotonic() at capture
+        self.landmarks = landmarks      # (hands, 21, 3) float32
+        self.hand_info = hand_info      # HAND_INFO_DTYPE array (handedness, score)
+        self.gesture = gesture
+        self.frame = frame              # annotated RGB frame (tracker ring buffer)
+        self.timings = timings          # {stage: seconds} spent on this frame, see CameraPipeline
+
+
+class CameraPipeline:
+    """
+    Producer/consumer pipeline decoupling the camera and MediaPipe from the
+    render loop:
+
+        capture thread --[frames]--> inference thread --[results]--> game loop
+
+    Both queues are "latest-only": a slow stage drops stale items instead of
+    making the previous stage wait, and the game loop never blocks.
+
+    Each result carries the time its frame spent in every stage
+    (`timings`: capture = cap.read, queue = waiting for the inference
+    thread, landmarks = tracker, gesture = classify); with a `profiler`
+    (utils/profiler.StageProfiler) they are also recorded there.
+    """
+
+    def __init__(self, cap, tracker, classify=get_direction_from_index, queue_size=1, profiler=None):
+        self.cap = cap
+        self.tracker = tracker
+        self.classify = classify
+        self.profiler = profiler
+        self.frames = LatestQueue(queue_size)
+        self.results = LatestQueue(queue_size)
+        self.capture_failures = 0
+        self._last = None
+        self._running = False
+        self._threads = []
+        self._factories = None
+        self._ready = threading.Event()
+        self._init_lock = threading.Lock()     # publishing what _initialize built vs release()
+        self.init_error = None
+
+    @classmethod
+    def deferred(cls, open_camera, make_tracker, **kwargs):
+        """
+        Pipeline whose camera and tracker are built by start() in a
+        background thread, by calling open_camera() and make_tracker().
+        Importing cv2/MediaPipe, loading the model and opening the camera
+        take seconds; meanwhile the caller keeps drawing frames and
+        latest() returns (None, False). `ready` tells when the pipeline
+        runs; an exception raised while building is kept in `init_error`.
+        """
+        pipeline = cls(None, None, **kwargs)
+        pipeline._factories = (open_camera, make_tracker)
+        return pipeline
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        if self._factories is not None and self.tracker is None:
+            init = threading.Thread(target=self._initialize, name="pipeline-init", daemon=True)
+            self._threads = [init]
+            init.start()
+        else:
+            self._start_loops()
+        return self
+
+    def _initialize(self):
+        open_camera, make_tracker = self._factories
+        try:
+            tracker = make_tracker()
+            if not self._publish("tracker", tracker):
+                return
+            cap = open_camera()
+            if not self._publish("cap", cap):
+                return
+        except Exception as exc:
+            self.init_error = exc
+            self._running = False
+            return
+        self._start_loops()
+
+    def _publish(self, name, resource):
+        """
+        Store what a factory built, unless release() ran meanwhile (the
+        window was closed during loading): then release it here, since
+        release() could not see it. Returns False if stopped.
+        """
+        with self._init_lock:
+            if self._running:
+                setattr(self, name, resource)
+                return True
+        if name == "cap":
+            resource.release()
+        else:
+            self._close_tracker(resource)
+        return False
+
+    def _start_loops(self):
+        loops = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+        ]
+        self._threads = self._threads + loops
+        for t in loops:
+            t.start()
+        self._ready.set()
+
+    def stop(self, timeout=1.0):
+        self._running = False
+        for t in list(self._threads):
+            t.join(timeout)
+        # the init thread may have started the loops while we were joining it
+        for t in list(self._threads):
+            t.join(timeout)
+        self._threads = []
+
+    def release(self):
+        """Stop the threads, release the camera (if it was opened) and close the tracker if it can be."""
+        self.stop()
+        with self._init_lock:
+            cap, tracker = self.cap, self.tracker
+        if cap is not None:
+            cap.release()
+        self._close_tracker(tracker)
+
+    @staticmethod
+    def _close_tracker(tracker):
+        close = getattr(tracker, "close", None)
+        if close is not None:
+            close()
+
+    def _capture_loop(self):
+        frame_id = 0
+        while self._running:
+            start = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret:
+                self.capture_failures += 1
+                time.sleep(0.01)
+                continue
+            self.frames.put((frame_id, time.monotonic(), frame, time.perf_counter() - start))
+            frame_id += 1
+
+    def _inference_loop(self):
+        while self._running:
+            item = self.frames.get(timeout=0.1)
+            if item is None:
+                continue
+            frame_id, timestamp, frame, capture_time = item
+            start = time.perf_counter()
+            queued = time.monotonic() - timestamp
+            landmarks, frame = self.tracker.get_landmarks_rgb(frame, timestamp)
+            classify_start = time.perf_counter()
+            gesture = self.classify(landmarks)
+            end = time.perf_counter()
+            timings = {"capture": capture_time, "queue": queued,
+                       "landmarks": classify_start - start, "gesture": end - classify_start}
+            if self.profiler is not None:
+                for stage, seconds in timings.items():
+                    self.profiler.record(stage, seconds)
+            self.results.put(FrameResult(frame_id, timestamp, landmarks, self.tracker.hand_info,
+                                         gesture, frame, timings))
+
+    def latest(self):
+        """
+        Non-blocking: return (result, is_new) for the freshest processed frame.
+        When no new frame is ready, the previous result is returned again with
+        is_new=False (None before the first frame).
+        """
+        result = self.results.get_nowait()
+        if result is None:
+            return self._last, False
+        self._last = result
+        return result, True
+
+    def stats(self):
+        """Per-stage queue depth and drop counts (plus scheduler decisions, if any)."""
+        stats = {
+            "capture": {
+                "depth": self.frames.qsize(),
+                "frames": self.frames.put_count,
+                "dropped": self.frames.drop_count,
+                "failures": self.capture_failures,
+            },
+            "inference": {
+                "depth": self.results.qsize(),
+                "frames": self.results.put_count,
+                "dropped": self.results.drop_count,
+            },
+        }
+        scheduler = getattr(self.tracker, "scheduler", None)
+        if scheduler is not None:
+            stats["scheduler"] = scheduler.decisions()
+        return stats
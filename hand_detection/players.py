@@ -0,0 +1,88 @@
+import numpy as np
+
+from utils.movements import as_landmark_array, directions_from_index, hand_present_mask
+
+# wrist + the four finger MCPs: the palm center moves little when pointing
+PALM_POINTS = np.array([0, 5, 9, 13, 17])
+
+
+class PlayerAssigner:
+    """
+    Stable hand -> player id assignment across frames.
+
+    MediaPipe returns the hands of a frame in no particular order. Each
+    player keeps the palm center of its hand; a new frame's hands are
+    matched to the players greedily by increasing distance (all pairs
+    sorted at once), up to `max_distance` pixels. Unmatched hands take the
+    free players, lowest id to the leftmost hand, preferring players whose
+    hand has been gone for longest. A player's position is forgotten after
+    `max_missing` frames without its hand.
+    """
+
+    def __init__(self, players, max_distance=150.0, max_missing=30):
+        self.players = players
+        self.max_distance = max_distance
+        self.max_missing = max_missing
+        self.reset()
+
+    def reset(self):
+        self.positions = np.full((self.players, 2), np.nan, dtype=np.float32)
+        self.missing = np.full(self.players, self.max_missing, dtype=np.int64)
+
+    def assign(self, landmarks):
+        """Player id of every hand of `landmarks` (array, -1 for extra hands)."""
+        pts = as_landmark_array(landmarks)
+        ids = np.full(len(pts), -1, dtype=np.int64)
+        present = np.flatnonzero(hand_present_mask(pts))
+        centers = pts[present][:, PALM_POINTS, :2].mean(axis=1) if len(present) else np.empty((0, 2))
+        taken = np.zeros(self.players, dtype=bool)
+
+        if len(present):
+            # (hands, players) distances; unknown players give NaN -> never matched
+            dist = np.linalg.norm(centers[:, None, :] - self.positions[None, :, :], axis=2)
+            dist[~(dist <= self.max_distance)] = np.inf
+            for flat in np.argsort(dist, axis=None):
+                hand, player = divmod(int(flat), self.players)
+                if not np.isfinite(dist[hand, player]):
+                    break
+                if ids[present[hand]] < 0 and not taken[player]:
+                    ids[present[hand]] = player
+                    taken[player] = True
+
+            free = [p for p in np.argsort(-self.missing, kind="stable").tolist() if not taken[p]]
+            new = [h for h in np.argsort(centers[:, 0], kind="stable").tolist() if ids[present[h]] < 0]
+            for hand, player in zip(new, sorted(free[:len(new)])):
+                ids[present[hand]] = player
+                taken[player] = True
+
+            assigned = ids[present] >= 0
+            self.positions[ids[present][assigned]] = centers[assigned]
+        self.missing[taken] = 0
+        self.missing[~taken] += 1
+        self.positions[self.missing >= self.max_missing] = np.nan
+        return ids
+
+
+class PlayerGestures:
+    """
+    Per-player gesture classifier, used as CameraPipeline's `classify`:
+    the gesture of every hand is computed in one vectorized call
+    (`directions`: directions_from_index, or a learned model's predict)
+    and routed to the hand's player. Returns a list with one gesture per
+    player, None for players without a hand.
+    """
+
+    def __init__(self, players, assigner=None, directions=directions_from_index):
+        self.players = players
+        self.assigner = assigner if assigner is not None else PlayerAssigner(players)
+        self.directions = directions
+        self.player_ids = np.empty(0, dtype=np.int64)   # of the last frame's hands
+
+    def __call__(self, landmarks):
+        ids = self.assigner.assign(landmarks)
+        directions = self.directions(landmarks)
+        gestures = [None] * self.players
+        for hand in np.flatnonzero(ids >= 0).tolist():
+            gestures[ids[hand]] = str(directions[hand])
+        self.player_ids = ids
+        return gestures
@@ -0,0 +1,108 @@
+import time
+
+
+class InferenceScheduler:
+    """
+    Chooses the inference resolution and stride (run the model every Nth
+    camera frame) from the measured inference time, to keep the average
+    inference cost per camera frame under `target_latency_ms`.
+
+    Decisions move along a ladder ordered from best quality to cheapest:
+    the resolution is lowered first (landmarks stay fresh), then frames are
+    skipped. A cheaper level is taken as soon as the smoothed cost exceeds
+    the budget; a better one only after `recover_after` consecutive
+    inferences well under budget, so the choice does not oscillate.
+    """
+
+    LADDER = (
+        (1.0, 1), (0.75, 1), (0.5, 1),
+        (0.5, 2), (0.35, 2), (0.35, 3), (0.35, 4),
+    )
+
+    def __init__(self, target_latency_ms=25.0, ladder=LADDER, smoothing=0.2,
+                 recover_ratio=0.5, recover_after=30):
+        self.target_latency_ms = target_latency_ms
+        self.ladder = ladder
+        self.smoothing = smoothing
+        self.recover_ratio = recover_ratio
+        self.recover_after = recover_after
+        self.level = 0
+        self.avg_ms = None          # smoothed inference time at the current level
+        self.frames = 0
+        self.inferred = 0
+        self._since_infer = 0
+        self._under_budget = 0
+
+    @property
+    def scale(self):
+        return self.ladder[self.level][0]
+
+    @property
+    def stride(self):
+        return self.ladder[self.level][1]
+
+    def should_infer(self):
+        """Call once per camera frame. True if the model should run on this frame."""
+        self.frames += 1
+        if self._since_infer + 1 >= self.stride or self.avg_ms is None:
+            self._since_infer = 0
+            self.inferred += 1
+            return True
+        self._since_infer += 1
+        return False
+
+    @property
+    def frames_since_inference(self):
+        return self._since_infer
+
+    def record(self, seconds):
+        """Report the duration of one inference and adapt the level."""
+        ms = seconds * 1e3
+        self.avg_ms = ms if self.avg_ms is None else self.avg_ms + self.smoothing * (ms - self.avg_ms)
+        cost = self.avg_ms / self.stride
+
+        if cost > self.target_latency_ms and self.level < len(self.ladder) - 1:
+            self._change_level(self.level + 1)
+        elif cost < self.recover_ratio * self.target_latency_ms and self.level > 0:
+            self._under_budget += 1
+            if self._under_budget >= self.recover_after:
+                self._change_level(self.level - 1)
+        else:
+            self._under_budget = 0
+
+    def _change_level(self, level):
+        old_scale = self.scale
+        self.level = level
+        self._under_budget = 0
+        # the model cost scales roughly with the number of pixels
+        self.avg_ms *= (self.scale / old_scale) ** 2
+
+    def timed(self):
+        """Context manager measuring one inference: `with scheduler.timed(): ...`."""
+        return _Timer(self)
+
+    def decisions(self):
+        """Current choices and counters, for monitoring."""
+        return {
+            "target_ms": self.target_latency_ms,
+            "level": self.level,
+            "scale": self.scale,
+            "stride": self.stride,
+            "avg_inference_ms": round(self.avg_ms, 2) if self.avg_ms is not None else None,
+            "frames": self.frames,
+            "inferred": self.inferred,
+            "skipped": self.frames - self.inferred,
+        }
+
+
+class _Timer:
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.scheduler.record(time.perf_counter() - self.start)
+        return False
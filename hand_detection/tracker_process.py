@@ -0,0 +1,416 @@
+"""
+HandTracker in a separate process, frames and landmarks in shared memory.
+
+    tracker = ProcessHandTracker(max_hands=2, target_latency_ms=25)
+    landmarks, rgb = tracker.get_landmarks_rgb(frame, timestamp)   # as HandTracker
+    tracker.close()
+
+The model runs in a child interpreter (python -m hand_detection.tracker_process),
+so its Python-side work no longer competes with pygame for the GIL, and a
+stalled or crashed model does not hold the game: after `timeout` seconds
+the call returns no hands, and a dead server is restarted on the next frame.
+A slot stays reserved until the server has answered its request, so at
+most `slots` requests are ever queued; when all of them are in flight the
+frame is not sent, and a server that has not answered for `stall_timeout`
+seconds is restarted.
+
+The UI gain needs a free core: on a single CPU the server still takes its
+share of the time and the UI frame work gets slower, not faster (see
+benchmarks/tracker_process.py).
+
+Transport: one multiprocessing.shared_memory block (FrameRing) holds
+`slots` camera frames with their landmarks and hand_info. The parent
+copies the BGR frame into a slot; the server converts it to RGB in place,
+runs the tracker, draws the skeleton on it and writes the landmarks next
+to it. Only fixed-size struct messages (slot, request id, timestamp /
+hand count, time) go through the server's stdin/stdout: images are never
+pickled. The server is a plain subprocess, not a multiprocessing.Process,
+because spawning one re-runs main.py, which has no __main__ guard.
+"""
+import importlib
+import json
+import os
+import queue
+import struct
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from utils.movements import HAND_INFO_DTYPE, LANDMARK_COUNT
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FACTORY = "hand_detection.tracker_process:make_hand_tracker"
+
+# parent -> server: kind, slot (ATTACH: payload length), request id, timestamp
+REQUEST = struct.Struct("<BIId")
+# server -> parent: slot, request id, hands (-1: the tracker raised), seconds,
+# then the InferenceScheduler state: level (-1: no scheduler), stride, scale,
+# smoothed inference ms (NaN: none yet), frames, inferred
+RESPONSE = struct.Struct("<IIidbIddII")
+FRAME, ATTACH = 0, 1
+
+
+def make_hand_tracker(target_latency_ms=None, **kwargs):
+    """Default server-side factory: HandTracker, with an InferenceScheduler if a budget is given."""
+    from hand_detection.hand_tracker import HandTracker
+    from hand_detection.scheduler import InferenceScheduler
+
+    if target_latency_ms is not None:
+        kwargs["scheduler"] = InferenceScheduler(target_latency_ms=target_latency_ms)
+    return HandTracker(**kwargs)
+
+
+def _align(offset, alignment=64):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+class FrameRing:
+    """NumPy views over one shared memory block: frames, landmarks and hand_info per slot."""
+
+    def __init__(self, shm, slots, shape, max_hands):
+        self.shm = shm
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.max_hands = max_hands
+        offset = 0
+        arrays = []
+        for item_shape, dtype in self._layout(slots, shape, max_hands):
+            arrays.append(np.ndarray(item_shape, dtype=dtype, buffer=shm.buf, offset=offset))
+            offset = _align(offset + arrays[-1].nbytes)
+        self.frames, self.landmarks, self.hand_info = arrays
+
+    @staticmethod
+    def _layout(slots, shape, max_hands):
+        return [((slots,) + tuple(shape), np.uint8),
+                ((slots, max_hands, LANDMARK_COUNT, 3), np.float32),
+                ((slots, max_hands), HAND_INFO_DTYPE)]
+
+    @classmethod
+    def nbytes(cls, slots, shape, max_hands):
+        total = 0
+        for item_shape, dtype in cls._layout(slots, shape, max_hands):
+            total = _align(total + int(np.prod(item_shape)) * np.dtype(dtype).itemsize)
+        return total
+
+    @classmethod
+    def create(cls, slots, shape, max_hands):
+        shm = shared_memory.SharedMemory(create=True, size=cls.nbytes(slots, shape, max_hands))
+        return cls(shm, slots, shape, max_hands)
+
+    @classmethod
+    def attach(cls, name, slots, shape, max_hands):
+        """Open a ring created by another process (which stays in charge of unlinking it)."""
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:   # Python < 3.13: the resource tracker would unlink it at exit
+            shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, slots, shape, max_hands)
+
+    def spec(self):
+        return {"name": self.shm.name, "slots": self.slots, "shape": list(self.shape),
+                "max_hands": self.max_hands}
+
+    def close(self, unlink=False):
+        self.frames = self.landmarks = self.hand_info = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass    # a frame view is still in use (preview): unmapped when it is collected
+        if unlink:
+            self.shm.unlink()
+
+
+class RemoteScheduler:
+    """Last InferenceScheduler state reported by the server, for pipeline.stats()."""
+
+    def __init__(self, target_latency_ms):
+        self.target_latency_ms = target_latency_ms
+        self.level, self.stride, self.scale = 0, 1, 1.0
+        self.avg_ms = None
+        self.frames = self.inferred = 0
+
+    def update(self, level, stride, scale, avg_ms, frames, inferred):
+        self.level, self.stride, self.scale = level, stride, scale
+        self.avg_ms = None if np.isnan(avg_ms) else avg_ms
+        self.frames, self.inferred = frames, inferred
+
+    def decisions(self):
+        return {
+            "target_ms": self.target_latency_ms,
+            "level": self.level,
+            "scale": self.scale,
+            "stride": self.stride,
+            "avg_inference_ms": round(self.avg_ms, 2) if self.avg_ms is not None else None,
+            "frames": self.frames,
+            "inferred": self.inferred,
+            "skipped": self.frames - self.inferred,
+        }
+
+
+class ProcessHandTracker:
+    """
+    Same interface as HandTracker for CameraPipeline (get_landmarks_rgb,
+    hand_info), with the tracker built by `factory` ("module:callable",
+    called with **tracker_kwargs) in a server process. The constructor
+    returns once the model is loaded and raises RuntimeError if it fails.
+    The annotated RGB frame returned is a copy, owned by the caller: the
+    shared-memory slot is reused as soon as its request is answered.
+    `scheduler` mirrors the server's InferenceScheduler, if it has one.
+    """
+
+    def __init__(self, slots=4, timeout=1.0, stall_timeout=5.0, startup_timeout=60.0,
+                 factory=DEFAULT_FACTORY, **tracker_kwargs):
+        if slots < 1:
+            raise ValueError("ProcessHandTracker needs at least 1 slot")
+        self.slots = slots
+        self.timeout = timeout
+        self.stall_timeout = stall_timeout
+        self.startup_timeout = startup_timeout
+        self.factory = factory
+        self.tracker_kwargs = tracker_kwargs
+        self.max_hands = tracker_kwargs.get("max_hands", 1)
+        self.hand_info = np.zeros(0, dtype=HAND_INFO_DTYPE)
+        target = tracker_kwargs.get("target_latency_ms")
+        self.scheduler = RemoteScheduler(target) if target is not None else None
+        self.timeouts = 0
+        self.failures = 0
+        self.restarts = 0
+        self.skipped = 0            # frames not sent: every slot in flight
+        self.last_inference_ms = None
+        self._ring = None
+        self._proc = None
+        self._responses = None
+        self._request_id = 0
+        self._slot = -1
+        self._busy = {}             # slot -> request id of unanswered requests
+        self._last_answer = 0.0     # time of the last response (or of the server start)
+        self._start()
+
+    def _start(self):
+        config = json.dumps({"factory": self.factory, "kwargs": self.tracker_kwargs})
+        self._proc = subprocess.Popen([sys.executable, "-m", "hand_detection.tracker_process", config],
+                                      cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self._responses = queue.Queue()
+        self._busy.clear()
+        self._last_answer = time.monotonic()
+        status = queue.Queue()
+        reader = threading.Thread(target=self._read_responses, args=(self._proc, self._responses, status),
+                                  name="tracker-server-reader", daemon=True)
+        reader.start()
+        try:
+            message = status.get(timeout=self.startup_timeout)
+        except queue.Empty:
+            message = {"error": f"no answer in {self.startup_timeout:g} s"}
+        if "error" in message:
+            self._stop_process()
+            raise RuntimeError(f"tracker server failed to start: {message['error']}")
+        if self._ring is not None:
+            self._send_attach()
+
+    @staticmethod
+    def _read_responses(proc, responses, status):
+        line = proc.stdout.readline()
+        try:
+            status.put(json.loads(line) if line else {"error": f"exit status {proc.wait()}"})
+        except ValueError:
+            status.put({"error": line.decode(errors="replace").strip()})
+        while True:
+            data = proc.stdout.read(RESPONSE.size)
+            if len(data) < RESPONSE.size:
+                return
+            responses.put(RESPONSE.unpack(data))
+
+    def _send(self, data):
+        self._proc.stdin.write(data)
+        self._proc.stdin.flush()
+
+    def _send_attach(self):
+        payload = json.dumps(self._ring.spec()).encode()
+        self._send(REQUEST.pack(ATTACH, len(payload), 0, 0.0) + payload)
+
+    def _stop_process(self, timeout=2.0):
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()      # EOF: the server exits its loop
+            proc.wait(timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+
+    def _answered(self, response):
+        """Free the slot of a response; returns (request id, hands, seconds)."""
+        slot, answered, hands, elapsed, level, stride, scale, avg_ms, frames, inferred = response
+        self._last_answer = time.monotonic()
+        if self._busy.get(slot) == answered:
+            del self._busy[slot]
+        if self.scheduler is not None and level >= 0:
+            self.scheduler.update(level, stride, scale, avg_ms, frames, inferred)
+        return answered, hands, elapsed
+
+    def _free_slot(self):
+        """Next slot (round-robin) whose request has been answered, or None."""
+        for i in range(1, self.slots + 1):
+            slot = (self._slot + i) % self.slots
+            if slot not in self._busy:
+                self._slot = slot
+                return slot
+        return None
+
+    def _restart(self):
+        """
+        Replace the server. False if the new one fails to start: counted
+        in `failures`, and _proc stays None so the next frame retries.
+        """
+        self.restarts += 1
+        self._stop_process()
+        try:
+            self._start()
+        except (RuntimeError, OSError):
+            traceback.print_exc()
+            self._stop_process()
+            self.failures += 1
+            return False
+        return True
+
+    def get_landmarks_rgb(self, frame, timestamp=None):
+        if self._proc is None or self._proc.poll() is not None:
+            if not self._restart():
+                return self._no_hands(frame)
+        if self._ring is None or self._ring.shape != frame.shape:
+            if self._ring is not None:
+                self._ring.close(unlink=True)
+            self._ring = FrameRing.create(self.slots, frame.shape, self.max_hands)
+            self._busy.clear()      # answers for the old ring no longer match a slot
+            self._send_attach()
+
+        while True:     # late answers of timed-out requests
+            try:
+                self._answered(self._responses.get_nowait())
+            except queue.Empty:
+                break
+        slot = self._free_slot()
+        if slot is None:
+            if time.monotonic() - self._last_answer > self.stall_timeout:
+                # stalled: restarting drops the server's queue
+                if not self._restart():
+                    return self._no_hands(frame)
+                slot = self._free_slot()
+            else:
+                self.skipped += 1
+                return self._no_hands(frame)
+
+        self._request_id += 1
+        request_id = self._request_id
+        np.copyto(self._ring.frames[slot], frame)
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        try:
+            self._send(REQUEST.pack(FRAME, slot, request_id, timestamp))
+        except OSError:
+            return self._no_hands(frame)
+        self._busy[slot] = request_id
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                response = self._responses.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                self.timeouts += 1
+                return self._no_hands(frame)     # the slot stays busy until answered
+            answered, hands, elapsed = self._answered(response)
+            if answered == request_id:
+                break
+        if hands < 0:
+            self.failures += 1
+            return self._no_hands(frame)
+        self.last_inference_ms = elapsed * 1e3
+        self.hand_info = self._ring.hand_info[slot, :hands].copy()
+        # copied out: the preview is uploaded later by the main thread
+        return self._ring.landmarks[slot, :hands].copy(), self._ring.frames[slot].copy()
+
+    def _no_hands(self, frame):
+        """No hands, and the unannotated frame as RGB (never a slot the server may be writing)."""
+        self.hand_info = np.zeros(0, dtype=HAND_INFO_DTYPE)
+        return np.empty((0, LANDMARK_COUNT, 3), dtype=np.float32), np.ascontiguousarray(frame[..., ::-1])
+
+    def close(self):
+        self._stop_process()
+        if self._ring is not None:
+            self._ring.close(unlink=True)
+            self._ring = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _load_factory(spec):
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def serve(config):
+    """Server loop: answer FRAME requests until stdin is closed."""
+    import cv2
+
+    out, requests = sys.stdout.buffer, sys.stdin.buffer
+    sys.stdout = sys.stderr     # a stray print must not corrupt the protocol
+    try:
+        tracker = _load_factory(config["factory"])(**config["kwargs"])
+    except Exception as exc:
+        out.write(json.dumps({"error": repr(exc)}).encode() + b"\n")
+        out.flush()
+        return 1
+    out.write(b'{"ready": true}\n')
+    out.flush()
+    scheduler = getattr(tracker, "scheduler", None)
+
+    ring = None
+    while True:
+        header = requests.read(REQUEST.size)
+        if len(header) < REQUEST.size:
+            break
+        kind, slot, request_id, timestamp = REQUEST.unpack(header)
+        if kind == ATTACH:
+            if ring is not None:
+                ring.close()
+            ring = FrameRing.attach(**json.loads(requests.read(slot)))
+            continue
+
+        start = time.perf_counter()
+        try:
+            rgb = ring.frames[slot]
+            cv2.cvtColor(rgb, cv2.COLOR_BGR2RGB, dst=rgb)
+            landmarks = tracker.process_rgb(rgb, timestamp)
+            hands = min(len(landmarks), ring.max_hands)
+            ring.landmarks[slot, :hands] = landmarks[:hands]
+            ring.hand_info[slot, :hands] = tracker.hand_info[:hands]
+        except Exception:
+            traceback.print_exc()
+            hands = -1
+        elapsed = time.perf_counter() - start
+        if scheduler is None:
+            state = (-1, 1, 1.0, float("nan"), 0, 0)
+        else:
+            avg_ms = scheduler.avg_ms if scheduler.avg_ms is not None else float("nan")
+            state = (scheduler.level, scheduler.stride, scheduler.scale, avg_ms,
+                     scheduler.frames, scheduler.inferred)
+        out.write(RESPONSE.pack(slot, request_id, hands, elapsed, *state))
+        out.flush()
+    if ring is not None:
+        ring.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(serve(json.loads(sys.argv[1])))
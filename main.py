@@ -1,18 +1,73 @@
-import cv2
+import argparse
+import time
 import pygame
-import numpy as np
-from hand_detection.hand_tracker import HandTracker
-from utils.movements import get_direction_from_index, hand_present
+from hand_detection.pipeline import CameraPipeline
+from hand_detection.players import PlayerGestures
+from hand_detection.scheduler import InferenceScheduler
 from utils.leaderboard import Leaderboard
+from utils.movements import get_direction_from_index
 from games.snake import SnakeGame
+from games.multi_snake import MultiSnakeGame
+from games.session import GameSession
 from utils.evaluator import Evaluator
+from utils.preview import CameraPreview
+from utils.profiler import StageProfiler, ProfilerHUD
+
+parser = argparse.ArgumentParser(description="Snake contrôlé par la main")
+parser.add_argument("--players", type=int, default=1, choices=range(1, 5),
+                    help="nombre de joueurs (une main chacun, serpents sur le même plateau)")
+parser.add_argument("--tracker-process", action="store_true",
+                    help="MediaPipe dans un processus séparé (images en mémoire partagée)")
+parser.add_argument("--leaderboard", default=None,
+                    help="base SQLite du classement (peut être partagée par plusieurs bornes)")
+parser.add_argument("--record-landmarks", default=None, metavar="FILE.lmk",
+                    help="enregistre les points de la main et le geste clavier (utils.landmark_recording)")
+parser.add_argument("--gesture-model", default=None,
+                    help="classifieur appris (utils.gesture_model) à la place de l'angle de l'index")
+args = parser.parse_args()
+PLAYERS = args.players
 
 pygame.init()
 screen = pygame.display.set_mode((1200, 600))
 pygame.display.set_caption("Snake")
 
 font = pygame.font.Font(None, 48)
-tracker = HandTracker()
+INFERENCE_BUDGET_MS = 25   # average MediaPipe time allowed per camera frame
+preview = CameraPreview((360, 240))
+# durées par étape (p50/p95/p99), affichées avec F3 et écrites dans le journal
+profiler = StageProfiler()
+TIMING_STAGES = ("capture", "queue", "landmarks", "gesture", "camera", "update", "draw", "display",
+                 "frame", "latency")
+
+
+# cv2 and MediaPipe (hand_tracker) are imported by the pipeline's init
+# thread: the window and the welcome screen show up right away while the
+# model loads and the camera opens.
+def open_camera():
+    import cv2
+    return cv2.VideoCapture(0)
+
+
+def make_tracker():
+    if args.tracker_process:
+        from hand_detection.tracker_process import ProcessHandTracker
+        return ProcessHandTracker(max_hands=PLAYERS, target_latency_ms=INFERENCE_BUDGET_MS)
+    from hand_detection.hand_tracker import HandTracker
+    # MediaPipe detects all the hands of a frame in the same call
+    return HandTracker(max_hands=PLAYERS,
+                       scheduler=InferenceScheduler(target_latency_ms=INFERENCE_BUDGET_MS))
+
+
+# with several players, the gesture is a list: one per player (None without a hand)
+if args.gesture_model:
+    from utils.gesture_model import GestureClassifier
+    model = GestureClassifier.load(args.gesture_model)
+    classify = PlayerGestures(PLAYERS, directions=model.predict) if PLAYERS > 1 else model
+else:
+    classify = PlayerGestures(PLAYERS) if PLAYERS > 1 else get_direction_from_index
+pipeline = CameraPipeline.deferred(open_camera, make_tracker, classify=classify, profiler=profiler).start()
+status_font = pygame.font.Font(None, 32)
+
 
 def get_real_gesture_from_keyboard():
     """Return the gesture the user indicates via the keyboard arrows."""
@@ -30,27 +85,33 @@ def get_real_gesture_from_keyboard():
     return "NONE"
 
 
-def frame_to_surface(frame, size=None):
-    if frame is None:
-        return None
-    if size is not None:
-        frame = cv2.resize(frame, size)
-    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    h, w = frame_rgb.shape[:2]
-    return pygame.image.frombuffer(frame_rgb.tobytes(), (w, h), "RGB")
-
-
-def get_camera_data(cap, cam_size=(360, 240)):
-    ret, frame = cap.read()
-    if not ret:
-        return None, None, None
-    landmarks, frame = tracker.get_landmarks(frame)
-    gesture = get_direction_from_index(landmarks)
-    cam_surf = frame_to_surface(frame, size=cam_size)
-    return landmarks, gesture, cam_surf
+def get_camera_data(pipeline):
+    """
+    Return the freshest (landmarks, gesture, camera surface, new result)
+    without blocking; the last item is the FrameResult when it was not
+    shown yet, else None.
+    """
+    result, is_new = pipeline.latest()
+    if result is None:
+        return None, None, None, None
+    if is_new:
+        preview.update(result.frame)
+    return result.landmarks, result.gesture, preview.surface, result if is_new else None
+
+
+def draw_camera_status(pipeline):
+    """Placeholder for the camera preview until the first frame arrives."""
+    if pipeline.init_error is not None:
+        message = "Caméra indisponible"
+    elif not pipeline.ready:
+        message = "Chargement de la caméra..."
+    else:
+        return
+    status = status_font.render(message, True, (160, 160, 160))
+    screen.blit(status, (830, 120))
 
 
-def welcome_screen(cap, cam_size=(360, 240)):
+def welcome_screen(pipeline):
     """Show welcome screen and preview camera until gesture RIGHT is detected.
     Returns when gesture == 'RIGHT' or exits on quit.
     """
@@ -63,8 +124,7 @@ def welcome_screen(cap, cam_size=(360, 240)):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
-                cap.release()
-                cv2.destroyAllWindows()
+                pipeline.release()
                 exit()
             if event.type == pygame.KEYDOWN and input_active:
                 if event.key == pygame.K_BACKSPACE:
@@ -76,7 +136,7 @@ def welcome_screen(cap, cam_size=(360, 240)):
                     if event.unicode.isprintable():
                         input_text += event.unicode
 
-        landmarks, gesture, cam_surf = get_camera_data(cap, cam_size)
+        landmarks, gesture, cam_surf, _ = get_camera_data(pipeline)
 
         screen.fill((30, 30, 30))
 
@@ -92,6 +152,8 @@ def welcome_screen(cap, cam_size=(360, 240)):
             # preview camera while typing
             if cam_surf:
                 screen.blit(cam_surf, (820, 20))
+            else:
+                draw_camera_status(pipeline)
 
             pygame.display.flip()
             clock.tick(30)
@@ -104,11 +166,13 @@ def welcome_screen(cap, cam_size=(360, 240)):
 
         if cam_surf:
             screen.blit(cam_surf, (820, 20))
+        else:
+            draw_camera_status(pipeline)
 
         pygame.display.flip()
         clock.tick(30)
 
-        if gesture == "RIGHT":
+        if gesture == "RIGHT" or (PLAYERS > 1 and "RIGHT" in (gesture or ())):
             return input_text
 
 def render_wrapped_text(text, font, color, max_width, line_spacing=4):
@@ -149,110 +213,126 @@ def render_wrapped_text(text, font, color, max_width, line_spacing=4):
     return surf
 
 
-cap = cv2.VideoCapture(0)
+player_name = welcome_screen(pipeline)
 
-player_name = welcome_screen(cap)
+lb = Leaderboard(args.leaderboard)
+evaluator = Evaluator(timing_stages=TIMING_STAGES)
+recorder = None
+if args.record_landmarks:
+    from utils.landmark_recording import LandmarkRecorder
+    recorder = LandmarkRecorder(args.record_landmarks, max_hands=PLAYERS)
+hud = ProfilerHUD(profiler)
+player = player_name if player_name else "Anonymous"
+if PLAYERS > 1:
+    game = MultiSnakeGame(screen, PLAYERS, leaderboard=lb, player=player)
 
-game = SnakeGame(screen)
-evaluator = Evaluator()
-lb = Leaderboard()
+    def add_scores(_):
+        for i, score in enumerate(game.scores):
+            lb.add(f"{player} J{i + 1}", score)
+    session = GameSession(game, on_game_over=add_scores)
+else:
+    game = SnakeGame(screen, leaderboard=lb, player=player)
+    session = GameSession(game, on_game_over=lambda score: lb.add(player, score))
 
 # Game loop
 clock = pygame.time.Clock()
 running = True
-pause = False
-cam_size = (360, 240)
-
-NO_HAND_FRAMES_TO_PAUSE = 5    # require 5 consecutive frames with no hand to pause
-HAND_FRAMES_TO_RESUME = 3      # require 3 consecutive frames with a hand to resume
-no_hand_counter = 0
-hand_counter = 0
+last_refresh = time.perf_counter()
 
 font_pause = pygame.font.SysFont(None, 80)
 
 PAUSE_TEXT_MAX_WIDTH = screen.get_width() - 200
 
 while running:
+    frame_start = time.perf_counter()
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            hud.toggle()
+            game.invalidate()   # repaint what the HUD covered
 
-    landmarks, gesture, cam_surf = get_camera_data(cap, cam_size)
+    # scores ajoutés par les autres bornes (une requête très légère)
+    if frame_start - last_refresh >= 1.0:
+        lb.refresh()
+        last_refresh = frame_start
+
+    with profiler.time("camera"):
+        landmarks, gesture, cam_surf, fresh = get_camera_data(pipeline)
     real_gesture = get_real_gesture_from_keyboard()
     game.set_camera_surface(cam_surf)
+    if recorder is not None and fresh is not None:
+        # une ligne par image caméra, horodatée (time.time()) à la capture
+        raw = fresh.gesture[0] if PLAYERS > 1 else fresh.gesture
+        recorder.append(time.time() - (time.monotonic() - fresh.timestamp), fresh.landmarks,
+                        real_gesture, raw, fresh.hand_info)
 
-    if not game.game_over:
-        is_hand = hand_present(landmarks)
+    with profiler.time("update"):
+        session.step(landmarks, gesture)
+    pause = session.paused
 
-        if not is_hand:
-            no_hand_counter += 1
-            hand_counter = 0
-        else:
-            hand_counter += 1
-            no_hand_counter = 0
+    if pause:
+        with profiler.time("draw"):
+            game.invalidate()
+            game.draw()
 
-        if no_hand_counter >= NO_HAND_FRAMES_TO_PAUSE and not pause:
-            pause = True
-            gesture = None  # prevent last gesture from persisting
+            s = pygame.Surface((screen.get_width(), screen.get_height()), pygame.SRCALPHA)
+            s.fill((0, 0, 0, 120))
+            screen.blit(s, (0, 0))
 
-        if hand_counter >= HAND_FRAMES_TO_RESUME and pause:
-            pause = False
+            pause_message = "⏸ En pause — aucune main détectée"
+            text_surf = render_wrapped_text(pause_message, font_pause, (255, 220, 0), PAUSE_TEXT_MAX_WIDTH)
 
-    else:
-        # Reset counters when game is over
-        no_hand_counter = 0
-        hand_counter = 0
-        pause = False
+            if text_surf:
+                text_rect = text_surf.get_rect(center=(screen.get_width() // 2, screen.get_height() // 2))
+                screen.blit(text_surf, text_rect)
+            hud.draw(screen)
 
+        with profiler.time("display"):
+            pygame.display.flip()
+    else:
+        with profiler.time("draw"):
+            dirty = game.draw()
+            hud_rect = hud.draw(screen)   # opaque: redrawn over the cells that changed below it
+            if hud_rect is not None:
+                dirty.append(hud_rect)
+        with profiler.time("display"):
+            pygame.display.update(dirty)
+
+    # motion-to-photon : de la capture de l'image caméra à son affichage
+    # (sans la latence propre du capteur ni celle de l'écran)
+    if fresh is not None:
+        profiler.record("latency", time.monotonic() - fresh.timestamp)
+    profiler.record("frame", time.perf_counter() - frame_start)
+
+    timings = {stage: profiler.last(stage) for stage in ("camera", "update", "draw", "display", "frame")}
+    if fresh is not None:
+        timings.update(fresh.timings)
+        timings["latency"] = profiler.last("latency")
+    detected = session.gesture
+    if PLAYERS > 1 and detected is not None:
+        detected = detected[0]   # le clavier ne donne qu'un geste réel : celui du joueur 1
     evaluator.log_frame(
-        hand_detected=is_hand,
-        gesture_detected=gesture if gesture is not None else "NONE",
+        hand_detected=session.hand_detected,
+        gesture_detected=detected if detected is not None else "NONE",
         gesture_real=real_gesture,
         paused=pause,
-        game_over=game.game_over
+        game_over=session.frame_game_over,
+        timings=timings
     )
 
     if pause:
-        game.draw()
-
-        s = pygame.Surface((screen.get_width(), screen.get_height()), pygame.SRCALPHA)
-        s.fill((0, 0, 0, 120))
-        screen.blit(s, (0, 0))
-
-        pause_message = "⏸ En pause — aucune main détectée"
-        text_surf = render_wrapped_text(pause_message, font_pause, (255, 220, 0), PAUSE_TEXT_MAX_WIDTH)
-
-        if text_surf:
-            text_rect = text_surf.get_rect(center=(screen.get_width() // 2, screen.get_height() // 2))
-            screen.blit(text_surf, text_rect)
-
-        pygame.display.flip()
         clock.tick(15)
-        continue
-
-    game.update(gesture)
-    game.draw()
-
-    # add score once when game becomes over
-    if game.game_over and not prev_game_over_state:
-        player = player_name if player_name else "Anonymous"
-        score = max(0, len(game.snake) - 4)
-        lb.add(player, score)
-
-    # update persistent previous state
-    prev_game_over_state = game.game_over
-
-    if landmarks is not None:
-        prev_game_over = game.game_over
-        game.check_restart(landmarks)
-        if prev_game_over and not game.game_over:
-            no_hand_counter = 0
-            hand_counter = 0
-            pause = False
-
-    pygame.display.flip()
-    clock.tick(30)
+        game.invalidate()
+    else:
+        clock.tick(30)
 
-cap.release()
-cv2.destroyAllWindows()
+evaluator.close()
+if recorder is not None:
+    recorder.close()
+print("Session:", evaluator.metrics.report())
+pipeline.release()
+print("Pipeline stats:", pipeline.stats())
+print("Frame timings (ms):")
+print(profiler.report())
 pygame.quit()
@@ -1,45 +1,41 @@
-import pandas as pd
-from sklearn.metrics import confusion_matrix, classification_report
+import sys
+from utils.metrics import SessionMetrics, classification_report
+from utils.sessions import resolve_session
 
-df = pd.read_csv("logs/session_20251120_141424.csv")
-
-# ========== CLEANING ==========
-# Remove frames where real gesture is NONE, unless you want to evaluate pauses
-df_gestures = df[(df["gesture_real"] != "NONE") | (df["gesture_detected"] != "NONE")]
+# usage : python -m utils.analysis [SESSION]  (nom dans logs/ ou chemin)
+session = sys.argv[1] if len(sys.argv) > 1 else "session_20251120_141424"
+metrics = SessionMetrics.from_file(resolve_session("logs", session))
 
 # ========== BASIC METRICS ==========
 
 # Taux global de détection de main
-hand_detection_rate = df["hand_detected"].mean() * 100
+hand_detection_rate = metrics.hand_detection_rate() * 100
 
 # Taux de détection quand le jeu n'est pas en pause
-df_no_pause = df[df["paused"] == 0]
-hand_detection_no_pause = df_no_pause["hand_detected"].mean() * 100
+hand_detection_no_pause = metrics.hand_detection_rate(paused=False) * 100
 
 # Temps passé en pause
-pause_ratio = df["paused"].mean() * 100
+pause_ratio = metrics.pause_ratio() * 100
 
 # Fréquence de gestes détectés
-gesture_counts = df["gesture_detected"].value_counts()
+gesture_counts = metrics.gesture_counts()
 
 # ========== GESTURE ACCURACY ==========
 
-# Prendre uniquement les frames où un geste “réel” est défini (clavier)
-df_valid = df[df["gesture_real"] != "NONE"]
-
-y_true = df_valid["gesture_real"]
-y_pred = df_valid["gesture_detected"].replace("NONE", "NO_GESTURE")
-
-# Accuracy simple
-gesture_accuracy = (y_true == y_pred).mean() * 100
+# Uniquement les frames où un geste “réel” est défini (clavier)
+gesture_accuracy = metrics.accuracy() * 100
 
 # ========== CONFUSION MATRIX ==========
-labels = sorted(set(y_true) | set(y_pred))
-
-cm = confusion_matrix(y_true, y_pred, labels=labels)
+# (frames avec un geste réel uniquement : la ligne NONE est retirée)
+cm, labels = metrics.confusion()
+if "NONE" in labels:
+    cm[labels.index("NONE")] = 0
+    used = (cm.sum(axis=0) + cm.sum(axis=1)) > 0
+    cm = cm[used][:, used]
+    labels = [label for label, keep in zip(labels, used) if keep]
 
 # ========== CLASSIFICATION REPORT ==========
-report = classification_report(y_true, y_pred, labels=labels)
+report = classification_report(cm, labels)
 
 # ========== PRINT RESULTS ==========
 
@@ -48,7 +44,8 @@ print(f"Taux de détection de la main : {hand_detection_rate:.1f}%")
 print(f"Taux de détection (hors pause) : {hand_detection_no_pause:.1f}%")
 print(f"Taux de pause : {pause_ratio:.1f}%")
 print("\nDistribution des gestes détectés :")
-print(gesture_counts)
+for gesture, count in gesture_counts.items():
+    print(f"{gesture:>8} {count}")
 
 print("\n=== GESTURE ACCURACY ===")
 print(f"Précision globale des gestes : {gesture_accuracy:.1f}%")
@@ -1,49 +1,57 @@
-import pandas as pd
-from sklearn.metrics import confusion_matrix, classification_report
+import sys
+from utils.metrics import SessionMetrics, classification_report
+from utils.sessions import resolve_session
 
-df = pd.read_csv("logs/session_20251120_141424.csv")
+# usage : python -m utils.analysis_2 [SESSION]  (nom dans logs/ ou chemin)
+session = sys.argv[1] if len(sys.argv) > 1 else "session_20251120_141424"
+metrics = SessionMetrics.from_file(resolve_session("logs", session))
+labels = list(metrics.labels)
 
 # ======================================================
 # 1. Sélection des frames réellement évaluables
 # ======================================================
 
-# Jeu actif : paused = 0 ET game_over = 0
-df_active = df[(df["paused"] == 0) & (df["game_over"] == 0)]
+def eval_matrix(hand=None):
+    # Jeu actif : paused = 0 ET game_over = 0
+    cm, _ = metrics.confusion(labels, hand=hand, paused=False, game_over=False)
+    # Tentative de restart : pause ou game_over peu importe, mais geste réel = RESTART
+    all_frames, _ = metrics.confusion(labels, hand=hand)
+    restart = labels.index("RESTART")
+    cm[restart] = all_frames[restart]
+    return cm
 
-# Tentative de restart : pause ou game_over peu importe, mais geste réel = RESTART
-df_restart_attempt = df[(df["gesture_real"] == "RESTART")]
+cm = eval_matrix()
+n_eval = cm.sum()
 
-# Frames utiles = frames actives + frames de restart
-df_eval = pd.concat([df_active, df_restart_attempt]).reset_index(drop=True)
-
-print(f"Nombre de frames réellement analysées : {len(df_eval)}")
+print(f"Nombre de frames réellement analysées : {n_eval}")
 
 # ======================================================
 # 2. Détection de main (uniquement quand frame analysée)
 # ======================================================
-hand_detection_rate = df_eval["hand_detected"].mean() * 100
+hand_detection_rate = eval_matrix(hand=True).sum() / n_eval * 100 if n_eval else 0.0
 
 # ======================================================
 # 3. Accuracy des gestes
 # ======================================================
 
-y_true = df_eval["gesture_real"]
-y_pred = df_eval["gesture_detected"].replace("NONE", "NO_GESTURE")
-
-gesture_accuracy = (y_true == y_pred).mean() * 100
+# un geste détecté NONE (devenu NO_GESTURE) n'est jamais juste, même si le geste réel est NONE
+none = labels.index("NONE")
+gesture_accuracy = (cm.trace() - cm[none, none]) / n_eval * 100 if n_eval else 0.0
 
 # ======================================================
 # 4. Matrice de confusion
 # ======================================================
 
-labels = sorted(set(y_true) | set(y_pred))
-cm = confusion_matrix(y_true, y_pred, labels=labels)
+used = (cm.sum(axis=0) + cm.sum(axis=1)) > 0
+order = sorted((i for i in range(len(labels)) if used[i]), key=lambda i: labels[i])
+cm = cm[order][:, order]
+labels = [labels[i] for i in order]
 
 # ======================================================
 # 5. Rapport détaillé
 # ======================================================
 
-report = classification_report(y_true, y_pred, labels=labels)
+report = classification_report(cm, labels)
 
 # ======================================================
 # 6. Impression
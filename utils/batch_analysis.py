@@ -0,0 +1,148 @@
+"""
+Metrics of many sessions at once, computed in a process pool and cached.
+
+    python -m utils.batch_analysis "logs/spirale_*" [--workers N] [--cache FILE] [--rebuild]
+
+Each session's SessionMetrics (see utils/metrics.py) is stored in a JSON
+cache next to the logs, keyed by the absolute path and validated by file
+size + mtime; when those changed, a content hash decides whether the
+session really has to be read again (e.g. a copied or touched file does
+not). Only new or modified sessions are parsed, in parallel.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.metrics import SessionMetrics
+from utils.sessions import find_sessions
+
+CACHE_VERSION = 1
+DEFAULT_CACHE = os.path.join("logs", ".metrics_cache.json")
+
+
+def file_digest(path, block_size=1 << 20):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _analyse(job):
+    """Worker: (path, digest already cached or None) -> (path, cache entry, reused)."""
+    path, known_digest = job
+    st = os.stat(path)
+    entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": file_digest(path)}
+    if entry["digest"] == known_digest:
+        return path, entry, True
+    entry["metrics"] = SessionMetrics.from_file(path).to_dict()
+    return path, entry, False
+
+
+def _run(jobs, workers):
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        return [_analyse(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_analyse, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+class MetricsCache:
+    def __init__(self, path=DEFAULT_CACHE, load=True):
+        self.path = path
+        self.sessions = {}
+        if load and path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    self.sessions = data["sessions"]
+            except (OSError, ValueError, KeyError):
+                pass  # unreadable cache: start over
+
+    def lookup(self, key, st):
+        """Cached entry for `key` if the file size and mtime did not change."""
+        entry = self.sessions.get(key)
+        if entry is not None and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry
+        return None
+
+    def prune(self):
+        """Drop the entries of sessions that no longer exist."""
+        for key in [key for key in self.sessions if not os.path.exists(key)]:
+            del self.sessions[key]
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            # json.dumps uses the C encoder, json.dump(obj, f) does not
+            f.write(json.dumps({"version": CACHE_VERSION, "sessions": self.sessions}))
+        os.replace(tmp, self.path)
+
+
+def batch_metrics(paths, cache_path=DEFAULT_CACHE, workers=None, rebuild=False, stats=None):
+    """
+    SessionMetrics for every path (dict, same order as `paths`). Sessions
+    whose cache entry is still valid are not read; the others are parsed
+    in a process pool of `workers` processes (default: CPU count;
+    workers=1 stays in this process). cache_path=None disables the cache.
+    `stats`, if given, receives the counts: cached, rehashed, computed.
+    """
+    cache = MetricsCache(cache_path, load=not rebuild)
+    counts = {"cached": 0, "rehashed": 0, "computed": 0}
+    jobs = []
+    for path in paths:
+        key = os.path.abspath(path)
+        if cache.lookup(key, os.stat(path)) is not None:
+            counts["cached"] += 1
+        else:
+            entry = cache.sessions.get(key)
+            jobs.append((key, entry["digest"] if entry else None))
+
+    for key, entry, reused in _run(jobs, workers):
+        if reused:
+            entry["metrics"] = cache.sessions[key]["metrics"]
+            counts["rehashed"] += 1
+        else:
+            counts["computed"] += 1
+        cache.sessions[key] = entry
+
+    cache.prune()
+    if jobs:
+        cache.save()
+    if stats is not None:
+        stats.update(counts)
+    return {path: SessionMetrics.from_dict(cache.sessions[os.path.abspath(path)]["metrics"]) for path in paths}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pattern", nargs="?", default="logs/spirale_*",
+                        help="session files, without extension (default: logs/spirale_*)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="cache file ('' to disable)")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the existing cache")
+    args = parser.parse_args()
+
+    paths = find_sessions(args.pattern)
+    stats = {}
+    start = time.perf_counter()
+    metrics = batch_metrics(paths, cache_path=args.cache or None, workers=args.workers,
+                            rebuild=args.rebuild, stats=stats)
+    elapsed = time.perf_counter() - start
+    pooled = SessionMetrics()
+    for m in metrics.values():
+        pooled.merge(m)
+    print(f"{len(paths)} sessions in {elapsed:.2f}s ({stats['cached']} cached, "
+          f"{stats['rehashed']} unchanged content, {stats['computed']} computed)")
+    print(f"total: {pooled.report()}")
+
+
+if __name__ == "__main__":
+    main()
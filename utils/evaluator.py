@@ -1,10 +1,26 @@
 # evaluator.py
+import atexit
 import csv
 import time
 import os
 
+import numpy as np
+
+from utils.metrics import SessionMetrics
+from utils.sessions import FLAG_COLUMNS, GESTURE_COLUMNS, GESTURE_LABELS, encode_labels, write_npz
+
+HEADER = [
+    "timestamp",
+    "hand_detected",
+    "gesture_detected",
+    "gesture_real",
+    "paused",
+    "game_over"
+]
+
 class Evaluator:
-    def __init__(self, log_dir="logs", session_name=None):
+    def __init__(self, log_dir="logs", session_name=None, flush_rows=64, flush_interval=1.0, format="csv",
+                 timing_stages=()):
         """
         Logger pour enregistrer les performances du système.
         Chaque frame contiendra :
@@ -14,44 +30,144 @@ class Evaluator:
           - geste réel (clavier)
           - pause (0/1)
           - game over (0/1)
+
+        Le fichier reste ouvert et les lignes sont gardées en mémoire puis
+        écrites par lots : dès `flush_rows` lignes ou `flush_interval`
+        secondes depuis la dernière écriture, et toujours à la sortie du
+        programme (close() est enregistré avec atexit).
+
+        format="npz" écrit à la place un fichier colonnaire compact (voir
+        utils/sessions.py). Ce format n'est écrit qu'à la fermeture :
+        chaque lot de lignes est converti en tableaux NumPy compacts
+        (~20 octets par frame) gardés en mémoire, et le fichier entier est
+        écrit à chaque close(), de façon atomique. Un arrêt brutal
+        (SIGKILL, coupure de courant) ne laisse donc aucun fichier : pour
+        les longues sessions (borne), garder le CSV par défaut, écrit au
+        fil de l'eau, et le convertir ensuite (python -m utils.sessions
+        convert).
+
+        Les métriques (taux de détection, pause, matrice de confusion...)
+        sont tenues à jour à chaque frame dans `self.metrics`
+        (utils/metrics.py) et consultables pendant la session.
+
+        timing_stages : noms d'étapes (ex. "capture", "draw", "latency")
+        dont la durée est ajoutée à chaque ligne, en colonnes
+        "<étape>_ms" après les colonnes habituelles (voir
+        utils/profiler.py) ; vides quand l'étape n'a pas eu lieu.
         """
         os.makedirs(log_dir, exist_ok=True)
         if session_name is None:
             session_name = time.strftime("%Y%m%d_%H%M%S")
 
-        self.file_path = os.path.join(log_dir, f"session_{session_name}.csv")
-
-        # Écrit la ligne d'en-tête
-        with open(self.file_path, mode="w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                "timestamp",
-                "hand_detected",
-                "gesture_detected",
-                "gesture_real",
-                "paused",
-                "game_over"
-            ])
-
-    def log_frame(self, hand_detected, gesture_detected, gesture_real, paused, game_over):
+        if format not in ("csv", "npz"):
+            raise ValueError(f"unknown log format: {format}")
+        self.format = format
+        self.file_path = os.path.join(log_dir, f"session_{session_name}.{format}")
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._rows = []
+        self._last_flush = time.monotonic()
+        self._file = None
+        self.timing_stages = tuple(timing_stages)
+        self.header = HEADER + [f"{stage}_ms" for stage in self.timing_stages]
+        self._chunks = []           # format npz : colonnes des lots déjà convertis
+        self._labels = list(GESTURE_LABELS)
+        self.metrics = SessionMetrics()
+
+        if format == "csv":
+            # Écrit la ligne d'en-tête
+            self._file = open(self.file_path, mode="w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self.header)
+            self._file.flush()
+        atexit.register(self.close)
+
+    def log_frame(self, hand_detected, gesture_detected, gesture_real, paused, game_over, timestamp=None,
+                  timings=None):
         """
-        Ajoute une ligne au CSV.
+        Ajoute une ligne au journal.
         - hand_detected : 0/1
         - gesture_detected : geste IA
         - gesture_real : geste clavier (ou NONE)
         - paused : 0/1
         - game_over : 0/1
+        - timestamp : horodatage à écrire (time.time() par défaut, fourni en rejeu)
+        - timings : {étape: secondes} pour les colonnes timing_stages
         """
-        with open(self.file_path, mode="a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                time.time(),
-                int(hand_detected),
-                gesture_detected if gesture_detected else "NONE",
-                gesture_real if gesture_real else "NONE",
-                int(paused),
-                int(game_over)
-            ])
+        row = [
+            time.time() if timestamp is None else timestamp,
+            int(hand_detected),
+            gesture_detected if gesture_detected else "NONE",
+            gesture_real if gesture_real else "NONE",
+            int(paused),
+            int(game_over)
+        ]
+        self.metrics.update(hand_detected, row[2], row[3], paused, game_over)
+        if self.timing_stages:
+            timings = timings or {}
+            for stage in self.timing_stages:
+                seconds = timings.get(stage)
+                if self.format == "npz":
+                    row.append(float("nan") if seconds is None else seconds * 1e3)
+                else:
+                    row.append("" if seconds is None else round(seconds * 1e3, 3))
+        self._rows.append(row)
+        if len(self._rows) >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Écrit les lignes en attente sur le disque (format npz : les convertit en colonnes)."""
+        self._last_flush = time.monotonic()
+        if not self._rows:
+            return
+        if self.format == "npz":
+            self._chunks.append(self._rows_to_columns())
+            self._rows.clear()
+            return
+        if self._file is None:
+            # journal déjà fermé : on rouvre en ajout
+            self._file = open(self.file_path, mode="a", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+            atexit.register(self.close)
+        self._writer.writerows(self._rows)
+        self._rows.clear()
+        self._file.flush()
+
+    def _rows_to_columns(self):
+        columns = dict(zip(self.header, zip(*self._rows)))
+        chunk = {"timestamp": np.array(columns["timestamp"], dtype=np.float64)}
+        for name in FLAG_COLUMNS:
+            chunk[name] = np.array(columns[name], dtype=bool)
+        for name in GESTURE_COLUMNS:
+            chunk[name] = encode_labels(columns[name], self._labels)
+        for name in self.header[len(HEADER):]:
+            chunk[name] = np.array(columns[name], dtype=np.float32)
+        return chunk
+
+    def close(self):
+        """Écrit les lignes en attente et ferme le fichier."""
+        if self.format == "npz":
+            self.flush()
+            if self._chunks:
+                columns = {name: np.concatenate([chunk[name] for chunk in self._chunks]) for name in self.header}
+            else:
+                columns = {name: [] for name in self.header}
+            columns["gesture_labels"] = self._labels
+            write_npz(self.file_path, columns)
+            atexit.unregister(self.close)
+            return
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
 
     def get_path(self):
         return self.file_path
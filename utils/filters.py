@@ -0,0 +1,98 @@
+import math
+from collections import deque
+
+import numpy as np
+
+
+class OneEuroFilter:
+    """
+    One-Euro filter (Casiez et al., 2012) applied element-wise to an array,
+    e.g. the (hands, 21, 3) landmarks of HandTracker.
+
+    The cutoff frequency grows with the signal speed: jitter is strongly
+    smoothed when the hand is still, and fast moves go through with little
+    lag. Units: min_cutoff and d_cutoff in Hz, beta in 1/(units of x).
+    The state is reset when the array shape changes (hand count changes)
+    or after a gap longer than `reset_after` seconds.
+
+    MediaPipe returns the hands of a frame in no stable order: for
+    (hands, points, dims) arrays the state of each hand is first matched
+    to the nearest new hand (mean x, y of its points, greedily by
+    increasing distance) and reordered, so two hands that swap places in
+    the array are not blended together. The output keeps the input order.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0, reset_after=0.5):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset_after = reset_after
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._dx = None
+        self._t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x, t):
+        x = np.asarray(x, dtype=np.float32)
+        if self._x is None or x.shape != self._x.shape or t - self._t > self.reset_after:
+            self._x = x.copy()
+            self._dx = np.zeros_like(x)
+            self._t = t
+            return x
+        if x.ndim == 3 and len(x) > 1:
+            self._follow_hands(x)
+        dt = t - self._t
+        if dt <= 0:
+            return self._x.copy()
+        self._t = t
+
+        dx = (x - self._x) / dt
+        self._dx += self._alpha(self.d_cutoff, dt) * (dx - self._dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        tau = 1.0 / (2 * np.pi * cutoff)
+        alpha = 1.0 / (1.0 + tau / dt)
+        self._x += alpha * (x - self._x)
+        return self._x.copy()
+
+    def _follow_hands(self, x):
+        """Reorder the per-hand state to the hand order of `x`."""
+        n = len(x)
+        centers, previous = x[..., :2].mean(axis=1), self._x[..., :2].mean(axis=1)
+        dist = np.linalg.norm(centers[:, None, :] - previous[None, :, :], axis=2)
+        order = np.full(n, -1, dtype=np.int64)
+        taken = np.zeros(n, dtype=bool)
+        for flat in np.argsort(dist, axis=None):
+            hand, old = divmod(int(flat), n)
+            if order[hand] < 0 and not taken[old]:
+                order[hand] = old
+                taken[old] = True
+        if (order != np.arange(n)).any():
+            self._x = self._x[order]
+            self._dx = self._dx[order]
+
+
+class MajorityVote:
+    """
+    Debounce a stream of labels by returning the most frequent of the last
+    `window` values (the previous behaviour of get_direction_from_index).
+    """
+
+    def __init__(self, window=5):
+        self.window = window
+        self._recent = deque(maxlen=window)
+
+    def reset(self):
+        self._recent.clear()
+
+    def __call__(self, label):
+        self._recent.append(label)
+        if len(self._recent) < self.window:
+            return label
+        return max(set(self._recent), key=self._recent.count)
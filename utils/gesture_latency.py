@@ -0,0 +1,245 @@
+"""
+Gesture-to-action latency of the gesture stack, per gesture.
+
+    python -m utils.gesture_latency [INPUT ...] [--configs raw vote5 one_euro+vote3]
+                                    [--json REPORT.json]
+
+INPUT is either
+  - a session log (.csv/.npz, default: logs/spirale_*): its recorded
+    `gesture_detected` column is scored against the keyboard
+    `gesture_real` (config "recorded");
+  - a landmark stream (.npz saved by `utils.replay --save-landmarks`,
+    with gesture_real) or a .lmk landmark recording (main.py
+    --record-landmarks): it is replayed headlessly through every
+    classifier of --configs (see make_classifier).
+
+Scored per gesture and over all of them:
+  - onset latency: from the first frame of a run of gesture_real == G to
+    the first frame of that run where the detected gesture is G (mean,
+    p50, p95, max in ms); runs where it never comes are "missed";
+  - false switches: frames where the detected gesture changes to a value
+    other than gesture_real, counted for the new gesture, and per minute;
+  - stability: fraction of the frames from the onset to the end of the
+    run where the detected gesture stays G.
+
+The JSON report ({"inputs": [...], "configs": {config: {"ALL": {...},
+"UP": {...}, ...}}}) is meant to be diffed between configurations.
+"""
+import argparse
+import json
+import sys
+from collections import Counter
+
+import numpy as np
+
+from utils.filters import MajorityVote, OneEuroFilter
+from utils.movements import DIRECTIONS, get_direction_from_index
+from utils.sessions import find_sessions, read_columns
+
+NONE = "NONE"
+GESTURES = [str(g) for g in DIRECTIONS]
+
+
+class LatencyStats:
+    """Onset latencies, misses, false switches and stability, pooled over sessions."""
+
+    def __init__(self):
+        self.latencies = {g: [] for g in GESTURES}     # arrays of seconds
+        self.onsets = Counter()
+        self.missed = Counter()
+        self.false_switches = Counter()
+        self.held_frames = Counter()
+        self.stable_frames = Counter()
+        self.frames = 0
+        self.duration = 0.0
+
+    def update(self, t, real, detected):
+        """Score one session: timestamps (s) and the real / detected gesture per frame."""
+        t = np.asarray(t, dtype=np.float64)
+        real = np.asarray(real, dtype=str)
+        detected = np.asarray(detected, dtype=str)
+        n = len(t)
+        if n == 0:
+            return self
+        self.frames += n
+        self.duration += float(t[-1] - t[0])
+
+        # runs of gesture_real: each change to a direction is an onset
+        changes = np.flatnonzero(real[1:] != real[:-1]) + 1
+        starts = changes[np.isin(real[changes], GESTURES)]
+        bounds = np.append(changes, n)
+        ends = bounds[np.searchsorted(bounds, starts, side="right")]
+
+        correct = detected == real
+        matches = np.flatnonzero(correct)
+        k = np.searchsorted(matches, starts)
+        first = matches[np.minimum(k, max(len(matches) - 1, 0))] if len(matches) else np.full(len(starts), n)
+        found = (k < len(matches)) & (first < ends)
+        correct_before = np.concatenate(([0], np.cumsum(correct)))
+
+        for g in np.unique(real[starts]).tolist():
+            mine = real[starts] == g
+            hit = mine & found
+            self.onsets[g] += int(mine.sum())
+            self.missed[g] += int((mine & ~found).sum())
+            self.latencies[g].append(t[first[hit]] - t[starts[hit]])
+            self.held_frames[g] += int((ends[hit] - first[hit]).sum())
+            self.stable_frames[g] += int((correct_before[ends[hit]] - correct_before[first[hit]]).sum())
+
+        switches = np.flatnonzero((detected[1:] != detected[:-1]) & ~correct[1:]) + 1
+        labels, counts = np.unique(detected[switches], return_counts=True)
+        self.false_switches.update(dict(zip(labels.tolist(), counts.tolist())))
+        return self
+
+    def merge(self, other):
+        for g in GESTURES:
+            self.latencies[g].extend(other.latencies[g])
+        for name in ("onsets", "missed", "false_switches", "held_frames", "stable_frames"):
+            getattr(self, name).update(getattr(other, name))
+        self.frames += other.frames
+        self.duration += other.duration
+        return self
+
+    def _entry(self, gestures):
+        lat = [a for g in gestures for a in self.latencies.get(g, ())]
+        lat = np.concatenate(lat) * 1e3 if lat else np.empty(0)
+        onsets = sum(self.onsets[g] for g in gestures)
+        missed = sum(self.missed[g] for g in gestures)
+        held = sum(self.held_frames[g] for g in gestures)
+        switches = sum(self.false_switches[g] for g in gestures)
+        minutes = self.duration / 60
+        entry = {
+            "onsets": onsets,
+            "missed": missed,
+            "miss_rate": missed / onsets if onsets else 0.0,
+            "latency_ms": None,
+            "false_switches": switches,
+            "false_switches_per_min": switches / minutes if minutes else 0.0,
+            "stability": sum(self.stable_frames[g] for g in gestures) / held if held else None,
+        }
+        if len(lat):
+            p50, p95 = np.percentile(lat, (50, 95))
+            entry["latency_ms"] = {"mean": float(lat.mean()), "p50": float(p50), "p95": float(p95),
+                                   "max": float(lat.max())}
+        return entry
+
+    def report(self):
+        """JSON-serialisable dict: "ALL" then one entry per gesture."""
+        # false switches to NONE (hand lost) only count in ALL
+        report = {"ALL": self._entry(GESTURES + [g for g in self.false_switches if g not in GESTURES])}
+        report["ALL"].update(frames=self.frames, minutes=self.duration / 60)
+        for g in GESTURES:
+            report[g] = self._entry([g])
+        return report
+
+
+def make_classifier(config):
+    """
+    Frame-by-frame gesture classifier for a configuration name, returning
+    classify(landmarks, timestamp) -> gesture ("NONE" without a hand):
+      - "raw"                 : get_direction_from_index, no smoothing
+      - "vote<N>"             : + N-frame MajorityVote on the labels
+      - "one_euro[:MIN:BETA]" : OneEuroFilter on the landmarks first
+      - "model[:PATH]"        : utils.gesture_model classifier instead of
+                                the index angle (default: DEFAULT_MODEL)
+    Parts combine with "+", e.g. "one_euro:1.0:0.02+vote3".
+    """
+    smoother = vote = None
+    direction = get_direction_from_index
+    for part in config.split("+"):
+        name, _, params = part.partition(":")
+        if name == "raw":
+            continue
+        if name == "model":
+            from utils.gesture_model import DEFAULT_MODEL, GestureClassifier
+            direction = GestureClassifier.load(params or DEFAULT_MODEL)
+            continue
+        if name == "one_euro":
+            values = [float(v) for v in params.split(":")] if params else []
+            smoother = OneEuroFilter(*values)
+        elif name.startswith("vote") and name[4:].isdigit():
+            vote = MajorityVote(int(name[4:]))
+        else:
+            raise ValueError(f"unknown gesture configuration: {part!r}")
+
+    def classify(landmarks, timestamp):
+        if smoother is not None:
+            landmarks = smoother(landmarks, timestamp)
+        return direction(landmarks, vote) or NONE
+    return classify
+
+
+def classify_stream(timestamps, landmarks, config):
+    """Detected gesture of every frame of a landmark sequence, as a list."""
+    classify = make_classifier(config)
+    return [classify(lm, t) for lm, t in zip(landmarks, timestamps)]
+
+
+def is_landmark_stream(path):
+    if path.endswith(".lmk"):
+        return True
+    if not path.endswith(".npz"):
+        return False
+    with np.load(path) as data:
+        return "landmarks" in data.files
+
+
+def score_log(path):
+    """LatencyStats of the gesture_detected column recorded in a session log."""
+    columns = read_columns(path, decode=True)
+    return LatencyStats().update(columns["timestamp"], columns["gesture_real"], columns["gesture_detected"])
+
+
+def score_stream(path, configs):
+    """{config: LatencyStats} of a landmark stream replayed through each configuration."""
+    from utils.replay import open_stream
+
+    frames = list(open_stream(path))
+    timestamps, landmarks, real = zip(*frames) if frames else ((), (), ())
+    return {config: LatencyStats().update(timestamps, real, classify_stream(timestamps, landmarks, config))
+            for config in configs}
+
+
+def format_report(name, report):
+    """One line per configuration: overall latency, misses, false switches, stability."""
+    entry = report["ALL"]
+    lat = entry["latency_ms"]
+    latency = f"lag mean {lat['mean']:6.1f} ms  p95 {lat['p95']:6.1f} ms" if lat else "no onsets" + " " * 25
+    stability = f"{entry['stability']:.3f}" if entry["stability"] is not None else "-"
+    return (f"{name:>16}: {latency}  missed {entry['missed']:>3}/{entry['onsets']:<4} "
+            f"false switches {entry['false_switches_per_min']:5.2f}/min  stability {stability}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="*", help="session logs and/or landmark streams (.npz)")
+    parser.add_argument("--configs", nargs="+", default=["raw", "vote5", "one_euro", "one_euro+vote3"],
+                        help="classifiers for the landmark streams (see make_classifier)")
+    parser.add_argument("--json", default=None, help="write the report to this file ('-': stdout)")
+    args = parser.parse_args()
+
+    inputs = args.inputs or find_sessions("logs/spirale_*")
+    totals = {}
+    for path in inputs:
+        if is_landmark_stream(path):
+            results = score_stream(path, args.configs)
+        else:
+            results = {"recorded": score_log(path)}
+        for config, stats in results.items():
+            totals.setdefault(config, LatencyStats()).merge(stats)
+
+    report = {"inputs": inputs, "configs": {config: stats.report() for config, stats in totals.items()}}
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+    print(f"{len(inputs)} inputs")
+    for config, entry in report["configs"].items():
+        print(format_report(config, entry))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Learned gesture classifier on the hand landmarks, pure NumPy.
+
+    python -m utils.gesture_model train STREAM.npz [...] [--out gesture_model.npz]
+                                  [--hidden 32] [--epochs 400]
+    python -m utils.gesture_model eval STREAM.npz [...] [--model gesture_model.npz]
+
+STREAM is a landmark stream with keyboard labels: a .lmk recording
+(main.py --record-landmarks, see utils.landmark_recording) or a .npz
+written by `utils.replay --save-landmarks`. The first hand of every
+frame whose `gesture_real` is a direction is a training example.
+Features are the 21 (x, y) points relative to the wrist, divided by
+the hand size (translation/scale invariant, not rotation invariant: the
+direction is the rotation), then standardized.
+
+The model is a softmax regression (--hidden 0) or an MLP with one ReLU
+hidden layer, trained by full-batch Adam on the cross-entropy. Inference
+is a couple of matrix products over a whole batch of hands: predict()
+takes (hands, 21, 3) arrays, e.g. every frame of a session at once for
+offline evaluation, and the classifier is a drop-in replacement for
+get_direction_from_index (main.py --gesture-model, gesture_latency's
+"model" configuration, PlayerGestures(directions=model.predict)).
+"""
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+
+from utils.landmark_recording import LandmarkRecording, is_recording
+from utils.movements import DIRECTIONS, LANDMARK_COUNT, WRIST, as_landmark_array, directions_from_index
+
+# fichier placé à la racine du dépôt, comme le classement
+DEFAULT_MODEL = Path(__file__).resolve().parents[1] / "gesture_model.npz"
+FEATURES = 2 * LANDMARK_COUNT
+
+
+def landmark_features(landmarks):
+    """(hands, 42) float32 features of every hand: wrist-relative (x, y) / hand size."""
+    pts = as_landmark_array(landmarks)
+    if pts.shape[1] < LANDMARK_COUNT:
+        return np.empty((0, FEATURES), dtype=np.float32)
+    xy = pts[:, :LANDMARK_COUNT, :2] - pts[:, WRIST:WRIST + 1, :2]
+    size = np.sqrt((xy * xy).sum(axis=2).max(axis=1))
+    xy /= np.maximum(size, 1e-6)[:, None, None]
+    return xy.reshape(len(pts), FEATURES)
+
+
+def labelled_hands(path, classes=DIRECTIONS):
+    """
+    (hands, labels): the first hand of the frames of a landmark stream
+    (.lmk or .npz) whose gesture_real is in `classes`; None without labels.
+    """
+    if is_recording(path):
+        recording = LandmarkRecording(path)
+        codes = np.flatnonzero(np.isin(recording.labels, classes))
+        keep = (recording.hand_count > 0) & np.isin(recording.records["gesture_real"], codes)
+        return recording.landmarks[keep, 0], recording.gestures(index=keep)
+    with np.load(path) as data:
+        if "gesture_real" not in data.files:
+            return None
+        keep = (data["hand_count"] > 0) & np.isin(data["gesture_real"], classes)
+        return data["landmarks"][keep, 0], data["gesture_real"][keep]
+
+
+def load_examples(paths, classes=DIRECTIONS):
+    """Features and labels of the first hand of the labelled frames of landmark streams."""
+    features, labels = [], []
+    for path in paths:
+        examples = labelled_hands(path, classes)
+        if examples is not None:
+            features.append(landmark_features(examples[0]))
+            labels.append(examples[1])
+    if not features:
+        return np.empty((0, FEATURES), dtype=np.float32), np.empty(0, dtype=str)
+    return np.concatenate(features), np.concatenate(labels)
+
+
+def _forward(x, weights, biases):
+    """Activations of every layer; the last one is the logits."""
+    layers = [x]
+    for i, (w, b) in enumerate(zip(weights, biases)):
+        x = x @ w + b
+        if i < len(weights) - 1:
+            x = np.maximum(x, 0.0)
+        layers.append(x)
+    return layers
+
+
+def _softmax(logits):
+    e = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class GestureClassifier:
+    """Softmax regression / one-hidden-layer MLP over landmark_features."""
+
+    def __init__(self, classes, mean, std, weights, biases):
+        self.classes = np.asarray(classes, dtype=str)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.std = np.asarray(std, dtype=np.float32)
+        self.weights = [np.asarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+
+    @classmethod
+    def train(cls, features, labels, hidden=32, epochs=400, lr=0.01, l2=1e-4, seed=0):
+        """Fit on (n, 42) features and their n labels (full-batch Adam)."""
+        features = np.asarray(features, dtype=np.float32)
+        classes, y = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+        if len(features) == 0 or len(classes) < 2:
+            raise ValueError("need labelled examples of at least two gestures")
+        mean, std = features.mean(axis=0), features.std(axis=0) + 1e-6
+        x = (features - mean) / std
+        target = np.eye(len(classes), dtype=np.float32)[y]
+
+        rng = np.random.default_rng(seed)
+        sizes = [FEATURES] + ([hidden] if hidden else []) + [len(classes)]
+        params = []
+        for n_in, n_out in zip(sizes[:-1], sizes[1:]):
+            params += [rng.normal(0.0, np.sqrt(2.0 / n_in), size=(n_in, n_out)).astype(np.float32),
+                       np.zeros(n_out, dtype=np.float32)]
+        m = [np.zeros_like(p) for p in params]
+        v = [np.zeros_like(p) for p in params]
+        beta1, beta2 = 0.9, 0.999
+        for step in range(1, epochs + 1):
+            weights, biases = params[0::2], params[1::2]
+            layers = _forward(x, weights, biases)
+            delta = (_softmax(layers[-1]) - target) / len(x)
+            grads = []
+            for i in reversed(range(len(weights))):
+                grads[:0] = [layers[i].T @ delta + l2 * weights[i], delta.sum(axis=0)]
+                if i:
+                    delta = (delta @ weights[i].T) * (layers[i] > 0)
+            for p, g, m_p, v_p in zip(params, grads, m, v):
+                m_p *= beta1
+                m_p += (1 - beta1) * g
+                v_p *= beta2
+                v_p += (1 - beta2) * g * g
+                p -= lr * (m_p / (1 - beta1 ** step)) / (np.sqrt(v_p / (1 - beta2 ** step)) + 1e-8)
+        return cls(classes, mean, std, params[0::2], params[1::2])
+
+    def _logits(self, features):
+        x = (np.asarray(features, dtype=np.float32) - self.mean) / self.std
+        return _forward(x, self.weights, self.biases)[-1]
+
+    def predict_proba_features(self, features):
+        return _softmax(self._logits(features))
+
+    def predict_proba(self, landmarks):
+        """(hands, classes) probabilities for a (hands, 21, 3) batch."""
+        return self.predict_proba_features(landmark_features(landmarks))
+
+    def predict_features(self, features):
+        if len(features) == 0:
+            return np.empty(0, dtype=self.classes.dtype)
+        return self.classes[self._logits(features).argmax(axis=1)]
+
+    def predict(self, landmarks):
+        """Gesture of every hand of a (hands, 21, 3) batch, like directions_from_index."""
+        return self.predict_features(landmark_features(landmarks))
+
+    def __call__(self, landmarks, debounce=None):
+        """Gesture of the first hand or None, like get_direction_from_index."""
+        gestures = self.predict(landmarks)
+        if len(gestures) == 0:
+            return None
+        gesture = str(gestures[0])
+        return debounce(gesture) if debounce is not None else gesture
+
+    def save(self, path=DEFAULT_MODEL):
+        """Write the model as .npz, atomically (temporary file + rename)."""
+        path = str(path)
+        arrays = {"classes": self.classes, "mean": self.mean, "std": self.std}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            arrays[f"w{i}"], arrays[f"b{i}"] = w, b
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL):
+        with np.load(str(path)) as data:
+            layers = sum(name.startswith("w") for name in data.files)
+            return cls(data["classes"], data["mean"], data["std"],
+                       [data[f"w{i}"] for i in range(layers)], [data[f"b{i}"] for i in range(layers)])
+
+
+def accuracy_report(labels, predictions):
+    """{gesture: accuracy} over the frames of each real gesture, plus "ALL"."""
+    labels, predictions = np.asarray(labels, dtype=str), np.asarray(predictions, dtype=str)
+    report = {"ALL": float((labels == predictions).mean()) if len(labels) else None}
+    for g in np.unique(labels).tolist():
+        mine = labels == g
+        report[g] = float((predictions[mine] == g).mean())
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    train = sub.add_parser("train", help="train on labelled landmark streams")
+    train.add_argument("streams", nargs="+")
+    train.add_argument("--out", default=str(DEFAULT_MODEL))
+    train.add_argument("--hidden", type=int, default=32, help="hidden units (0: softmax regression)")
+    train.add_argument("--epochs", type=int, default=400)
+    train.add_argument("--seed", type=int, default=0)
+    evaluate = sub.add_parser("eval", help="accuracy of the model vs the index-angle rule")
+    evaluate.add_argument("streams", nargs="+")
+    evaluate.add_argument("--model", default=str(DEFAULT_MODEL))
+    args = parser.parse_args()
+
+    if args.command == "train":
+        features, labels = load_examples(args.streams)
+        model = GestureClassifier.train(features, labels, hidden=args.hidden, epochs=args.epochs, seed=args.seed)
+        model.save(args.out)
+        print(f"{len(labels)} examples, classes {model.classes.tolist()}, "
+              f"train accuracy {accuracy_report(labels, model.predict_features(features))['ALL']:.3f} -> {args.out}")
+        return
+
+    model = GestureClassifier.load(args.model)
+    for path in args.streams:
+        examples = labelled_hands(path, model.classes)
+        if examples is None:
+            print(f"{path}: no keyboard labels, skipped")
+            continue
+        hands, labels = examples
+        if len(labels) == 0:
+            print(f"{path}: no labelled frames with a hand, skipped")
+            continue
+        learned = accuracy_report(labels, model.predict(hands))
+        rules = accuracy_report(labels, directions_from_index(hands))
+        print(f"{path}: {len(labels)} labelled frames")
+        for g in learned:
+            print(f"  {g:>6}: model {learned[g]:.3f}  rules {rules[g]:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Landmark recordings: the raw HandTracker output of a session, for
+re-evaluating thresholds and training classifiers (utils.gesture_model).
+
+    python -m utils.landmark_recording info FILE.lmk [...]
+    python -m utils.landmark_recording convert STREAM.npz [...]   # writes .lmk next to each
+
+A .lmk file is a 64-byte header followed by fixed-stride records
+(record_dtype), so it can be appended to during play and opened with
+np.memmap: slicing millions of frames reads only the pages touched, with
+no parsing and no copy. Header: magic, version, max_hands, record size
+and the gesture label table (comma-separated). Record, little-endian:
+
+    timestamp        float64   time.time() of the camera capture
+    hand_count       uint8     hands actually present (<= max_hands)
+    gesture_real     uint8     keyboard label, code into the label table
+    gesture_detected uint8     classifier output (player 1), same codes
+    landmarks        float32   (max_hands, 21, 3), zeros after hand_count
+    hand_info        HAND_INFO_DTYPE (max_hands,): handedness, score
+
+A crash leaves at most a partial last record, which readers ignore.
+"""
+import argparse
+import atexit
+import os
+import struct
+import time
+
+import numpy as np
+
+from utils.movements import HAND_INFO_DTYPE, LANDMARK_COUNT
+from utils.sessions import GESTURE_LABELS
+
+EXTENSION = ".lmk"
+MAGIC = b"LMKREC\x00\x00"
+VERSION = 1
+HEADER = struct.Struct("<8sHHI")
+HEADER_SIZE = 64
+LABELS_SIZE = HEADER_SIZE - HEADER.size
+
+
+def record_dtype(max_hands=1):
+    """Fixed-stride record of a frame with up to `max_hands` hands (float32 fields 4-byte aligned)."""
+    landmarks_size = max_hands * LANDMARK_COUNT * 3 * 4
+    info_offset = 12 + landmarks_size
+    itemsize = -(-(info_offset + max_hands * HAND_INFO_DTYPE.itemsize) // 8) * 8
+    return np.dtype({
+        "names": ["timestamp", "hand_count", "gesture_real", "gesture_detected", "landmarks", "hand_info"],
+        "formats": ["<f8", "u1", "u1", "u1", ("<f4", (max_hands, LANDMARK_COUNT, 3)), (HAND_INFO_DTYPE, (max_hands,))],
+        "offsets": [0, 8, 9, 10, 12, info_offset],
+        "itemsize": itemsize,
+    })
+
+
+def _pack_header(max_hands, labels):
+    table = ",".join(labels).encode("ascii")
+    if len(table) > LABELS_SIZE:
+        raise ValueError("gesture label table does not fit in the header")
+    return HEADER.pack(MAGIC, VERSION, max_hands, record_dtype(max_hands).itemsize) + table.ljust(LABELS_SIZE, b"\0")
+
+
+def read_header(path):
+    """(max_hands, labels) of a .lmk file; ValueError if it is not one."""
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f"{path}: truncated landmark recording header")
+    magic, version, max_hands, record_size = HEADER.unpack_from(raw)
+    if magic != MAGIC or version != VERSION or record_size != record_dtype(max_hands).itemsize:
+        raise ValueError(f"{path}: not a version {VERSION} landmark recording")
+    labels = raw[HEADER.size:].rstrip(b"\0").decode("ascii").split(",")
+    return max_hands, labels
+
+
+class LandmarkRecorder:
+    """
+    Appends frames to a .lmk file. Records are kept in a preallocated
+    buffer and written in batches: every `flush_frames` frames or
+    `flush_interval` seconds, and at exit (close() is registered with
+    atexit). An existing file is appended to, if its max_hands matches.
+    """
+
+    def __init__(self, path, max_hands=1, flush_frames=256, flush_interval=1.0):
+        self.path = str(path)
+        self.max_hands = max_hands
+        self.labels = list(GESTURE_LABELS)
+        self.flush_interval = flush_interval
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            existing, labels = read_header(self.path)
+            if existing != max_hands:
+                raise ValueError(f"{self.path} records {existing} hands per frame, not {max_hands}")
+            self.labels = labels
+            dtype = record_dtype(max_hands)
+            # drop a partial last record left by a crash before appending
+            frames = (os.path.getsize(self.path) - HEADER_SIZE) // dtype.itemsize
+            with open(self.path, "r+b") as f:
+                f.truncate(HEADER_SIZE + frames * dtype.itemsize)
+            self._file = open(self.path, "ab")
+        else:
+            self._file = open(self.path, "wb")
+            self._file.write(_pack_header(max_hands, self.labels))
+            frames = 0
+        self._codes = {label: i for i, label in enumerate(self.labels)}
+        self._buffer = np.zeros(flush_frames, dtype=record_dtype(max_hands))
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self.frames = frames
+        atexit.register(self.close)
+
+    def _code(self, label):
+        code = self._codes.get("NONE" if label is None else str(label))
+        if code is None:
+            raise ValueError(f"unknown gesture label: {label!r}")
+        return code
+
+    def append(self, timestamp, landmarks, gesture_real="NONE", gesture_detected="NONE", hand_info=None):
+        """Record one frame: (hands, 21, 3) landmarks, extra hands beyond max_hands dropped."""
+        record = self._buffer[self._pending]
+        hands = 0 if landmarks is None else min(len(landmarks), self.max_hands)
+        record["timestamp"] = timestamp
+        record["hand_count"] = hands
+        record["gesture_real"] = self._code(gesture_real)
+        record["gesture_detected"] = self._code(gesture_detected)
+        if hands:
+            record["landmarks"][:hands] = np.asarray(landmarks, dtype=np.float32)[:hands, :LANDMARK_COUNT, :3]
+        record["landmarks"][hands:] = 0.0
+        record["hand_info"][:] = (-1, 0.0)
+        if hand_info is not None:
+            record["hand_info"][:hands] = hand_info[:hands]
+        self._pending += 1
+        self.frames += 1
+        if self._pending == len(self._buffer) or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self._file is None:
+            return
+        if self._pending:
+            self._file.write(self._buffer[:self._pending].tobytes())
+            self._pending = 0
+        self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkRecording:
+    """
+    Read-only view of a .lmk file: `records` is an np.memmap of
+    record_dtype, so recording.records["landmarks"][a:b] or
+    recording[a:b] slice the file without reading the rest of it.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.max_hands, labels = read_header(self.path)
+        self.labels = np.asarray(labels, dtype=str)
+        dtype = record_dtype(self.max_hands)
+        frames = (os.path.getsize(self.path) - HEADER_SIZE) // dtype.itemsize
+        if frames:
+            self.records = np.memmap(self.path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(frames,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)   # np.memmap refuses empty maps
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    @property
+    def timestamps(self):
+        return self.records["timestamp"]
+
+    @property
+    def landmarks(self):
+        return self.records["landmarks"]
+
+    @property
+    def hand_count(self):
+        return self.records["hand_count"]
+
+    def gestures(self, field="gesture_real", index=slice(None)):
+        """Labels of `field` ("gesture_real" / "gesture_detected") as strings."""
+        return self.labels[self.records[field][index]]
+
+    def stream(self):
+        """Yield (timestamp, landmarks, gesture_real) like replay.landmark_stream."""
+        records = self.records
+        labels = self.labels.tolist()
+        for start in range(0, len(records), 4096):
+            chunk = np.array(records[start:start + 4096])     # one read per chunk
+            for record in chunk:
+                yield (float(record["timestamp"]), record["landmarks"][:record["hand_count"]],
+                       labels[record["gesture_real"]])
+
+
+def is_recording(path):
+    return str(path).endswith(EXTENSION)
+
+
+def convert(npz_path, lmk_path=None):
+    """Write a landmark stream .npz (replay.save_landmark_stream) as a .lmk recording."""
+    lmk_path = lmk_path or os.path.splitext(npz_path)[0] + EXTENSION
+    with np.load(npz_path) as data:
+        timestamps, landmarks, hand_count = data["timestamps"], data["landmarks"], data["hand_count"]
+        real = data["gesture_real"] if "gesture_real" in data.files else None
+    if os.path.exists(lmk_path):
+        os.remove(lmk_path)
+    with LandmarkRecorder(lmk_path, max_hands=landmarks.shape[1], flush_frames=4096) as recorder:
+        for i in range(len(timestamps)):
+            recorder.append(timestamps[i], landmarks[i, :hand_count[i]], real[i] if real is not None else "NONE")
+    return lmk_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Landmark recording tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="frames, duration and labels of recordings")
+    info.add_argument("files", nargs="+")
+    conv = sub.add_parser("convert", help="convert .npz landmark streams to .lmk")
+    conv.add_argument("files", nargs="+")
+    args = parser.parse_args()
+
+    for path in args.files:
+        if args.command == "convert":
+            out = convert(path)
+            print(f"{path} ({os.path.getsize(path)} B) -> {out} ({os.path.getsize(out)} B)")
+            continue
+        recording = LandmarkRecording(path)
+        t = recording.timestamps
+        duration = float(t[-1] - t[0]) if len(t) else 0.0
+        codes, counts = np.unique(recording.records["gesture_real"], return_counts=True)
+        labels = {str(recording.labels[c]): int(n) for c, n in zip(codes, counts)}
+        with_hand = int((recording.hand_count > 0).sum())
+        print(f"{path}: {len(recording)} frames, {duration:.1f} s, max {recording.max_hands} hands, "
+              f"hand in {with_hand} frames, gesture_real {labels}")
+
+
+if __name__ == "__main__":
+    main()
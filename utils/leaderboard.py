@@ -1,71 +1,208 @@
 import json
+import sqlite3
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
+
+from utils.score_index import ScoreIndex
+
+SCHEMA_VERSION = 1
+# une ligne par nom : remplacée seulement par un meilleur score
+UPSERT = """INSERT INTO scores (name, score, date) VALUES (?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET score = excluded.score, date = excluded.date
+            WHERE excluded.score > scores.score"""
+
 
 class Leaderboard:
     """
-    Gère un fichier JSON contenant une liste d'entrées {name, score, date}.
-    Par défaut le fichier est <repo_root>/leaderboard.json.
+    Classement {name, score, date} stocké dans une base SQLite : une ligne
+    par joueur (son meilleur score), index sur le nom (unique) et sur le
+    score. Par défaut la base est <repo_root>/leaderboard.db.
+
+    - add est un upsert en O(log n) dans une transaction (pas de relecture
+      ni de réécriture du fichier entier) ;
+    - get_top lit les n premières lignes de l'index des scores, sans tri ;
+    - le mode WAL et le délai d'attente sur verrou permettent à plusieurs
+      bornes de jeu (processus) de partager la même base ; refresh()
+      détecte les écritures des autres et prévient les abonnés ;
+    - rank / percentile / player_rank répondent en O(log n) depuis un index
+      des scores en mémoire (ScoreIndex), sans accès disque : la barre
+      latérale peut afficher le rang à chaque image.
+
+    À la création de la base, l'ancien fichier JSON (même nom, extension
+    .json) est importé s'il existe. path=":memory:" donne un classement
+    non persistant.
     """
 
-    def __init__(self, path: Optional[str] = None):
+    def __init__(self, path: Optional[str] = None, timeout: float = 5.0):
         if path is None:
             # fichier placé à la racine du dépôt (deux niveaux au-dessus de utils/)
-            self.path = Path(__file__).resolve().parents[1] / "leaderboard.json"
-        else:
-            self.path = Path(path)
-        self._entries: List[Dict] = self._load()
-
-    def _load(self) -> List[Dict]:
-        if not self.path.exists():
-            return []
+            path = Path(__file__).resolve().parents[1] / "leaderboard.db"
+        elif str(path).endswith(".json"):
+            path = Path(path).with_suffix(".db")   # ancien format : importé dans la base
+        self.path = path if str(path) == ":memory:" else Path(path)
+        if self.path != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None : transactions explicites (BEGIN IMMEDIATE)
+        self._db = sqlite3.connect(str(self.path), timeout=timeout, isolation_level=None)
+        self._create_schema()
+        self._data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        # incrémenté à chaque modification ; les abonnés sont prévenus
+        self.version = 0
+        self._listeners: List[Callable[[], None]] = []
+        # construit à la première requête de rang, tenu à jour par add/clear
+        self._index: Optional[ScoreIndex] = None
+
+    def _create_schema(self) -> None:
+        db = self._db
+        if self.path != ":memory:":
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")   # WAL : durable au checkpoint, jamais corrompu
+        db.execute("BEGIN IMMEDIATE")
         try:
-            with self.path.open("r", encoding="utf-8") as f:
+            if db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                db.execute("""CREATE TABLE IF NOT EXISTS scores (
+                                  id INTEGER PRIMARY KEY,
+                                  name TEXT NOT NULL UNIQUE,
+                                  score INTEGER NOT NULL,
+                                  date TEXT NOT NULL)""")
+                db.execute("CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC, id)")
+                if self.path != ":memory:":
+                    self._import_json(self.path.with_suffix(".json"))
+                db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _import_json(self, json_path: Path) -> None:
+        """Importe l'ancien classement JSON (meilleur score par nom, ordre conservé)."""
+        if not json_path.exists():
+            return
+        try:
+            with json_path.open("r", encoding="utf-8") as f:
                 data = json.load(f)
-            if isinstance(data, list):
-                return data
         except Exception:
-            pass
-        return []
+            return
+        if not isinstance(data, list):
+            return
+        rows = [(str(e.get("name")), int(e.get("score", 0)), str(e.get("date", "")))
+                for e in data if isinstance(e, dict)]
+        self._db.executemany(UPSERT, rows)
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        """Appelle callback() après chaque modification du classement."""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable[[], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
 
-    def _save(self) -> None:
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        with self.path.open("w", encoding="utf-8") as f:
-            json.dump(self._entries, f, ensure_ascii=False, indent=2)
+    def _changed(self) -> None:
+        self.version += 1
+        for callback in list(self._listeners):
+            callback()
+
+    def refresh(self) -> bool:
+        """
+        Vérifie (requête très légère) si un autre processus a modifié la
+        base ; si oui, prévient les abonnés et renvoie True.
+        """
+        data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return False
+        self._data_version = data_version
+        self._index = None   # modifié ailleurs : reconstruit à la prochaine requête
+        self._changed()
+        return True
+
+    def _write(self, sql: str, params=()) -> int:
+        """Exécute une écriture dans une transaction ; renvoie le nombre de lignes modifiées."""
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")   # prend le verrou d'écriture tout de suite (attend `timeout`)
+        try:
+            changed = db.execute(sql, params).rowcount
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return changed
 
     def add(self, name: str, score: int) -> None:
         """
-        Ajoute une entrée et enregistre le fichier JSON.
-        Trie les scores en ordre décroissant après ajout.
+        Enregistre le score d'un joueur : une seule entrée par nom, mise à
+        jour seulement si le nouveau score est meilleur.
         """
-        entry = {
-            "name": str(name),
-            "score": int(score),
-            "date": datetime.utcnow().isoformat() + "Z"
-        }
-        for e in self._entries:
-            if e.get("name") == entry["name"] and e.get("score", 0) < entry["score"]:
-                e["score"] = entry["score"]
-                e["date"] = entry["date"]
-                self._entries.sort(key=lambda e: e["score"], reverse=True)
-                self._save()
-                return
-            if e.get("name") == entry["name"] and e.get("score", 0) > entry["score"]:
-                return   
-        self._entries.append(entry)
-        self._entries.sort(key=lambda e: e["score"], reverse=True)
-        self._save()
+        name, score = str(name), int(score)
+        date = datetime.utcnow().isoformat() + "Z"
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            # ancien score lu dans la même transaction, pour tenir l'index à jour
+            old = db.execute("SELECT score FROM scores WHERE name = ?", (name,)).fetchone()
+            changed = db.execute(UPSERT, (name, score, date)).rowcount
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        if not changed:
+            return
+        if self._index is not None:
+            if old is not None:
+                self._index.remove(old[0])
+            self._index.add(score)
+        self._changed()
+
+    def _select(self, limit: int = -1) -> List[Dict]:
+        rows = self._db.execute("SELECT name, score, date FROM scores ORDER BY score DESC, id LIMIT ?",
+                                (limit,))
+        return [{"name": name, "score": score, "date": date} for name, score, date in rows]
 
     def get_all(self) -> List[Dict]:
         """Retourne toutes les entrées triées (score décroissant)."""
-        return list(self._entries)
+        return self._select()
 
     def get_top(self, n: int = 10) -> List[Dict]:
         """Retourne les n meilleurs scores."""
-        return self._entries[:n]
+        return self._select(n)
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def _score_index(self) -> ScoreIndex:
+        if self._index is None:
+            rows = self._db.execute("SELECT score, COUNT(*) FROM scores GROUP BY score")
+            self._index = ScoreIndex.from_counts(rows)
+        return self._index
+
+    @property
+    def size(self) -> int:
+        """Nombre de joueurs, depuis l'index en mémoire (contrairement à len())."""
+        return self._score_index().total
+
+    def rank(self, score: int) -> int:
+        """Place que prendrait ce score (1 = meilleur ; ex aequo au même rang)."""
+        return self._score_index().rank(score)
+
+    def percentile(self, score: int) -> float:
+        """Pourcentage des joueurs classés ayant un score inférieur."""
+        return self._score_index().percentile(score)
+
+    def best_score(self, name: str) -> Optional[int]:
+        """Meilleur score enregistré d'un joueur, None s'il n'est pas classé."""
+        row = self._db.execute("SELECT score FROM scores WHERE name = ?", (str(name),)).fetchone()
+        return None if row is None else row[0]
+
+    def player_rank(self, name: str) -> Optional[int]:
+        """Rang du meilleur score enregistré d'un joueur, None s'il n'est pas classé."""
+        score = self.best_score(name)
+        return None if score is None else self.rank(score)
 
     def clear(self) -> None:
-        """Supprime toutes les entrées (et met à jour le fichier)."""
-        self._entries = []
-        self._save()
\ No newline at end of file
+        """Supprime toutes les entrées."""
+        self._write("DELETE FROM scores")
+        self._index = ScoreIndex()
+        self._changed()
+
+    def close(self) -> None:
+        self._db.close()
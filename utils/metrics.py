@@ -0,0 +1,199 @@
+"""
+Incremental session metrics.
+
+SessionMetrics keeps one count per combination of
+(hand_detected, paused, game_over, gesture_real, gesture_detected), so
+every number of the analysis scripts (detection rate, pause ratio,
+gesture frequencies, confusion matrices under any paused/game_over
+filter, precision/recall) is a cheap query, available at any time during
+a session. Evaluator.log_frame feeds one frame at a time; from_file
+streams a log in chunks with bounded memory.
+
+    python -m utils.metrics logs/session_20251120_141424.csv [--chunk-rows N]
+"""
+import argparse
+
+import numpy as np
+
+from utils.sessions import GESTURE_LABELS, iter_columns
+
+NONE = "NONE"
+
+
+def precision_recall(cm):
+    """Per-label precision, recall, f1 and support from a confusion matrix (rows: real)."""
+    cm = np.asarray(cm, dtype=np.float64)
+    tp = np.diag(cm)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted != 0)
+    recall = np.divide(tp, support, out=np.zeros_like(tp), where=support != 0)
+    denom = precision + recall
+    f1 = np.divide(2 * precision * recall, denom, out=np.zeros_like(tp), where=denom != 0)
+    return precision, recall, f1, support.astype(np.int64)
+
+
+def classification_report(cm, labels, digits=2):
+    """Text table in the layout of sklearn.metrics.classification_report."""
+    precision, recall, f1, support = precision_recall(cm)
+    width = max(len(label) for label in labels) if labels else 0
+    width = max(width, len("weighted avg"))
+    lines = [f"{'':>{width}} {'precision':>9} {'recall':>9} {'f1-score':>9} {'support':>9}", ""]
+    for i, label in enumerate(labels):
+        lines.append(f"{label:>{width}} {precision[i]:>9.{digits}f} {recall[i]:>9.{digits}f} "
+                     f"{f1[i]:>9.{digits}f} {support[i]:>9}")
+    total = support.sum()
+    lines.append("")
+    if total:
+        accuracy = np.trace(np.asarray(cm)) / total
+        lines.append(f"{'accuracy':>{width}} {'':>9} {'':>9} {accuracy:>9.{digits}f} {total:>9}")
+        for name, weights in (("macro avg", np.ones_like(precision)), ("weighted avg", support)):
+            p, r, f = (np.average(v, weights=weights) for v in (precision, recall, f1))
+            lines.append(f"{name:>{width}} {p:>9.{digits}f} {r:>9.{digits}f} {f:>9.{digits}f} {total:>9}")
+    return "\n".join(lines)
+
+
+class SessionMetrics:
+    def __init__(self, labels=GESTURE_LABELS):
+        self.labels = list(labels)
+        self._index = {label: i for i, label in enumerate(self.labels)}
+        n = len(self.labels)
+        # hand_detected x paused x game_over x gesture_real x gesture_detected
+        self.counts = np.zeros((2, 2, 2, n, n), dtype=np.int64)
+
+    def _code(self, label):
+        code = self._index.get(label)
+        if code is None:
+            code = self._index[label] = len(self.labels)
+            self.labels.append(label)
+            self.counts = np.pad(self.counts, [(0, 0)] * 3 + [(0, 1), (0, 1)])
+        return code
+
+    def update(self, hand_detected, gesture_detected, gesture_real, paused, game_over):
+        """Count one frame (same arguments as Evaluator.log_frame)."""
+        real = self._code(gesture_real or NONE)
+        detected = self._code(gesture_detected or NONE)
+        self.counts[int(bool(hand_detected)), int(bool(paused)), int(bool(game_over)), real, detected] += 1
+
+    def update_columns(self, columns):
+        """Count a chunk of frames given as read_columns() arrays (gesture codes + gesture_labels)."""
+        lut = np.array([self._code(str(label)) for label in columns["gesture_labels"]], dtype=np.intp)
+        n = len(self.labels)
+        flags = (np.asarray(columns["hand_detected"], dtype=np.intp) * 4
+                 + np.asarray(columns["paused"], dtype=np.intp) * 2
+                 + np.asarray(columns["game_over"], dtype=np.intp))
+        cells = (flags * n + lut[columns["gesture_real"]]) * n + lut[columns["gesture_detected"]]
+        self.counts += np.bincount(cells, minlength=self.counts.size).reshape(self.counts.shape)
+
+    @classmethod
+    def from_file(cls, path, chunk_rows=65536):
+        """Metrics of a session log (.csv or .npz), read chunk by chunk."""
+        metrics = cls()
+        for chunk in iter_columns(path, chunk_rows):
+            metrics.update_columns(chunk)
+        return metrics
+
+    def to_dict(self):
+        """JSON-serialisable counts (see from_dict), e.g. for a cache."""
+        return {"labels": list(self.labels), "counts": self.counts.ravel().tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        metrics = cls(data["labels"])
+        metrics.counts = np.array(data["counts"], dtype=np.int64).reshape(metrics.counts.shape)
+        return metrics
+
+    def merge(self, other):
+        """Add the counts of another SessionMetrics (e.g. to pool sessions)."""
+        for label in other.labels:
+            self._code(label)
+        lut = np.array([self._index[label] for label in other.labels], dtype=np.intp)
+        target = self.counts[..., lut[:, None], lut]
+        self.counts[..., lut[:, None], lut] = target + other.counts
+        return self
+
+    # ---- queries -----------------------------------------------------------
+    # hand / paused / game_over: None = any, True/False = only those frames
+
+    def _select(self, hand=None, paused=None, game_over=None):
+        index = tuple(slice(None) if v is None else int(bool(v)) for v in (hand, paused, game_over))
+        counts = self.counts[index]
+        return counts.reshape(-1, *counts.shape[-2:]).sum(axis=0)
+
+    @property
+    def frames(self):
+        return int(self.counts.sum())
+
+    def frame_count(self, **flags):
+        return int(self._select(**flags).sum())
+
+    def hand_detection_rate(self, paused=None, game_over=None):
+        """Fraction of the selected frames with a hand."""
+        total = self.frame_count(paused=paused, game_over=game_over)
+        return self.frame_count(hand=True, paused=paused, game_over=game_over) / total if total else 0.0
+
+    def pause_ratio(self):
+        return self.frame_count(paused=True) / self.frames if self.frames else 0.0
+
+    def gesture_counts(self, **flags):
+        """Detected gesture -> frame count, most frequent first (zeros omitted)."""
+        counts = self._select(**flags).sum(axis=0)
+        order = np.argsort(-counts, kind="stable")
+        return {self.labels[i]: int(counts[i]) for i in order if counts[i]}
+
+    def confusion(self, labels=None, **flags):
+        """
+        Confusion matrix (rows: real, columns: detected) over the selected
+        frames, restricted and ordered by `labels` (default: labels seen),
+        like sklearn.metrics.confusion_matrix(..., labels=labels).
+        Returns (matrix, labels).
+        """
+        cm = self._select(**flags)
+        if labels is None:
+            seen = (cm.sum(axis=0) + cm.sum(axis=1)) > 0
+            labels = sorted(label for label, keep in zip(self.labels, seen) if keep)
+        lut = np.array([self._index.get(label, -1) for label in labels], dtype=np.intp)
+        out = np.zeros((len(labels), len(labels)), dtype=np.int64)
+        valid = lut >= 0
+        out[np.ix_(valid, valid)] = cm[np.ix_(lut[valid], lut[valid])]
+        return out, list(labels)
+
+    def accuracy(self, **flags):
+        """Fraction of the selected frames with a real gesture (not NONE) that were detected correctly."""
+        cm = self._select(**flags)
+        keep = np.ones(len(self.labels), dtype=bool)
+        keep[self._index[NONE]] = False
+        total = cm[keep].sum()
+        return float(np.trace(cm[np.ix_(keep, keep)]) / total) if total else 0.0
+
+    def summary(self):
+        return {
+            "frames": self.frames,
+            "hand_detection_rate": self.hand_detection_rate(),
+            "hand_detection_rate_no_pause": self.hand_detection_rate(paused=False),
+            "pause_ratio": self.pause_ratio(),
+            "gesture_accuracy": self.accuracy(),
+        }
+
+    def report(self):
+        s = self.summary()
+        return (f"{s['frames']} frames, main détectée {s['hand_detection_rate'] * 100:.1f}% "
+                f"(hors pause {s['hand_detection_rate_no_pause'] * 100:.1f}%), "
+                f"pause {s['pause_ratio'] * 100:.1f}%, précision des gestes {s['gesture_accuracy'] * 100:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session metrics")
+    parser.add_argument("files", nargs="+", help="session logs (.csv or .npz)")
+    parser.add_argument("--chunk-rows", type=int, default=65536)
+    args = parser.parse_args()
+
+    for path in args.files:
+        metrics = SessionMetrics.from_file(path, args.chunk_rows)
+        print(f"{path}: {metrics.report()}")
+        cm, labels = metrics.confusion()
+        print(classification_report(cm, labels))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,103 +1,138 @@
-import math
-from collections import deque
+import numpy as np
 
-_recent_gestures = deque(maxlen=5)
+LANDMARK_COUNT = 21
+# per-hand metadata of HandTracker.hand_info
+# handedness: 0 = left, 1 = right, -1 = unknown ; score: MediaPipe confidence
+HAND_INFO_DTYPE = np.dtype([("handedness", np.int8), ("score", np.float32)])
 
-def get_direction_from_index(landmarks):
-    if not landmarks or len(landmarks[0]) < 9:
+# Landmark indices (MediaPipe hand model)
+WRIST, THUMB_IP, THUMB_TIP = 0, 3, 4
+INDEX_MCP, INDEX_TIP = 5, 8
+FINGER_TIPS = np.array([8, 12, 16, 20])   # index, middle, ring, pinky
+FINGER_PIPS = np.array([6, 10, 14, 18])
+
+# Direction per angle bin, see direction_bins
+DIRECTIONS = np.array(["LEFT", "UP", "DOWN", "RIGHT"])
+# half-width of the LEFT / RIGHT angle bins (degrees), see utils.sweep
+HORIZONTAL_DEG = 45.0
+
+
+def as_landmark_array(landmarks):
+    """
+    Return the landmarks as a float32 array of shape (hands, points, dims).
+    Accepts the (hands, 21, 3) array produced by HandTracker as well as a
+    list of per-hand point lists (e.g. replayed or hand-written data).
+    """
+    if landmarks is None:
+        return np.empty((0, 0, 2), dtype=np.float32)
+    arr = np.asarray(landmarks, dtype=np.float32)
+    if arr.ndim == 2:
+        arr = arr[np.newaxis]
+    if arr.ndim != 3:
+        return np.empty((0, 0, 2), dtype=np.float32)
+    return arr
+
+
+def index_angles(landmarks):
+    """Angle (degrees, y axis pointing up) of the index finger MCP -> tip, for every hand."""
+    pts = as_landmark_array(landmarks)
+    if pts.shape[1] <= INDEX_TIP:
+        return np.empty(0, dtype=np.float32)
+    d = pts[:, INDEX_TIP, :2] - pts[:, INDEX_MCP, :2]
+    return np.degrees(np.arctan2(-d[:, 1], d[:, 0]))
+
+
+def direction_bins(angle, horizontal_deg=HORIZONTAL_DEG):
+    """Index into DIRECTIONS of every angle: LEFT within ±horizontal_deg of 0°, RIGHT of 180°."""
+    angle = np.asarray(angle)
+    h = horizontal_deg
+    # The camera image is mirrored: pointing right shows up as an angle near 180°
+    return np.select(
+        [(angle >= -h) & (angle <= h), (angle > h) & (angle < 180 - h), (angle > h - 180) & (angle < -h)],
+        [0, 1, 2],
+        default=3,
+    )
+
+
+def directions_from_index(landmarks):
+    """Raw (not debounced) direction of the index finger for every hand, as an array of strings."""
+    return DIRECTIONS[direction_bins(index_angles(landmarks))]
+
+
+def get_direction_from_index(landmarks, debounce=None):
+    """
+    Direction pointed by the index finger of the first hand, or None.
+    Smoothing is done upstream on the landmarks (see HandTracker's filter);
+    `debounce` optionally post-processes the label (e.g. filters.MajorityVote).
+    """
+    directions = directions_from_index(landmarks)
+    if len(directions) == 0:
         return None
 
-    points = landmarks[0]  
-    index_tip = points[8]
-    index_mcp = points[5]
+    gesture = str(directions[0])
+    if debounce is not None:
+        return debounce(gesture)
+    return gesture
 
-    dx = index_tip[0] - index_mcp[0]
-    dy = index_tip[1] - index_mcp[1]
-    angle = math.degrees(math.atan2(-dy, dx))
 
-    if -45 <= angle <= 45:
-        gesture = "LEFT" #"RIGHT"
-    elif 45 < angle < 135:
-        gesture = "UP"
-    elif -135 < angle < -45:
-        gesture = "DOWN"
-    else:
-        gesture = "RIGHT" #"LEFT"
+def _thumb_extension(pts):
+    """Horizontal distance wrist -> thumb tip minus wrist -> thumb IP, per hand."""
+    wrist_x = pts[:, WRIST, 0]
+    return np.abs(pts[:, THUMB_TIP, 0] - wrist_x) - np.abs(pts[:, THUMB_IP, 0] - wrist_x)
 
-    _recent_gestures.append(gesture)
 
-    if len(_recent_gestures) < _recent_gestures.maxlen:
-        return gesture  
-    return max(set(_recent_gestures), key=_recent_gestures.count)
+def extended_fingers(landmarks):
+    """Per-hand number of extended fingers (0-5): tips above their PIP joints, thumb out."""
+    pts = as_landmark_array(landmarks)
+    if pts.shape[1] < 21:
+        return np.zeros(len(pts), dtype=np.int64)
+    extended = (pts[:, FINGER_TIPS, 1] < pts[:, FINGER_PIPS, 1]).sum(axis=1)
+    return extended + (_thumb_extension(pts) > 0)
 
-def detect_open_hand(landmarks):
-    """
-    Detect an open hand gesture:
-    All fingers are extended (tips above their lower joints).
-    """
-    if not landmarks or len(landmarks[0]) < 21:
-        return False
 
-    pts = landmarks[0]
+def open_hand_mask(landmarks, min_extended=4):
+    """Per-hand boolean: at least `min_extended` of the 5 fingers are extended."""
+    return extended_fingers(landmarks) >= min_extended
 
-    tips = [4, 8, 12, 16, 20]
-    pips = [2, 6, 10, 14, 18]
 
-    extended_count = 0
-    for tip, pip in zip(tips[1:], pips[1:]):  
-        if pts[tip][1] < pts[pip][1]: 
-            extended_count += 1
+def closed_fist_mask(landmarks, min_folded=4):
+    """Per-hand boolean: at least `min_folded` of the 5 fingers are folded."""
+    pts = as_landmark_array(landmarks)
+    if pts.shape[1] < 21:
+        return np.zeros(len(pts), dtype=bool)
+    folded = (pts[:, FINGER_TIPS, 1] > pts[:, FINGER_PIPS, 1]).sum(axis=1)
+    folded += _thumb_extension(pts) < 0
+    return folded >= min_folded
 
-    thumb_tip = pts[4]
-    thumb_ip = pts[3]
-    wrist = pts[0]
-    if abs(thumb_tip[0] - wrist[0]) > abs(thumb_ip[0] - wrist[0]):
-        extended_count += 1
 
-    return extended_count >= 4
+def hand_present_mask(landmarks, min_landmark_count=21):
+    """Per-hand boolean: enough landmarks and at least one non-zero (x, y)."""
+    pts = as_landmark_array(landmarks)
+    if pts.shape[1] < min_landmark_count:
+        return np.zeros(len(pts), dtype=bool)
+    return np.any(pts[:, :, :2] != 0, axis=(1, 2))
+
+
+def detect_open_hand(landmarks):
+    """
+    Detect an open hand gesture:
+    All fingers are extended (tips above their lower joints).
+    """
+    mask = open_hand_mask(landmarks)
+    return bool(mask[0]) if len(mask) else False
 
 def hand_present(landmarks, min_landmark_count=21):
     """
     Robust check whether a hand is present in the landmarks result.
     Returns True if landmarks looks like a real hand (has enough points and non-zero coords).
     """
-    if not landmarks:
-        return False
-    first = landmarks[0]
-    if not first or len(first) < min_landmark_count:
-        return False
-    # ensure at least one landmark has non-zero coords (filter out bogus all-zero outputs)
-    for pt in first:
-        try:
-            x, y = pt[0], pt[1]
-        except Exception:
-            return False
-        if (x, y) != (0, 0):
-            return True
-    return False
+    mask = hand_present_mask(landmarks, min_landmark_count)
+    return bool(mask[0]) if len(mask) else False
 
 def detect_closed_fist(landmarks):
     """
     Detect a closed fist gesture:
     All fingers are folded (tips below their lower joints).
     """
-    if not landmarks or len(landmarks[0]) < 21:
-        return False
-
-    pts = landmarks[0]
-
-    tips = [4, 8, 12, 16, 20]
-    pips = [2, 6, 10, 14, 18]
-
-    folded_count = 0
-    for tip, pip in zip(tips[1:], pips[1:]):  
-        if pts[tip][1] > pts[pip][1]: 
-            folded_count += 1
-
-    thumb_tip = pts[4]
-    thumb_ip = pts[3]
-    wrist = pts[0]
-    if abs(thumb_tip[0] - wrist[0]) < abs(thumb_ip[0] - wrist[0]):
-        folded_count += 1
-
-    return folded_count >= 4
\ No newline at end of file
+    mask = closed_fist_mask(landmarks)
+    return bool(mask[0]) if len(mask) else False
@@ -1,44 +1,43 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import sys
 import os
+import numpy as np
 
+if __package__ in (None, ""):
+    # lancé comme `python utils/plots.py` : rend le paquet utils importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.metrics import SessionMetrics
+from utils.sessions import resolve_session
+
+# usage : python -m utils.plots SESSION  (nom dans logs/ ou chemin)
 if len(sys.argv) < 2:
-        print("missing file name")
+        print("missing file name (usage : python -m utils.plots SESSION)")
         sys.exit(1)
 
 filename = sys.argv[1]
-filepath = os.path.join("logs", filename + ".csv")
-
-df = pd.read_csv(filepath)
+filepath = resolve_session("logs", filename)
+name = os.path.splitext(os.path.basename(filename))[0]
 
-df["time"] = df["timestamp"] - df["timestamp"].iloc[0]
+metrics = SessionMetrics.from_file(filepath)
 
 #GESTURE FREQUENCY BAR PLOT
 plt.figure(figsize=(8, 4))
-gesture_counts = df["gesture_detected"].value_counts()
-gesture_percent = gesture_counts / gesture_counts.sum() * 100
+gesture_counts = metrics.gesture_counts()
+gesture_percent = np.array(list(gesture_counts.values())) / metrics.frames * 100
 
-sns.barplot(x=gesture_percent.values, y=gesture_percent.index)
+sns.barplot(x=gesture_percent, y=list(gesture_counts))
 plt.title("Gesture Detection Frequency (%)")
 plt.xlabel("Percentage (%)")
 plt.ylabel("Gesture")
-plt.savefig(f"plots/percents/gesture_frequency_percent_spirale_{filename}.png")
+plt.savefig(f"plots/percents/gesture_frequency_percent_spirale_{name}.png")
 
 
 # CONFUSION MATRIX (gesture vs real gesture)
 
-if "gesture_real" in df.columns:
-    from sklearn.metrics import confusion_matrix
-    import numpy as np
-
+if metrics.frames:
     # Filter meaningful frames = while game is active
-    usable = df[df["game_over"] == 0]
-
-    cm = confusion_matrix(usable["gesture_real"], usable["gesture_detected"], labels=[
-        "UP", "DOWN", "LEFT", "RIGHT", "NONE"
-    ])
+    cm, _ = metrics.confusion(["UP", "DOWN", "LEFT", "RIGHT", "NONE"], game_over=False)
 
     cm = cm.astype(float)
     row_sums = cm.sum(axis=1, keepdims=True)
@@ -52,4 +51,4 @@ if "gesture_real" in df.columns:
     plt.title("Confusion Matrix (Predicted vs Real Gestures)")
     plt.xlabel("Predicted Gesture")
     plt.ylabel("Real Gesture")
-    plt.savefig(f"plots/matrix/confusion_matrix_normalized_{filename}.png")
+    plt.savefig(f"plots/matrix/confusion_matrix_normalized_{name}.png")
@@ -0,0 +1,31 @@
+import numpy as np
+import pygame
+
+
+class CameraPreview:
+    """
+    Camera preview drawn into one persistent pygame Surface.
+
+    The surface is created once with `pygame.image.frombuffer` on top of a
+    preallocated RGB array, so updating the preview is a single
+    `cv2.resize(..., dst=...)` into that array: no color conversion (the
+    tracker already produced RGB), no `tobytes()` copy and no new Surface
+    per frame.
+    """
+
+    def __init__(self, size=(360, 240)):
+        self.size = size
+        w, h = size
+        self._buffer = np.zeros((h, w, 3), dtype=np.uint8)
+        self.surface = pygame.image.frombuffer(self._buffer, (w, h), "RGB")
+
+    def update(self, rgb):
+        """Copy an RGB frame (any size) into the preview surface and return it."""
+        if rgb is None:
+            return None
+        if rgb.shape[:2] == self._buffer.shape[:2]:
+            np.copyto(self._buffer, rgb)
+        else:
+            import cv2  # imported on first use: keeps cv2 off the startup path
+            cv2.resize(rgb, self.size, dst=self._buffer, interpolation=cv2.INTER_LINEAR)
+        return self.surface
@@ -0,0 +1,177 @@
+"""
+Per-stage frame timing: where the milliseconds of a frame go.
+
+    profiler = StageProfiler()
+    with profiler.time("update"):
+        session.step(landmarks, gesture)
+    profiler.record("latency", time.monotonic() - result.timestamp)
+    print(profiler.report())
+
+Every stage keeps its last `window` samples in a fixed NumPy ring buffer:
+recording is O(1) and allocation-free, percentiles (p50/p95/p99) are
+computed on demand over the window. Stages may be recorded from several
+threads (the camera pipeline records capture/landmarks/gesture from its
+own threads) as long as each stage is recorded by a single thread.
+
+ProfilerHUD draws the table on screen (F3 in main.py).
+"""
+import time
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+class StageTimer:
+    """Ring buffer of the last `window` durations of one stage, in seconds."""
+
+    def __init__(self, window=1024):
+        self._samples = np.zeros(window, dtype=np.float64)
+        self._index = 0
+        self.count = 0          # samples ever recorded
+        self.last = None
+
+    def record(self, seconds):
+        self._samples[self._index] = seconds
+        self._index = (self._index + 1) % len(self._samples)
+        self.count += 1
+        self.last = seconds
+
+    def samples(self):
+        """Samples currently in the window (oldest first)."""
+        if self.count < len(self._samples):
+            return self._samples[:self.count].copy()
+        return np.roll(self._samples, -self._index)
+
+    def summary(self):
+        """{"count", "mean", "p50", "p95", "p99", "max"} in milliseconds over the window."""
+        samples = self.samples() * 1e3
+        if len(samples) == 0:
+            return {"count": 0}
+        p50, p95, p99 = np.percentile(samples, PERCENTILES)
+        return {"count": self.count, "mean": float(samples.mean()), "p50": float(p50),
+                "p95": float(p95), "p99": float(p99), "max": float(samples.max())}
+
+
+class _Timing:
+    __slots__ = ("_timer", "_start")
+
+    def __init__(self, timer):
+        self._timer = timer
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._timer.record(time.perf_counter() - self._start)
+        return False
+
+
+class StageProfiler:
+    """Named StageTimers, created on first use (in recording order)."""
+
+    def __init__(self, window=1024, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self.stages = {}
+        self._timings = {}
+
+    def timer(self, stage):
+        timer = self.stages.get(stage)
+        if timer is None:
+            timer = self.stages[stage] = StageTimer(self.window)
+            self._timings[stage] = _Timing(timer)
+        return timer
+
+    def record(self, stage, seconds):
+        if self.enabled:
+            self.timer(stage).record(seconds)
+
+    def time(self, stage):
+        """Context manager timing its block with time.perf_counter() into `stage`."""
+        if not self.enabled:
+            return _NULL_TIMING
+        timing = self._timings.get(stage)
+        if timing is None:
+            self.timer(stage)
+            timing = self._timings[stage]
+        return timing
+
+    def last(self, stage):
+        """Last duration recorded for `stage` (seconds) or None."""
+        timer = self.stages.get(stage)
+        return timer.last if timer is not None else None
+
+    def summary(self):
+        return {stage: timer.summary() for stage, timer in list(self.stages.items())}
+
+    def report(self):
+        """Text table of the summary, one line per stage, in ms."""
+        lines = [f"{'stage':<10} {'n':>7} {'mean':>7} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7}"]
+        for stage, s in self.summary().items():
+            if s["count"]:
+                lines.append(f"{stage:<10} {s['count']:>7} {s['mean']:7.2f} {s['p50']:7.2f} "
+                             f"{s['p95']:7.2f} {s['p99']:7.2f} {s['max']:7.2f}")
+        return "\n".join(lines)
+
+
+class _NullTiming:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMING = _NullTiming()
+
+
+class ProfilerHUD:
+    """
+    On-screen table of the profiler's p50/p95/p99, drawn on an opaque
+    background so it can be blitted again on every frame over the dirty
+    rects. The text is re-rendered only every `refresh` seconds.
+    """
+
+    def __init__(self, profiler, pos=(10, 10), refresh=0.25, font_size=16):
+        import pygame
+
+        self.profiler = profiler
+        self.pos = pos
+        self.refresh = refresh
+        self.visible = False
+        self._font = pygame.font.SysFont("monospace", font_size)  # aligned columns
+        self._surface = None
+        self._rendered_at = 0.0
+
+    def toggle(self):
+        self.visible = not self.visible
+        self._surface = None
+        return self.visible
+
+    def _render(self):
+        import pygame
+
+        lines = [f"{'ms':<10} {'p50':>6} {'p95':>6} {'p99':>6}"]
+        for stage, s in self.profiler.summary().items():
+            if s["count"]:
+                lines.append(f"{stage:<10} {s['p50']:6.1f} {s['p95']:6.1f} {s['p99']:6.1f}")
+        rendered = [self._font.render(line, True, (255, 255, 0)) for line in lines]
+        line_h = self._font.get_linesize()
+        width = max(surf.get_width() for surf in rendered) + 12
+        surface = pygame.Surface((width, line_h * len(rendered) + 8))
+        surface.fill((20, 20, 40))
+        for i, surf in enumerate(rendered):
+            surface.blit(surf, (6, 4 + i * line_h))
+        return surface
+
+    def draw(self, screen):
+        """Blit the HUD (if visible) and return its screen rect, or None."""
+        if not self.visible:
+            return None
+        now = time.monotonic()
+        if self._surface is None or now - self._rendered_at >= self.refresh:
+            self._surface = self._render()
+            self._rendered_at = now
+        return screen.blit(self._surface, self.pos)
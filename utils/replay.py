@@ -0,0 +1,185 @@
+"""
+Headless replay of the gesture stack on recorded data.
+
+    python -m utils.replay INPUT [INPUT ...] [--seed 0] [--log-dir DIR]
+                           [--save-landmarks OUT.npz] [--max-frames N]
+
+INPUT is either a video file (frames go through HandTracker), a landmark
+stream saved as .npz (see save_landmark_stream) or a .lmk landmark
+recording (utils.landmark_recording, main.py --record-landmarks);
+--save-landmarks writes either format, by extension. Every frame then goes
+through get_direction_from_index, the pause hysteresis and
+SnakeGame.update exactly as in main.py, with no window, no camera and no
+frame pacing. With the same input and seed a replay is deterministic.
+"""
+import argparse
+import os
+import time
+from collections import Counter
+
+import numpy as np
+
+from games.session import GameSession
+from games.snake import SnakeGame
+from utils.evaluator import Evaluator
+from utils.landmark_recording import LandmarkRecorder, LandmarkRecording, is_recording
+from utils.movements import get_direction_from_index
+
+
+def save_landmark_stream(path, timestamps, landmarks, gesture_real=None):
+    """
+    Save a landmark stream as .npz:
+      - timestamps  (N,) float64, seconds
+      - landmarks   (N, H, 21, 3) float32, H = max hands in a frame (padded)
+      - hand_count  (N,) int8, hands actually present in each frame
+      - gesture_real (N,) str, optional keyboard labels
+    `landmarks` is a sequence of (hands, 21, 3) arrays.
+    """
+    n = len(landmarks)
+    max_hands = max((len(lm) for lm in landmarks), default=0)
+    packed = np.zeros((n, max(max_hands, 1), 21, 3), dtype=np.float32)
+    hand_count = np.zeros(n, dtype=np.int8)
+    for i, lm in enumerate(landmarks):
+        hand_count[i] = len(lm)
+        if len(lm):
+            packed[i, :len(lm)] = lm
+    arrays = dict(timestamps=np.asarray(timestamps, dtype=np.float64), landmarks=packed, hand_count=hand_count)
+    if gesture_real is not None:
+        arrays["gesture_real"] = np.asarray(gesture_real, dtype=str)
+    np.savez_compressed(path, **arrays)
+
+
+def landmark_stream(path):
+    """Yield (timestamp, landmarks, gesture_real) from a .npz landmark stream."""
+    data = np.load(path)
+    timestamps, landmarks, hand_count = data["timestamps"], data["landmarks"], data["hand_count"]
+    real = data["gesture_real"] if "gesture_real" in data else None
+    for i in range(len(timestamps)):
+        yield timestamps[i], landmarks[i, :hand_count[i]], (str(real[i]) if real is not None else "NONE")
+
+
+def video_stream(path, tracker=None):
+    """
+    Yield (timestamp, landmarks, "NONE") for every frame of a video file.
+    Timestamps come from the frame index and the file's FPS, not the clock,
+    so the landmark filter behaves the same on every run.
+    """
+    import cv2
+    from hand_detection.hand_tracker import HandTracker
+
+    tracker = tracker if tracker is not None else HandTracker()
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    index = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            t = index / fps
+            landmarks, _ = tracker.get_landmarks(frame, timestamp=t)
+            yield t, landmarks, "NONE"
+            index += 1
+    finally:
+        cap.release()
+
+
+def open_stream(path):
+    if path.endswith(".npz"):
+        return landmark_stream(path)
+    if is_recording(path):
+        return LandmarkRecording(path).stream()
+    return video_stream(path)
+
+
+class ReplayResult:
+    def __init__(self):
+        self.frames = 0
+        self.elapsed = 0.0
+        self.paused_frames = 0
+        self.games_over = 0
+        self.scores = []
+        self.gestures = Counter()
+
+    @property
+    def fps(self):
+        return self.frames / self.elapsed if self.elapsed else float("inf")
+
+    def summary(self):
+        return (f"{self.frames} frames in {self.elapsed:.2f}s ({self.fps:.0f} frames/s), "
+                f"paused {self.paused_frames}, game overs {self.games_over}, scores {self.scores}, "
+                f"gestures {dict(self.gestures)}")
+
+
+def replay(stream, seed=0, evaluator=None, max_frames=None, record=None):
+    """
+    Run the game logic over (timestamp, landmarks, gesture_real) items.
+    `record`, if given, is a list that receives (timestamp, landmarks, gesture_real).
+    """
+    result = ReplayResult()
+    game = SnakeGame(None, seed=seed)
+
+    def game_over(score):
+        result.games_over += 1
+        result.scores.append(score)
+
+    session = GameSession(game, on_game_over=game_over)
+    start = time.perf_counter()
+    for timestamp, landmarks, real in stream:
+        if max_frames is not None and result.frames >= max_frames:
+            break
+        if record is not None:
+            record.append((timestamp, landmarks, real))
+        gesture = get_direction_from_index(landmarks)
+        session.step(landmarks, gesture)
+
+        result.frames += 1
+        result.paused_frames += session.paused
+        result.gestures[session.gesture or "NONE"] += 1
+        if evaluator is not None:
+            evaluator.log_frame(
+                hand_detected=session.hand_detected,
+                gesture_detected=session.gesture if session.gesture is not None else "NONE",
+                gesture_real=real,
+                paused=session.paused,
+                game_over=session.frame_game_over,
+                timestamp=timestamp,
+            )
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="video files or .npz landmark streams")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-dir", default=None, help="write an Evaluator log per input")
+    parser.add_argument("--save-landmarks", default=None,
+                        help="save the replayed landmarks as .npz or .lmk (single input only)")
+    parser.add_argument("--max-frames", type=int, default=None)
+    args = parser.parse_args()
+
+    for path in args.inputs:
+        evaluator = None
+        if args.log_dir:
+            name = "replay_" + os.path.splitext(os.path.basename(path))[0]
+            evaluator = Evaluator(log_dir=args.log_dir, session_name=name)
+        record = [] if args.save_landmarks else None
+        result = replay(open_stream(path), seed=args.seed, evaluator=evaluator,
+                        max_frames=args.max_frames, record=record)
+        print(f"{path}: {result.summary()}")
+        if evaluator is not None:
+            evaluator.close()
+            print(f"  {evaluator.metrics.report()}")
+        if record is not None and is_recording(args.save_landmarks):
+            max_hands = max((len(lm) for _, lm, _ in record), default=1)
+            with LandmarkRecorder(args.save_landmarks, max_hands=max(max_hands, 1)) as recorder:
+                for t, landmarks, real in record:
+                    recorder.append(t, landmarks, real)
+        elif record is not None:
+            t, landmarks, real = zip(*record) if record else ((), (), ())
+            save_landmark_stream(args.save_landmarks, t, landmarks, real)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+In-memory rank index of the leaderboard scores.
+
+ScoreIndex is a Fenwick (binary indexed) tree over the score values:
+cell s counts the players whose best score is s. Adding/removing a
+player and asking "how many players have a score <= S" are O(log max
+score); rank and percentile follow. Scores are small non-negative
+integers (a snake score is bounded by the board size); the tree doubles
+its capacity when a larger score shows up.
+"""
+import numpy as np
+
+
+class ScoreIndex:
+    def __init__(self, capacity=1024):
+        self._counts = [0] * capacity
+        self._tree = [0] * (capacity + 1)     # 1-based
+        self.total = 0
+
+    @classmethod
+    def from_counts(cls, score_counts):
+        """Build in O(capacity) from (score, players) pairs, e.g. a GROUP BY query."""
+        score_counts = [(max(0, int(score)), int(n)) for score, n in score_counts]
+        top = max((score for score, _ in score_counts), default=0)
+        index = cls(capacity=1 << max(10, top.bit_length()))
+        for score, n in score_counts:
+            index._counts[score] += n
+        index._rebuild()
+        return index
+
+    def _rebuild(self):
+        counts = np.array(self._counts, dtype=np.int64)
+        prefix = np.concatenate(([0], np.cumsum(counts)))
+        i = np.arange(1, len(counts) + 1)
+        # tree[i] = sum of counts over (i - lowbit(i), i]
+        self._tree = [0] + (prefix[i] - prefix[i - (i & -i)]).tolist()
+        self.total = int(prefix[-1])
+
+    def _grow(self, score):
+        capacity = len(self._counts)
+        while capacity <= score:
+            capacity *= 2
+        self._counts.extend([0] * (capacity - len(self._counts)))
+        self._rebuild()
+
+    def add(self, score, count=1):
+        score = max(0, int(score))
+        if score >= len(self._counts):
+            self._grow(score)
+        self._counts[score] += count
+        self.total += count
+        tree, i = self._tree, score + 1
+        while i < len(tree):
+            tree[i] += count
+            i += i & -i
+
+    def remove(self, score, count=1):
+        self.add(score, -count)
+
+    def count_at_most(self, score):
+        """Players with a score <= `score`."""
+        if score < 0:
+            return 0
+        tree, i, n = self._tree, min(int(score), len(self._counts) - 1) + 1, 0
+        while i > 0:
+            n += tree[i]
+            i -= i & -i
+        return n
+
+    def count_above(self, score):
+        """Players with a score strictly better than `score`."""
+        return self.total - self.count_at_most(score)
+
+    def rank(self, score):
+        """Place a score would take: 1 + the players strictly better (ties share a rank)."""
+        return self.count_above(score) + 1
+
+    def percentile(self, score):
+        """Percentage of the players with a lower score (0-100)."""
+        return 100.0 * self.count_at_most(score - 1) / self.total if self.total else 100.0
+
+    def __len__(self):
+        return self.total
@@ -0,0 +1,239 @@
+"""
+Session log formats and the reader used by the analysis scripts.
+
+Two formats hold the same columns (see evaluator.HEADER):
+  - .csv : one text row per frame (historical format)
+  - .npz : columnar binary, gestures stored as uint8 codes into a
+           `gesture_labels` array, timestamps as float64, flags as bool
+
+Logs may have extra numeric columns after these (the per-stage frame
+timings, "<stage>_ms", see Evaluator(timing_stages=...)); they are kept
+as float32 (NaN where a CSV cell is empty) and ignored by the metrics.
+CSV rows without one field per column (blank lines, a last line cut off
+by a crash) are skipped with a warning.
+
+    python -m utils.sessions convert logs/*.csv      # writes .npz next to each CSV
+"""
+import argparse
+import csv
+import glob
+import itertools
+import os
+import warnings
+
+import numpy as np
+
+GESTURE_LABELS = ["NONE", "UP", "DOWN", "LEFT", "RIGHT", "RESTART"]
+GESTURE_COLUMNS = ("gesture_detected", "gesture_real")
+FLAG_COLUMNS = ("hand_detected", "paused", "game_over")
+# CSV logs from this size on are parsed with pandas (if installed): its C
+# parser pays for the ~0.3 s pandas import from about 100k rows on
+PANDAS_MIN_BYTES = 4 << 20
+COLUMNS = ("timestamp", "hand_detected", "gesture_detected", "gesture_real", "paused", "game_over")
+
+
+def encode_labels(values, labels):
+    """Encode strings as uint8 codes into `labels`, appending unknown labels in place."""
+    index = {label: i for i, label in enumerate(labels)}
+    uniques, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    lut = np.empty(len(uniques), dtype=np.uint8)
+    for i, v in enumerate(uniques.tolist()):
+        code = index.get(v)
+        if code is None:
+            code = index[v] = len(labels)
+            labels.append(v)
+        lut[i] = code
+    return lut[inverse.reshape(-1)]
+
+
+def write_npz(path, columns):
+    """
+    Write columns (dict of sequences: timestamp, flags, gesture strings) to
+    a compressed .npz, atomically (temporary file + rename).
+    """
+    labels = list(columns["gesture_labels"]) if "gesture_labels" in columns else list(GESTURE_LABELS)
+    arrays = {"timestamp": np.asarray(columns["timestamp"], dtype=np.float64)}
+    for name in FLAG_COLUMNS:
+        arrays[name] = np.asarray(columns[name], dtype=bool)
+    for name in GESTURE_COLUMNS:
+        values = columns[name]
+        if isinstance(values, np.ndarray) and values.dtype == np.uint8:
+            arrays[name] = values
+        else:
+            arrays[name] = encode_labels(values, labels)
+    arrays["gesture_labels"] = np.asarray(labels, dtype=str)
+    for name in columns:
+        if name not in arrays:
+            arrays[name] = np.asarray(columns[name], dtype=np.float32)
+
+    tmp = path + ".tmp.npz"
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, path)
+
+
+def _complete_rows(path, header, rows):
+    """Rows with one field per column of `header`; the others are dropped with a warning."""
+    complete = [row for row in rows if len(row) == len(header)]
+    if len(complete) < len(rows):
+        warnings.warn(f"{path}: skipped {len(rows) - len(complete)} incomplete CSV row(s)")
+    return complete
+
+
+def _csv_rows_to_columns(header, rows, labels):
+    raw = dict(zip(header, zip(*rows))) if rows else {name: () for name in header}
+    columns = {"timestamp": np.array(raw["timestamp"], dtype=np.float64)}
+    for name in FLAG_COLUMNS:
+        columns[name] = np.array(raw[name], dtype=np.int8).astype(bool)
+    for name in GESTURE_COLUMNS:
+        columns[name] = encode_labels(raw[name], labels)
+    columns["gesture_labels"] = np.array(labels, dtype=str)
+    for name in header:
+        if name not in columns:
+            columns[name] = np.array([float(v) if v else np.nan for v in raw[name]], dtype=np.float32)
+    return columns
+
+
+def _read_csv_columns(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = _complete_rows(path, header, list(reader))
+    return _csv_rows_to_columns(header, rows, list(GESTURE_LABELS))
+
+
+def read_columns(path, decode=False):
+    """
+    Read a session (.npz or .csv) as a dict of NumPy arrays. Gesture
+    columns are uint8 codes into columns["gesture_labels"]; with
+    decode=True they are returned as string arrays instead.
+    """
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            columns = {name: data[name] for name in data.files}
+    else:
+        columns = _read_csv_columns(path)
+    if decode:
+        labels = columns["gesture_labels"]
+        for name in GESTURE_COLUMNS:
+            columns[name] = labels[columns[name]]
+    return columns
+
+
+def iter_columns(path, chunk_rows=65536):
+    """
+    Read a session in chunks of at most `chunk_rows` frames, as dicts like
+    read_columns(). CSV files are parsed incrementally with bounded memory
+    (pandas' reader for large files when it is installed, else the csv
+    module); .npz files are loaded once (compact) and sliced. Each chunk
+    carries the gesture_labels known so far, which only grow.
+    """
+    if path.endswith(".npz"):
+        columns = read_columns(path)
+        n = len(columns["timestamp"])
+        for start in range(0, max(n, 1), chunk_rows):
+            chunk = {name: values[start:start + chunk_rows] for name, values in columns.items()
+                     if name != "gesture_labels"}
+            chunk["gesture_labels"] = columns["gesture_labels"]
+            yield chunk
+        return
+    labels = list(GESTURE_LABELS)
+    pd = None
+    if os.path.getsize(path) >= PANDAS_MIN_BYTES:
+        try:
+            import pandas as pd
+        except ImportError:
+            pass
+    if pd is not None:
+        # C parser, categorical gestures: ~6x faster than the csv module
+        chunks = pd.read_csv(path, chunksize=chunk_rows, keep_default_na=False,
+                             dtype={name: "category" for name in GESTURE_COLUMNS})
+        for df in chunks:
+            # a short row gets "" in its missing fields (blank lines are skipped by pandas)
+            incomplete = np.zeros(len(df), dtype=bool)
+            for name in COLUMNS:
+                incomplete |= (df[name].astype(str) == "").to_numpy()
+            if incomplete.any():
+                warnings.warn(f"{path}: skipped {int(incomplete.sum())} incomplete CSV row(s)")
+                df = df[~incomplete].copy()
+                for name in GESTURE_COLUMNS:
+                    df[name] = df[name].cat.remove_unused_categories()
+            chunk = {"timestamp": df["timestamp"].to_numpy().astype(np.float64)}
+            for name in FLAG_COLUMNS:
+                chunk[name] = df[name].to_numpy().astype(np.int8).astype(bool)
+            for name in GESTURE_COLUMNS:
+                cat = df[name].cat
+                chunk[name] = encode_labels(list(cat.categories), labels)[cat.codes.to_numpy()]
+            chunk["gesture_labels"] = np.array(labels, dtype=str)
+            yield chunk
+        return
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        while True:
+            rows = list(itertools.islice(reader, chunk_rows))
+            if not rows:
+                return
+            yield _csv_rows_to_columns(header, _complete_rows(path, header, rows), labels)
+
+
+def load_session(path):
+    """Read a session (.npz or .csv) as a pandas DataFrame, gestures as categoricals."""
+    import pandas as pd
+
+    if not path.endswith(".npz"):
+        return pd.read_csv(path, dtype={name: "category" for name in GESTURE_COLUMNS})
+    columns = read_columns(path)
+    labels = list(columns["gesture_labels"])
+    data = {}
+    for name in list(COLUMNS) + [name for name in columns if name not in COLUMNS and name != "gesture_labels"]:
+        if name in GESTURE_COLUMNS:
+            data[name] = pd.Categorical.from_codes(columns[name].astype(np.int16),
+                                                   categories=labels).remove_unused_categories()
+        elif name in FLAG_COLUMNS:
+            data[name] = columns[name].astype(np.int8)
+        else:
+            data[name] = columns[name]
+    return pd.DataFrame(data)
+
+
+def find_sessions(pattern):
+    """
+    Session files matching `pattern` (without extension, e.g. "logs/spirale_*"),
+    preferring the .npz version of a session when both exist.
+    """
+    found = {}
+    for ext in (".csv", ".npz"):
+        for path in glob.glob(pattern + ext):
+            found[os.path.splitext(path)[0]] = path
+    return [found[stem] for stem in sorted(found)]
+
+
+def resolve_session(log_dir, name):
+    """Path of session `name` in log_dir (.npz if it exists, else .csv); `name` may also be a path."""
+    if os.path.isfile(name):
+        return name
+    base = os.path.join(log_dir, name)
+    return base + ".npz" if os.path.exists(base + ".npz") else base + ".csv"
+
+
+def convert(csv_path, npz_path=None):
+    npz_path = npz_path or os.path.splitext(csv_path)[0] + ".npz"
+    write_npz(npz_path, read_columns(csv_path))
+    return npz_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session log tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    conv = sub.add_parser("convert", help="convert CSV session logs to .npz")
+    conv.add_argument("files", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        for path in args.files:
+            out = convert(path)
+            print(f"{path} ({os.path.getsize(path)} B) -> {out} ({os.path.getsize(out)} B)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+Parameter sweep of the gesture thresholds over recorded sessions.
+
+    python -m utils.sweep [INPUT ...] [--grid vote=1,3,5 horizontal_deg=35:55:5 ...]
+                          [--random N] [--jobs N] [--json REPORT.json]
+
+INPUT are landmark recordings with keyboard labels (.lmk from main.py
+--record-landmarks, or .npz landmark streams; default: logs/*.lmk). The
+parameters, with their current values:
+
+    horizontal_deg    45   half-width of the LEFT/RIGHT angle bins (direction_bins)
+    vote               1   MajorityVote window on the direction (1: none)
+    min_extended       4   fingers for an open hand (open_hand_mask)
+    frames_to_pause    5   NO_HAND_FRAMES_TO_PAUSE (games.session)
+    frames_to_resume   3   HAND_FRAMES_TO_RESUME
+
+--grid replaces the values of a parameter by a list ("1,3,5") or a range
+("35:55:5", end included); the cartesian product is evaluated, or
+--random N configurations drawn from it. Every session is reduced once
+to per-frame arrays (index angle, hand present, extended fingers) and a
+configuration is then a few whole-array operations per session, with no
+per-frame Python: the vote is a sliding count over the frames with a
+hand, the pause hysteresis an event fill over run lengths. The
+configurations are spread over --jobs processes.
+
+The gesture given to the game is the voted direction, NONE while paused
+(as GameSession: the game is not updated), compared with gesture_real:
+  - accuracy: fraction of the frames with a direction key held where
+    the game gets that direction;
+  - latency_ms / miss_rate / false_switches_per_min / stability, from
+    utils.gesture_latency (onset of every key press);
+  - paused_rate: frames with a key held during which the game is paused;
+  - false_open_rate: frames with a key held where the hand reads as open
+    (a restart at game over).
+Game over and restarts are not simulated. The report lists the best
+configurations and the Pareto fronts accuracy / latency and accuracy /
+false switches: the configurations no other one beats on both (one per
+set of equal values, the best on pauses and false open hands).
+"""
+import argparse
+import glob
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from games.session import HAND_FRAMES_TO_RESUME, NO_HAND_FRAMES_TO_PAUSE
+from utils.gesture_latency import GESTURES, NONE, LatencyStats
+from utils.landmark_recording import LandmarkRecording, is_recording
+from utils.movements import (DIRECTIONS, HORIZONTAL_DEG, direction_bins, extended_fingers, hand_present_mask,
+                             index_angles)
+
+DEFAULTS = {
+    "horizontal_deg": HORIZONTAL_DEG,
+    "vote": 1,
+    "min_extended": 4,
+    "frames_to_pause": NO_HAND_FRAMES_TO_PAUSE,
+    "frames_to_resume": HAND_FRAMES_TO_RESUME,
+}
+GRID = {
+    "horizontal_deg": [35.0, 40.0, 45.0, 50.0, 55.0],
+    "vote": [1, 3, 5, 7, 9],
+    "min_extended": [3, 4, 5],
+    "frames_to_pause": [3, 5, 8],
+    "frames_to_resume": [1, 3, 5],
+}
+FRONTS = [(("accuracy", "max"), ("latency_ms", "min")),
+          (("accuracy", "max"), ("false_switches_per_min", "min"))]
+# among configurations equal on the objectives of a front, the one shown
+TIE_BREAK = ("false_open_rate", "paused_rate", "false_switches_per_min", "latency_ms", "miss_rate")
+# code of "no gesture" after the DIRECTIONS codes
+NONE_CODE = len(DIRECTIONS)
+LABELS = np.append(DIRECTIONS, NONE)
+
+
+def load_features(path):
+    """Per-frame arrays of the first hand of a labelled landmark stream (.lmk or .npz)."""
+    if is_recording(path):
+        recording = LandmarkRecording(path)
+        t, count = np.array(recording.timestamps), np.array(recording.hand_count)
+        hands, real = np.array(recording.landmarks[:, 0]), recording.gestures()
+    else:
+        with np.load(path) as data:
+            if "gesture_real" not in data.files:
+                raise ValueError(f"{path}: no keyboard labels (gesture_real)")
+            t, count, real = data["timestamps"], data["hand_count"], data["gesture_real"]
+            hands = data["landmarks"][:, 0]
+    return {
+        "path": path,
+        "t": np.asarray(t, dtype=np.float64),
+        "real": np.asarray(real, dtype=str),
+        "present": (count > 0) & hand_present_mask(hands),
+        "angle": index_angles(hands),
+        "extended": extended_fingers(hands),
+    }
+
+
+def majority_vote(codes, window):
+    """
+    Vectorized MajorityVote: most frequent code of the last `window` ones
+    (the code itself for the first window - 1). Ties go to the latest
+    code, then to the lowest one (MajorityVote breaks them arbitrarily).
+    """
+    if window <= 1 or len(codes) == 0:
+        return codes
+    n = len(codes)
+    onehot = np.zeros((n + 1, len(DIRECTIONS)), dtype=np.int32)
+    onehot[np.arange(1, n + 1), codes] = 1
+    cum = np.cumsum(onehot, axis=0)
+    rows = np.arange(n)
+    score = 2 * (cum[rows + 1] - cum[np.maximum(rows + 1 - window, 0)])
+    score[rows, codes] += 1
+    voted = score.argmax(axis=1)
+    voted[:window - 1] = codes[:window - 1]
+    return voted
+
+
+def run_lengths(mask):
+    """Length of the run of equal values ending at every frame."""
+    n = len(mask)
+    starts = np.zeros(n, dtype=np.int64)
+    changes = np.flatnonzero(mask[1:] != mask[:-1]) + 1
+    starts[changes] = changes
+    return np.arange(n) - np.maximum.accumulate(starts) + 1
+
+
+def pause_states(present, frames_to_pause, frames_to_resume):
+    """PauseHysteresis.update over a whole session: paused flag per frame."""
+    run = run_lengths(present)
+    event = np.full(len(present), -1, dtype=np.int8)
+    event[~present & (run == frames_to_pause)] = 1
+    event[present & (run == frames_to_resume)] = 0
+    last = np.maximum.accumulate(np.where(event >= 0, np.arange(len(present)), -1))
+    return np.where(last >= 0, event[np.maximum(last, 0)] == 1, False)
+
+
+def game_gestures(session, config):
+    """(gesture code the game receives at every frame: DIRECTIONS index or NONE_CODE, paused flags)."""
+    present = session["present"]
+    codes = np.full(len(present), NONE_CODE, dtype=np.int64)
+    bins = direction_bins(session["angle"][present], config["horizontal_deg"])
+    codes[present] = majority_vote(bins, int(config["vote"]))
+    paused = pause_states(present, config["frames_to_pause"], config["frames_to_resume"])
+    codes[paused] = NONE_CODE
+    return codes, paused
+
+
+def evaluate(sessions, config):
+    """Metrics of one configuration over the sessions (see the module docstring)."""
+    stats = LatencyStats()
+    held = correct = paused = opened = 0
+    for session in sessions:
+        codes, session_paused = game_gestures(session, config)
+        real, gestures = session["real"], LABELS[codes]
+        stats.update(session["t"], real, gestures)
+        key = np.isin(real, GESTURES)
+        held += int(key.sum())
+        correct += int((gestures[key] == real[key]).sum())
+        paused += int((session_paused & key).sum())
+        opened += int((session["present"] & (session["extended"] >= config["min_extended"]) & key).sum())
+    entry = stats.report()["ALL"]
+    return dict(config,
+                accuracy=correct / held if held else None,
+                latency_ms=entry["latency_ms"]["mean"] if entry["latency_ms"] else None,
+                latency_p95_ms=entry["latency_ms"]["p95"] if entry["latency_ms"] else None,
+                miss_rate=entry["miss_rate"],
+                false_switches_per_min=entry["false_switches_per_min"],
+                stability=entry["stability"],
+                paused_rate=paused / held if held else None,
+                false_open_rate=opened / held if held else None)
+
+
+_sessions = None
+
+
+def _init_worker(sessions):
+    global _sessions
+    _sessions = sessions
+
+
+def _evaluate(config):
+    return evaluate(_sessions, config)
+
+
+def run_sweep(sessions, configs, jobs=None):
+    """Evaluate every configuration, in `jobs` processes (1: in this process)."""
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(configs) < 2:
+        return [evaluate(sessions, config) for config in configs]
+    # the sessions are sent once per worker, not once per configuration
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(sessions,)) as pool:
+        return list(pool.map(_evaluate, configs, chunksize=max(1, len(configs) // (jobs * 8))))
+
+
+def parse_values(text):
+    """"1,3,5" -> [1, 3, 5]; "35:55:5" -> [35, 40, 45, 50, 55] (floats if any value has a dot)."""
+    cast = float if "." in text else int
+    if ":" in text:
+        start, stop, step = (cast(v) for v in text.split(":"))
+        return [cast(v) for v in np.arange(start, stop + step / 2, step)]
+    return [cast(v) for v in text.split(",")]
+
+
+def make_configs(grid, random_count=None, seed=0):
+    """Cartesian product of the grid, or `random_count` distinct configurations drawn from it."""
+    names = list(grid)
+    if random_count is None:
+        return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+    rng = np.random.default_rng(seed)
+    size = int(np.prod([len(grid[n]) for n in names]))
+    picks = rng.choice(size, size=min(random_count, size), replace=False)
+    configs = []
+    for flat in picks.tolist():
+        config = {}
+        for name in reversed(names):
+            flat, i = divmod(flat, len(grid[name]))
+            config[name] = grid[name][i]
+        configs.append({name: config[name] for name in names})
+    return configs
+
+
+def pareto_front(results, objectives):
+    """
+    Results not dominated on `objectives` [(key, "max" | "min")], sorted by
+    the first one. Of several results with the same objective values, only
+    the best on TIE_BREAK is kept.
+    """
+    results = sorted(results, key=lambda r: tuple(np.inf if r[k] is None else r[k] for k in TIE_BREAK))
+    seen = set()
+    unique = []
+    for r in results:
+        values = tuple(r[key] for key, _ in objectives)
+        if values not in seen:
+            seen.add(values)
+            unique.append(r)
+    results = unique
+    if not results:
+        return []
+    values = np.array([[(-1 if sense == "max" else 1) * (r[key] if r[key] is not None else np.inf)
+                        for key, sense in objectives] for r in results], dtype=np.float64)
+    values[np.isnan(values)] = np.inf
+    keep = np.ones(len(values), dtype=bool)
+    for start in range(0, len(values), 256):
+        block = values[start:start + 256, None, :]
+        dominated = (values[None] <= block).all(axis=2) & (values[None] < block).any(axis=2)
+        keep[start:start + 256] = ~dominated.any(axis=1)
+    front = [r for r, k in zip(results, keep) if k]
+    key, sense = objectives[0]
+    return sorted(front, key=lambda r: r[key] if r[key] is not None else -np.inf, reverse=sense == "max")
+
+
+def format_result(result):
+    params = " ".join(f"{name}={result[name]:g}" for name in DEFAULTS)
+    fmt = lambda v, spec: format(v, spec) if v is not None else "-"
+    return (f"{params} | acc {fmt(result['accuracy'], '.3f')} lag {fmt(result['latency_ms'], '6.1f')} ms "
+            f"miss {fmt(result['miss_rate'], '.3f')} switches {fmt(result['false_switches_per_min'], '5.2f')}/min "
+            f"paused {fmt(result['paused_rate'], '.3f')} open {fmt(result['false_open_rate'], '.3f')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="*", help="labelled landmark recordings (.lmk / .npz)")
+    parser.add_argument("--grid", nargs="+", default=[], metavar="NAME=VALUES",
+                        help="values of a parameter: a,b,c or start:stop:step")
+    parser.add_argument("--random", type=int, default=None, help="evaluate N random grid points")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--json", default=None, help="write every result and the fronts ('-': stdout)")
+    args = parser.parse_args()
+
+    grid = dict(GRID)
+    for item in args.grid:
+        name, _, values = item.partition("=")
+        if name not in DEFAULTS or not values:
+            parser.error(f"--grid expects NAME=VALUES with NAME in {', '.join(DEFAULTS)}")
+        grid[name] = parse_values(values)
+    inputs = args.inputs or sorted(glob.glob("logs/*.lmk"))
+    if not inputs:
+        parser.error("no labelled landmark recordings (record some with main.py --record-landmarks)")
+
+    sessions = [load_features(path) for path in inputs]
+    configs = make_configs(grid, args.random, args.seed)
+    start = time.perf_counter()
+    results = run_sweep(sessions, configs, args.jobs)
+    elapsed = time.perf_counter() - start
+    baseline = evaluate(sessions, DEFAULTS)
+    fronts = {f"{a[0]}/{b[0]}": pareto_front(results, (a, b)) for a, b in FRONTS}
+
+    if args.json:
+        report = {"inputs": inputs, "grid": grid, "baseline": baseline, "results": results, "fronts": fronts}
+        if args.json == "-":
+            json.dump(report, sys.stdout, indent=2)
+            print()
+            return
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    frames = sum(len(s["t"]) for s in sessions)
+    print(f"{len(inputs)} inputs, {frames} frames, {len(configs)} configurations in {elapsed:.2f} s "
+          f"({len(configs) / elapsed:.0f}/s)")
+    print(f"current  {format_result(baseline)}")
+    print("best accuracy:")
+    ranked = sorted(results, key=lambda r: r["accuracy"] if r["accuracy"] is not None else -1, reverse=True)
+    for result in ranked[:args.top]:
+        print(f"  {format_result(result)}")
+    for name, front in fronts.items():
+        print(f"Pareto front {name} ({len(front)}):")
+        for result in front:
+            print(f"  {format_result(result)}")
+
+
+if __name__ == "__main__":
+    main()